@@ -54,6 +54,10 @@ class I18NPreflight():
     error_issuer_missing   = Template('[n]✗[/n] [[error]FAIL[/error]] Issuing address "${address}" isn\'t a known token issuing address. Please make sure you have entered the address correctly, and that one or more tokens issued by this address has a trust level of 1 or greater on the XRPL')
     error_issuer_overwrite = Template('[n]✗[/n] [[error]FAIL[/error]] Source issuing address "${address}" cannot be set, as overwriting the source issuing address is forbidden')
 
+    # Issued token choice
+    error_token_ambiguous = Template('[n]✗[/n] [[error]FAIL[/error]] Address [prominent]${address}[/prominent] has issued [prominent]${total}[/prominent] tokens. Please pick one by its currency code or name, as there\'s no one to ask when running headless')
+    error_token_missing   = Template('[n]✗[/n] [[error]FAIL[/error]] Address [prominent]${address}[/prominent] hasn\'t issued a token with the currency code or name [prominent]${currency}[/prominent]')
+
     # Input budget validation
     enter_balance    = Template('[prominent](${step}/${maximum})[/prominent] Enter the total airdrop budget')
     error_conversion = Template('[n]✗[/n] [[error]FAIL[/error]] Could not converty input "${value}" into a number')
@@ -65,10 +69,27 @@ class I18NPreflight():
     confirm_csv      = Template('[prominent](${step}/${maximum})[/prominent] Once the airdrop has finished calculating, would you like to save the results into a CSV file? If not, the result of the calculations is printed into console as a table')
     choose_path      = "Where would you like to save the CSV file?\n\n1. Desktop\n2. Documents\n3. Custom...\n\nEnter choice"
     custom_path      = "Enter custom save path for the output CSV file"
-    error_empty_path = Template('Path "${path}" is not valid. Please make sure it follows the path specification of your operating system, and that it is not empty!')
+    error_empty_path = Template('[n]✗[/n] [[error]FAIL[/error]] Path "${path}" is not valid. Please make sure it follows the path specification of your operating system, and that it is not empty!')
+
+    # Balance engine
+    error_engine         = Template('[n]✗[/n] [[error]FAIL[/error]] Unknown balance engine "${engine}". Please use either "async" or "threaded"')
+    error_window         = Template('[n]✗[/n] [[error]FAIL[/error]] Request window "${window}" must be a whole number larger than 0')
+    error_payment_window = Template('[n]✗[/n] [[error]FAIL[/error]] Payment window "${window}" must be a whole number larger than 0')
+    error_ledger_window  = Template('[n]✗[/n] [[error]FAIL[/error]] Ledger window "${window}" must be a whole number larger than 0')
+    error_payment_fee    = Template('[n]✗[/n] [[error]FAIL[/error]] Payment fee "${fee}" and maximum fee "${max_fee}" must be whole numbers of at least ${base_fee} drops, the reference base fee, and the fee can not exceed the maximum fee')
+    error_hedge          = Template('[n]✗[/n] [[error]FAIL[/error]] Hedging threshold "${hedge}" must be a number of milliseconds larger than 0')
+
+    # Presigned distribution
+    error_presign_signed = "[n]✗[/n] [[error]FAIL[/error]] Payments can either be signed with --presign, or sent with --signed, but not both at once"
+
+    # Endpoints
+    error_endpoints = Template('[n]✗[/n] [[error]FAIL[/error]] Could not read XRPL endpoints from [prominent]${path}[/prominent]. Please make sure the file is valid JSON, and that every endpoint has a "ws://" or "wss://" url, a positive weight and a concurrency of at least 1')
+
+    # Ledger index
+    error_ledger_index = Template('[n]✗[/n] [[error]FAIL[/error]] Ledger index "${ledger}" must be a whole number larger than 0')
 
     # Confirm options
-    confirm_preflight_calculate  = Template('\n - Issued token: ${issuing}\n - Yield token: ${yielding}\n - Total budget: ${budget}\n - Output CSV & metadata files path: ${csv}\n\nIs this OK?')
+    confirm_preflight_calculate  = Template('\n - Issued token: ${issuing}\n - Yield token: ${yielding}\n - Total budget: ${budget}\n - Ledger index: ${ledger}\n - Output CSV & metadata files path: ${csv}\n\nIs this OK?')
     confirm_preflight_distribute = Template('\n - Distributed token: ${token}\n - Cold wallet: ${wallet}\n - Input data files path: ${filepaths}\n\nIs this OK? (Y/n):')
 
     # Input data path
@@ -82,11 +103,21 @@ class I18NPreflight():
     enter_seed_invalid = Template('Wallet seed [prominent]${seed}[/prominent] isn\'t a valid wallet seed, please double check the seed and try again: ')
     error_seed         = Template('[n]✗[/n] [[error]FAIL[/error]] Seed [prominent]${seed}[/prominent] isn\'t a valid wallet seed. Please check the seed and try again')
 
+    # Airdrop jobs
+    confirm_preflight_jobs = Template('\n - Issued token: ${issuing}\n - Ledger index: ${ledger}\n - Airdrop jobs:\n${jobs}\n\nIs this OK?')
+    error_jobs             = Template('[n]✗[/n] [[error]FAIL[/error]] Could not read airdrop jobs from [prominent]${path}[/prominent]. Please make sure the file is a valid JSON list of jobs, each having a "budget" and a "csv" path')
+    error_job              = Template('[n]✗[/n] [[error]FAIL[/error]] Airdrop job [prominent]#${job}[/prominent] in [prominent]${path}[/prominent] is invalid. ${reason}')
+
+    # Headless
+    error_headless_missing = Template('[n]✗[/n] [[error]FAIL[/error]] No ${value} was given, which is required when running headless')
+
 @dataclass(frozen=True)
 class I18NSteps():
 
     # Setup
     error_clients = "[n]✗[/n] [[error]FAIL[/error]] Could not connect to any XRPL public API. This could be due to rate limiting, or due to the lack of a stable internet connection"
+    ledger_pinned = Template('[y]✓[/y] [[success]SUCCESS[/success]] Pinned all requests to ledger [prominent]${ledger}[/prominent]')
+    error_ledger  = "[n]✗[/n] [[error]FAIL[/error]] Could not pin a ledger index. Please make sure the requested ledger exists, and that the XRPL public APIs are reachable"
 
     # Yield calculation
     yield_sum            = "[[info]WORKING[/info]] Summing up the total balance for all trustlines..."
@@ -94,19 +125,23 @@ class I18NSteps():
     yield_result_account = Template('[[info]WORKING[/info]] Calculating total yield for [prominent]${address}[/prominent]...')
 
     # Trustline fetch
-    trustlines_fetch         = Template('[[info]WORKING[/info]] Fetching trustlines for address [prominent]${address}[/prominent]...')
-    trustlines_fetch_success = Template('[y]✓[/y] [[success]SUCCESS[/success]] Successfully fetched [prominent]${count}[/prominent] trustlines set for issuing address [prominent]${address}[/prominent] in [prominent]${delta}[/prominent]')
-    error_trustline_fetch    = Template('[n]✗[/n] [[error]FAIL[/error]] Failed fetching trustlines for address [prominent]${address}[/prominent]! Please make sure you have an active internet connection, and that the issuing token in question has one or more trustlines set against it')
+    trustlines_fetch          = Template('[[info]WORKING[/info]] Fetching trustlines for address [prominent]${address}[/prominent]...')
+    trustlines_fetch_progress = Template('[[info]WORKING[/info]] Fetching trustlines for address [prominent]${address}[/prominent], [prominent]${count}[/prominent] found so far...')
+    trustlines_fetch_success  = Template('[y]✓[/y] [[success]SUCCESS[/success]] Successfully fetched [prominent]${count}[/prominent] trustlines set for issuing address [prominent]${address}[/prominent] in [prominent]${delta}[/prominent]')
+    error_trustline_fetch     = Template('[n]✗[/n] [[error]FAIL[/error]] Failed fetching trustlines for address [prominent]${address}[/prominent]! Please make sure you have an active internet connection, and that the issuing token in question has one or more trustlines set against it')
 
     # Balances fetch
     balances_fetch         = Template('[[info]WORKING[/info]] Fetching [prominent]${token}[/prominent] balances for [prominent]${count}[/prominent] trustlines, this may take a while...')
     balances_fetch_account = Template('[[info]WORKING[/info]] Fetching [prominent]${token}[/prominent] balance for trustline address [prominent]${address}[/prominent]...')
     balances_fetch_success = Template('[y]✓[/y] [[success]SUCCESS[/success]] Successfully fetched [prominent]${token}[/prominent] balances for [prominent]${count}[/prominent] trustlines in [prominent]${delta}[/prominent]')
     error_balances         = Template('[[info]WORKING[/info]] Failed fetching balance for trustline [prominent]${address}[/prominent] due to rate limiting, waiting for [prominent]${delta}[/prominent] seconds before trying again...')
+    error_balances_failed  = Template('[n]✗[/n] [[error]FAIL[/error]] Failed fetching balance for trustline [prominent]${address}[/prominent] after [prominent]${attempts}[/prominent] attempts. This could be due to rate limiting, or due to the lack of a stable internet connection')
+    error_balances_reject  = Template('[n]✗[/n] [[error]FAIL[/error]] The XRPL rejected the balance request for trustline [prominent]${address}[/prominent] with [prominent]${error}[/prominent]. Please make sure the XRPL endpoints still serve ledger [prominent]${ledger}[/prominent], or start over without --resume')
 
     # Print yield
     error_saving_csv = Template('[n]✗[/n] [[error]FAIL[/error]] Could not save output CSV or metadata file(s) to path [prominent]${path}[/prominent]. Please make sure you have correct permissions to write to this location and try again')
     print_subtitle   = "Finished airdrop calculations!"
+    job_begin        = Template('[[info]WORKING[/info]] Running airdrop job [prominent]${job}[/prominent] of [prominent]${total}[/prominent], writing to [prominent]${path}[/prominent]...')
     print_header     = "Total airdrop yield"
 
     # Input data validation
@@ -131,10 +166,30 @@ class I18NSteps():
     validate_ratio_success = Template('[y]✓[/y] [[success]SUCCESS[/success]] Successfully validated [prominent]${token}[/prominent] airdrop ratio')
     error_validate_ratio   = Template('[n]✗[/n] [[error]FAIL[/error]] Could not validate [prominent]${token}[/prominent] ratio due to either the data being corrupted or the metadata being tampered with. Expected to get ratio [prominent]${expected}[/prominent], but got ratio [prominent]${got}[/prominent]')
 
+    # Presigned distribution
+    presign_working           = Template('[[info]WORKING[/info]] Signing [prominent]${count}[/prominent] [prominent]${token}[/prominent] payments...')
+    presign_success           = Template('[y]✓[/y] [[success]SUCCESS[/success]] Successfully signed [prominent]${count}[/prominent] payments with sequences [prominent]${first}[/prominent] to [prominent]${last}[/prominent], which have been saved in [prominent]${path}[/prominent]. Send them by running distribute again with --signed')
+    error_presign_state       = "[n]✗[/n] [[error]FAIL[/error]] Could not read the cold wallet sequence and fee from the XRPL. Please make sure the wallet is funded, and that the XRPL endpoints are reachable"
+    error_presign_destination = Template('[n]✗[/n] [[error]FAIL[/error]] Destination [prominent]${destination}[/prominent] is not a valid classic address, so no payments have been signed')
+    signed_validation         = "[[info]WORKING[/info]] Validating signed payments file..."
+    signed_success            = Template('[y]✓[/y] [[success]SUCCESS[/success]] Successfully validated [prominent]${count}[/prominent] signed payments')
+    error_signed              = Template('[n]✗[/n] [[error]FAIL[/error]] Could not validate signed payments file [prominent]${path}[/prominent]. Please make sure it was written by --presign for these data files and this cold wallet, and that it has not been modified since')
+
+    # Distribution journal
+    journal_reconcile      = Template('[[info]WORKING[/info]] Checking [prominent]${count}[/prominent] journaled payments against the XRPL, waiting for their ledger windows to pass...')
+    journal_resumed        = Template('[y]✓[/y] [[success]SUCCESS[/success]] Resuming distribution: [prominent]${sent}[/prominent] payments were already sent, [prominent]${unknown}[/prominent] are unknown and [prominent]${remaining}[/prominent] are left to send')
+    error_journal          = Template('[n]✗[/n] [[error]FAIL[/error]] Could not write the distribution journal [prominent]${path}[/prominent]. Please make sure you have correct permissions to write to this location and try again')
+    error_journal_exists   = Template('[n]✗[/n] [[error]FAIL[/error]] A distribution journal already exists at [prominent]${path}[/prominent], so these payments may have been sent before. Run distribute again with --resume to send only what is missing, or remove the journal to start over')
+    error_journal_mismatch = Template('[n]✗[/n] [[error]FAIL[/error]] The distribution journal [prominent]${path}[/prominent] was written for other data files or another cold wallet, so it can not be resumed')
+
     # Token distribution
-    distribute_working = Template('[[info]WORKING[/info]] Sending [prominent]${amount} ${token}[/prominent] to [prominent]${destination}[/prominent]...')
+    distribute_working = Template('[[info]WORKING[/info]] Sending [prominent]${token}[/prominent], [prominent]${count}[/prominent] of [prominent]${total}[/prominent] payments settled so far...')
     distribute_success = Template('[y]✓[/y] [[success]SUCCESS[/success]] Successfully sent [prominent]${amount} ${token}[/prominent] to [prominent]${destination}[/prominent]')
     distribute_error = Template('[n]✗[/n] [[error]FAIL[/error]] Could not send [prominent]${amount} ${token}[/prominent] to [prominent]${destination}[/prominent]')
+    distribute_interrupted = Template('[n]✗[/n] [[error]FAIL[/error]] Distribution got interrupted while [prominent]${amount}[/prominent] payments were unsettled. Run distribute again with --resume to check which of them were validated, and to send only what is missing')
+    distribute_unconfirmed = Template('[n]✗[/n] [[error]FAIL[/error]] Could not tell whether [prominent]${amount} ${token}[/prominent] sent to [prominent]${destination}[/prominent] was validated. Run distribute again with --resume to check it before sending anything again')
+    distribute_unknown     = Template('[n]✗[/n] [[error]FAIL[/error]] Could not tell whether [prominent]${token}[/prominent] sent to [prominent]${destination}[/prominent] by an earlier run was validated, so it has not been sent again. Please check the distribution journal')
+    error_base_fee   = Template('[n]✗[/n] [[error]FAIL[/error]] The XRPL currently asks for a base fee of [prominent]${base_fee}[/prominent] drops, which is more than the maximum fee of [prominent]${max_fee}[/prominent] drops, so no payment would be applied. Please raise --max-fee and try again')
     distribute_warn  = Template('[m]![/m] [[warn]WARNING[/warn]] Failed sending [prominent]${token}[/prominent] to [prominent]${amount}[/prominent] trustlines. Failed trustline information has been saved in [prominent]${log}[/prominent]')
 
     # Distribution summary
@@ -0,0 +1,344 @@
+"""Asyncio code for pipelining balance requests over a handful of sockets."""
+"""Author: spunk-developer <xspunk.developer@gmail.com>                 """
+
+from asyncio import FIRST_COMPLETED, Queue, Lock, ensure_future, gather, sleep, wait, run
+from decimal import Decimal
+from typing  import Callable, Union
+from time    import time
+
+from airdrop.session import AirdropSession
+from airdrop.xrpl    import RateLimitedError, RequestRejectedError, BalanceFetchError, AsyncMultiplexedClient, Endpoint, fetch_account_balance_async, fetch_load_factor_async, is_endpoint_degraded, get_fastest_address, get_endpoint_stats, get_rate_limiter, record_latency, get_endpoints, get_backoff, get_request_attempts
+
+
+def get_request_window(session: AirdropSession) -> int:
+    """Returns the amount of requests we allow to be in flight per socket.
+
+    Args:
+        session (AirdropSession): The session in question.
+
+    Returns:
+        int: Current request window.
+    """
+
+    return session.request_window
+
+
+def set_request_window(session: AirdropSession, window: int) -> bool:
+    """Sets the amount of requests we allow to be in flight per socket.
+
+    Args:
+        session (AirdropSession): The session to set the window of.
+        window (int): The window size. Must be at least 1.
+
+    Returns:
+        bool: `True` if the window is valid and got set, `False` otherwise.
+    """
+
+    if type(window) is not int or window < 1:
+        return False
+
+    session.request_window = window
+
+    return True
+
+
+def set_hedge_after(session: AirdropSession, milliseconds: Union[None, float]) -> bool:
+    """Sets after how long a slow balance request gets a duplicate sent to another endpoint.
+
+    Args:
+        session (AirdropSession): The session to set the threshold of.
+        milliseconds (Union[None, float]): The latency threshold in milliseconds, or `None` to disable hedging.
+
+    Returns:
+        bool: `True` if the threshold is valid and got set, `False` otherwise.
+    """
+
+    if isinstance(milliseconds, type(None)):
+        session.hedge_after = None
+        return True
+
+    if milliseconds <= 0:
+        return False
+
+    session.hedge_after = milliseconds / 1000
+
+    return True
+
+
+async def open_async_clients(session: AirdropSession) -> list[tuple[AsyncMultiplexedClient, Endpoint]]:
+    """Opens `concurrency` asyncio WebSocket clients per configured XRPL endpoint, skipping the ones we can't connect to.
+
+    Args:
+        session (AirdropSession): The session holding the endpoints.
+
+    Returns:
+        list[tuple[AsyncMultiplexedClient, Endpoint]]: All clients that could be opened, along with their endpoint.
+    """
+
+    clients = [ ]
+
+    for endpoint in get_endpoints(session):
+        for _ in range(endpoint.concurrency):
+
+            try:
+                client = AsyncMultiplexedClient(endpoint.url)
+
+                await client.open()
+
+                clients.append((client, endpoint))
+
+            except:
+                get_endpoint_stats(endpoint.url).healthy = False
+                continue
+
+    return clients
+
+
+async def request_trustline_balance(session: AirdropSession, trustline: str, token: str, client: AsyncMultiplexedClient, lock: Lock) -> Union[None, Decimal]:
+    """Sends a single balance request at the pace allowed by the endpoint's rate limiter, recording its latency.
+
+    Args:
+        session (AirdropSession): The session holding the pinned ledger and the yielding token.
+        trustline (str): The given trustline which to fetch their balance for.
+        token (str): The token in question.
+        client (AsyncMultiplexedClient): Socket shared by every worker of the same endpoint.
+        lock (Lock): Lock guarding reconnects of `client`, so only one worker re-opens a dropped socket.
+
+    Raises:
+        RateLimitedError: If the server asked us to slow down, after the endpoint's rate has been lowered.
+        AssertionError: If the request fails.
+
+    Returns:
+        Union[None, Decimal]: The fetched token balance.
+    """
+
+    limiter = get_rate_limiter(client.url)
+
+    if not client.is_open():
+        async with lock:
+            if not client.is_open():
+                await client.open()
+
+    await limiter.acquire_async()
+
+    try:
+        start_time = time()
+        balance    = await fetch_account_balance_async(session, trustline, token, client)
+
+    except RateLimitedError:
+        limiter.on_throttle()
+        raise
+
+    record_latency(client.url, time() - start_time)
+    limiter.on_success()
+
+    # Load sampling is best-effort, a failed sample shouldn't throw away the fetched balance.
+    if limiter.wants_load_sample():
+        try:
+            limiter.on_load(await fetch_load_factor_async(client))
+
+        except:
+            pass
+
+    return balance
+
+
+async def request_trustline_balance_hedged(session: AirdropSession, trustline: str, token: str, client: AsyncMultiplexedClient, lock: Lock, sockets: list[tuple[AsyncMultiplexedClient, Lock]]) -> Union[None, Decimal]:
+    """Sends a balance request, and if it hasn't been answered within the session's hedging threshold, sends a duplicate to the fastest other endpoint. Whichever succeeds first wins.
+
+    Args:
+        session (AirdropSession): The session holding the hedging threshold.
+        trustline (str): The given trustline which to fetch their balance for.
+        token (str): The token in question.
+        client (AsyncMultiplexedClient): Socket of the primary request.
+        lock (Lock): Lock guarding reconnects of `client`.
+        sockets (list[tuple[AsyncMultiplexedClient, Lock]]): Every open socket, which the duplicate request's socket is picked from.
+
+    Raises:
+        AssertionError: If every sent request fails.
+
+    Returns:
+        Union[None, Decimal]: The fetched token balance.
+    """
+
+    others  = [ (other, other_lock) for other, other_lock in sockets if other.url != client.url ]
+    primary = ensure_future(request_trustline_balance(session, trustline, token, client, lock))
+
+    if isinstance(session.hedge_after, type(None)) or len(others) <= 0:
+        return await primary
+
+    done, _ = await wait([ primary ], timeout=session.hedge_after)
+
+    if primary in done:
+        return primary.result()
+
+    address                  = get_fastest_address(list({ other.url for other, _ in others }))
+    hedge_client, hedge_lock = next((other, other_lock) for other, other_lock in others if other.url == address)
+
+    get_endpoint_stats(client.url).hedged += 1
+
+    pending = { primary, ensure_future(request_trustline_balance(session, trustline, token, hedge_client, hedge_lock)) }
+
+    while True:
+        done, pending = await wait(pending, return_when=FIRST_COMPLETED)
+
+        for task in done:
+            if isinstance(task.exception(), type(None)):
+
+                # The slower request is left to finish on its own, cancelling it would leave its socket resolving a dead future.
+                for loser in pending:
+                    loser.add_done_callback(lambda loser: loser.cancelled() or loser.exception())
+
+                return task.result()
+
+        if len(pending) <= 0:
+            raise next(iter(done)).exception()
+
+
+async def fetch_trustline_balance_async(session: AirdropSession, trustline: str, token: str, client: AsyncMultiplexedClient, lock: Lock, sockets: list[tuple[AsyncMultiplexedClient, Lock]]) -> tuple[str, Union[None, Decimal]]:
+    """Fetches a single trustline balance, retrying with a jittered delay up to `REQUEST_ATTEMPTS` times in total.
+
+    Args:
+        session (AirdropSession): The session holding the pinned ledger and the yielding token.
+        trustline (str): The given trustline which to fetch their balance for.
+        token (str): The token in question.
+        client (AsyncMultiplexedClient): Socket shared by every worker of the same endpoint.
+        lock (Lock): Lock guarding reconnects of `client`, so only one worker re-opens a dropped socket.
+        sockets (list[tuple[AsyncMultiplexedClient, Lock]]): Every open socket, used for hedging slow requests.
+
+    Raises:
+        BalanceFetchError: If the XRPL rejected the request, or it kept failing.
+
+    Returns:
+        tuple[str, Union[None, Decimal]]: A tuple containing the original trustline address and fetched token balance.
+    """
+
+    attempt = 0
+
+    while True:
+        try:
+            return (trustline, await request_trustline_balance_hedged(session, trustline, token, client, lock, sockets))
+
+        # Asking again for a ledger or account the server doesn't know about would never succeed.
+        except RequestRejectedError as error:
+            raise BalanceFetchError(trustline, error.error)
+
+        # The server asked us to slow down, so we retry soon at a lower rate instead of waiting out a long backoff.
+        except RateLimitedError:
+            attempt += 1
+
+            if attempt >= get_request_attempts():
+                raise BalanceFetchError(trustline)
+
+            await sleep(get_backoff(attempt, 0.5, 10.0))
+
+        except:
+            attempt += 1
+
+            if attempt >= get_request_attempts():
+                raise BalanceFetchError(trustline)
+
+            await sleep(get_backoff(attempt))
+
+
+async def fetch_trustline_balances_pipelined(session: AirdropSession, token: str, trustlines: list[str], callback: Union[None, Callable[[str, Union[None, Decimal]], None]] = None) -> dict[str, Decimal]:
+    """Fetches trustline balances by keeping up to the session's request window in flight on every open socket, scaled down by endpoint weight.
+
+    Args:
+        session (AirdropSession): The session holding the endpoints, the request window, the pinned ledger and the yielding token.
+        token (str): The token in question which to get the trustline balances for.
+        trustlines (list[str]): List of all trustlines which to fetch balances for.
+        callback (Union[None, Callable[[str, Union[None, Decimal]], None]]): Optionally called with every balance as soon as it has been fetched.
+
+    Raises:
+        ConnectionError: If none of the XRPL endpoints could be connected to.
+        BalanceFetchError: If any trustline balance couldn't be fetched.
+
+    Returns:
+        dict[str, Decimal]: Dictionary containing fetched trustline balances, which has been filtered to not include zero-balance trustlines.
+    """
+
+    clients = await open_async_clients(session)
+
+    if len(clients) <= 0:
+        raise ConnectionError
+
+    queue:   Queue                                  = Queue()
+    fetched: dict[str, Union[None, Decimal]]        = { }
+    sockets: list[tuple[AsyncMultiplexedClient, Lock]] = [ (client, Lock()) for client, _ in clients ]
+
+    for trustline in trustlines:
+        queue.put_nowait(trustline)
+
+    async def worker(client: AsyncMultiplexedClient, lock: Lock) -> None:
+
+        while not queue.empty():
+
+            # Degraded endpoints pull work less often, leaving it for the faster ones.
+            if is_endpoint_degraded(client.url):
+                await sleep(1)
+
+                if queue.empty():
+                    break
+
+            trustline = queue.get_nowait()
+
+            address, balance = await fetch_trustline_balance_async(session, trustline, token, client, lock, sockets)
+
+            fetched[address] = balance
+
+            if not isinstance(callback, type(None)):
+                callback(address, balance)
+
+    workers = [ ]
+
+    try:
+        heaviest = max([ endpoint.weight for _, endpoint in clients ])
+
+        # The heaviest endpoint gets the full window on each of its sockets, lighter ones a proportional share.
+        for (client, lock), (_, endpoint) in zip(sockets, clients):
+            for _ in range(max(1, round(session.request_window * endpoint.weight / heaviest))):
+                workers.append(ensure_future(worker(client, lock)))
+
+        await gather(*workers)
+
+    # One failed balance fails the whole fetch, so the remaining workers are stopped before their sockets get closed.
+    except:
+        for worker in workers:
+            worker.cancel()
+
+        raise
+
+    finally:
+        for client, _ in clients:
+            await client.close()
+
+    balances = { }
+
+    # We rebuild the results in input order so the output matches the threaded engine
+    for address in trustlines:
+
+        balance = fetched.get(address)
+
+        if address in balances or isinstance(balance, type(None)) or balance.is_zero():
+            continue
+
+        balances[address] = balance
+
+    return balances
+
+
+def fetch_trustline_balances_async(session: AirdropSession, token: str, trustlines: list[str], callback: Union[None, Callable[[str, Union[None, Decimal]], None]] = None) -> dict[str, Decimal]:
+    """Blocking entrypoint for the asyncio balance engine. Drop-in replacement for `fetch_trustline_balances_threaded`.
+
+    Args:
+        session (AirdropSession): The session holding the endpoints, the request window, the pinned ledger and the yielding token.
+        token (str): The token in question which to get the trustline balances for.
+        trustlines (list[str]): List of all trustlines which to fetch balances for.
+        callback (Union[None, Callable[[str, Union[None, Decimal]], None]]): Optionally called with every balance as soon as it has been fetched.
+
+    Returns:
+        dict[str, Decimal]: Dictionary containing fetched trustline balances, which has been filtered to not include zero-balance trustlines.
+    """
+
+    return run(fetch_trustline_balances_pipelined(session, token, trustlines, callback))
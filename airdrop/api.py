@@ -0,0 +1,411 @@
+"""Programmatic API for calculating & distributing airdrops without the CLI."""
+"""Author: spunk-developer <xspunk.developer@gmail.com>                       """
+
+from dataclasses import dataclass
+from asyncio     import to_thread
+from decimal     import Decimal
+from pathlib     import Path
+from typing      import Union
+from time        import time
+
+from airdrop.session import AirdropSession, new_session
+from airdrop.thread  import fetch_trustline_balances_threaded
+from airdrop.cache   import has_token_index, read_issued_tokens, find_issued_token, read_distribution_journal, open_distribution_journal, close_distribution_journal, journal_payment
+from airdrop.steps   import write_airdrop_csv, get_distribution_journal, read_journaled_payments, settle_journaled_payments
+from airdrop.calc    import calculate_airdrop_ratio, calculate_yield, increment_airdrop_sum, set_airdrop_budget
+from airdrop.data    import validate_metadata, validate_data, set_data, set_meta, set_path
+from airdrop.dist    import submit_payments, reconcile_payments, register_wallet, close_payment_client
+from airdrop.xrpl    import fetch_trustlines_with_balances, fetch_xrpl_metadata, fetch_trustlines, update_issuing_metadata, update_yielding_token, set_ledger_index, pin_ledger_index, populate_clients, dispose_clients, set_endpoints, get_client
+from airdrop.aio     import fetch_trustline_balances_pipelined, fetch_trustline_balances_async
+from airdrop.csv     import set_output_path, is_path_valid
+
+
+@dataclass(frozen=True)
+class AirdropResult():
+    """Outcome of an airdrop calculation. Tokens are given as `(address, (currency, name))`."""
+
+    issuer:       tuple[str, tuple[str, Union[None, str]]]
+    yielding:     tuple[str, tuple[str, Union[None, str]]]
+    ledger_index: int
+    budget:       Decimal
+    sum:          Decimal
+    ratio:        Decimal
+    trustlines:   list[str]
+    balances:     dict[str, Decimal]
+    yields:       dict[str, Decimal]
+
+
+@dataclass(frozen=True)
+class DistributionResult():
+    """Outcome of an airdrop distribution. Every payment is given as a `destination` & `amount` dictionary."""
+
+    sent:   list[dict[str, Union[str, Decimal]]]
+    failed: list[dict[str, Union[str, Decimal]]]
+
+
+def resolve_token(address: str, currency: Union[None, str]) -> tuple[str, Union[None, str]]:
+    """Picks the token issued by `address` from the local token index, syncing the index with XRPLMeta if the token can't be found.
+
+    Args:
+        address (str): The issuing address, or "XRP".
+        currency (Union[None, str]): The currency code or name of the token. May be left out if `address` has issued a single token.
+
+    Raises:
+        ConnectionError: If the index has to be synced, but XRPLMeta can't be reached.
+        ValueError: If no single token could be picked.
+
+    Returns:
+        tuple[str, Union[None, str]]: The token's currency code and name.
+    """
+
+    if address.lower() == "xrp":
+        return ("XRP", None)
+
+    def pick(issued_tokens: list[tuple[str, Union[None, str]]]) -> Union[None, tuple[str, Union[None, str]]]:
+
+        if type(currency) is str:
+            return find_issued_token(issued_tokens, currency)
+
+        if len(issued_tokens) == 1:
+            return issued_tokens[0]
+
+        return None
+
+    token = None
+
+    if has_token_index():
+        token = pick(read_issued_tokens(address))
+
+    # Tokens issued since the index was last synced only show up after syncing it again.
+    if isinstance(token, type(None)):
+        fetch_xrpl_metadata()
+
+        token = pick(read_issued_tokens(address))
+
+    if isinstance(token, type(None)):
+        raise ValueError(f'Could not pick a token issued by "{ address }". Make sure the address has issued tokens, and give a currency if it has issued several')
+
+    return token
+
+
+def prepare_calculation(session: AirdropSession, issuing_address: str, yielding_address: str, budget: Union[int, float, str, Decimal], issuing_currency: Union[None, str], yielding_currency: Union[None, str], ledger_index: Union[None, int], endpoints: Union[None, list[dict]]) -> None:
+    """Sets up a fresh session for a calculation, connects to the XRPL and fetches the issuer's trustlines into it.
+
+    Raises:
+        ConnectionError: If the XRPL or XRPLMeta can't be reached.
+        ValueError: If any of the arguments are invalid.
+    """
+
+    session.start_time = time()
+
+    if not isinstance(endpoints, type(None)) and not set_endpoints(session, endpoints):
+        raise ValueError("XRPL endpoints are invalid")
+
+    update_issuing_metadata(session, issuing_address, resolve_token(issuing_address, issuing_currency))
+    update_yielding_token(session, (yielding_address, resolve_token(yielding_address, yielding_currency)))
+
+    # Budgets go through a float like they do on the command line, so both produce identical ratios.
+    if float(budget) <= 0 or float(budget) > 100000000000000000 or not set_airdrop_budget(session, float(budget)):
+        raise ValueError(f'Budget "{ budget }" must be larger than 0 and at most 100000000000000000')
+
+    if not isinstance(ledger_index, type(None)) and not set_ledger_index(session, ledger_index):
+        raise ValueError(f'Ledger index "{ ledger_index }" must be a whole number larger than 0')
+
+    if not populate_clients(session) or not pin_ledger_index(session, get_client(session)):
+        raise ConnectionError
+
+    address, token = session.issuer
+
+    session.single_pass = session.yielding[0] == address and session.yielding[1][0] == token[0]
+
+    with get_client(session) as client:
+
+        if session.single_pass:
+            balances = fetch_trustlines_with_balances(session, address, token[0], client)
+
+            session.trustlines = list(balances.keys())
+            session.balances   = { holder: balance for holder, balance in balances.items() if not balance.is_zero() }
+
+        else:
+            session.trustlines = fetch_trustlines(session, address, token[0], client)
+
+
+def finish_calculation(session: AirdropSession, fetched: dict[str, Decimal], csv: Union[None, str]) -> AirdropResult:
+    """Calculates the yields from the fetched balances, optionally writing them into CSV & metadata files the distribution can be run from.
+
+    Raises:
+        ValueError: If the CSV path is invalid.
+        OSError: If the CSV & metadata files can't be written.
+
+    Returns:
+        AirdropResult: The calculated airdrop.
+    """
+
+    if not session.single_pass:
+        session.balances = { address: fetched[address] for address in session.trustlines if address in fetched }
+
+    increment_airdrop_sum(session, session.balances.values())
+    calculate_airdrop_ratio(session)
+
+    session.yields = { address: calculate_yield(session, balance) for address, balance in session.balances.items() }
+
+    if not isinstance(csv, type(None)):
+
+        if not is_path_valid(str(csv)) or not set_output_path(session, str(csv)):
+            raise ValueError(f'CSV output path "{ csv }" is invalid')
+
+        if not write_airdrop_csv(session):
+            raise OSError(f'Could not write CSV & metadata files to "{ csv }"')
+
+    return AirdropResult(
+        issuer=session.issuer,
+        yielding=session.yielding,
+        ledger_index=session.ledger_index,
+        budget=session.budget,
+        sum=session.sum,
+        ratio=session.ratio,
+        trustlines=session.trustlines,
+        balances=session.balances,
+        yields=session.yields
+    )
+
+
+def calculate_airdrop(issuing_address: str, yielding_address: str, budget: Union[int, float, str, Decimal], issuing_currency: Union[None, str] = None, yielding_currency: Union[None, str] = None, ledger_index: Union[None, int] = None, engine: str = "async", endpoints: Union[None, list[dict]] = None, csv: Union[None, str] = None) -> AirdropResult:
+    """Calculates an airdrop for every holder of the issued token, without any console output or prompts. Every call runs in a session of its own, so calculations may run side by side.
+
+    Args:
+        issuing_address (str): Issuing address of the airdropped token, whose holders receive the airdrop.
+        yielding_address (str): Issuing address of the token the airdrop is calculated by, or "XRP".
+        budget (Union[int, float, str, Decimal]): Total airdrop supply budget.
+        issuing_currency (Union[None, str]): Currency code or name of the airdropped token, if its issuer has issued several.
+        yielding_currency (Union[None, str]): Currency code or name of the yielding token, if its issuer has issued several.
+        ledger_index (Union[None, int]): Ledger index to pin every request to. Defaults to the latest validated ledger.
+        engine (str): Either "async" or "threaded".
+        endpoints (Union[None, list[dict]]): XRPL endpoint configurations, each with an `url` and optionally a `weight` and `concurrency`. Defaults to the public XRPL endpoints.
+        csv (Union[None, str]): Optionally writes the results into CSV & metadata files at this path, which the distribution can be run from.
+
+    Raises:
+        ConnectionError: If the XRPL or XRPLMeta can't be reached.
+        ValueError: If any of the arguments are invalid.
+        OSError: If the CSV & metadata files can't be written.
+
+    Returns:
+        AirdropResult: The calculated airdrop.
+    """
+
+    if engine not in [ "async", "threaded" ]:
+        raise ValueError(f'Unknown balance engine "{ engine }"')
+
+    session = new_session()
+
+    session.engine = engine
+
+    try:
+        prepare_calculation(session, issuing_address, yielding_address, budget, issuing_currency, yielding_currency, ledger_index, endpoints)
+
+        token   = session.yielding[1][0]
+        fetched = { }
+
+        if session.single_pass:
+            pass
+
+        elif session.engine == "threaded":
+            fetched = fetch_trustline_balances_threaded(session, token, session.trustlines)
+
+        else:
+            fetched = fetch_trustline_balances_async(session, token, session.trustlines)
+
+        return finish_calculation(session, fetched, csv)
+
+    finally:
+        dispose_clients(session)
+
+
+async def calculate_airdrop_async(issuing_address: str, yielding_address: str, budget: Union[int, float, str, Decimal], issuing_currency: Union[None, str] = None, yielding_currency: Union[None, str] = None, ledger_index: Union[None, int] = None, endpoints: Union[None, list[dict]] = None, csv: Union[None, str] = None) -> AirdropResult:
+    """Asyncio variant of `calculate_airdrop`, which fetches balances with the pipelined engine on the running event loop. Blocking work is moved off the loop.
+
+    Args:
+        issuing_address (str): Issuing address of the airdropped token, whose holders receive the airdrop.
+        yielding_address (str): Issuing address of the token the airdrop is calculated by, or "XRP".
+        budget (Union[int, float, str, Decimal]): Total airdrop supply budget.
+        issuing_currency (Union[None, str]): Currency code or name of the airdropped token, if its issuer has issued several.
+        yielding_currency (Union[None, str]): Currency code or name of the yielding token, if its issuer has issued several.
+        ledger_index (Union[None, int]): Ledger index to pin every request to. Defaults to the latest validated ledger.
+        endpoints (Union[None, list[dict]]): XRPL endpoint configurations. Defaults to the public XRPL endpoints.
+        csv (Union[None, str]): Optionally writes the results into CSV & metadata files at this path.
+
+    Raises:
+        ConnectionError: If the XRPL or XRPLMeta can't be reached.
+        ValueError: If any of the arguments are invalid.
+        OSError: If the CSV & metadata files can't be written.
+
+    Returns:
+        AirdropResult: The calculated airdrop.
+    """
+
+    session = new_session()
+
+    try:
+        await to_thread(prepare_calculation, session, issuing_address, yielding_address, budget, issuing_currency, yielding_currency, ledger_index, endpoints)
+
+        fetched = { }
+
+        if not session.single_pass:
+            fetched = await fetch_trustline_balances_pipelined(session, session.yielding[1][0], session.trustlines)
+
+        return await to_thread(finish_calculation, session, fetched, csv)
+
+    finally:
+        # The thread disposes the clients even if this task gets cancelled while waiting on it.
+        await to_thread(dispose_clients, session)
+
+
+def validate_distribution(session: AirdropSession) -> None:
+    """Validates the session's parsed data & metadata files against each other and the budget, like the CLI does before distributing.
+
+    Raises:
+        ValueError: If the trustline count, sum or ratio don't match the metadata.
+    """
+
+    meta = session.meta
+    data = session.data
+    sum  = Decimal()
+
+    for entry in data:
+        sum += entry["currency"][1]
+
+    if meta["fetched"] - Decimal(len(data)) != meta["filtered"]:
+        raise ValueError("Filtered trustlines don't match the difference reported in the metadata")
+
+    if sum != meta["sum"]:
+        raise ValueError(f'Expected the sum to be { meta["sum"] }, but got { sum }')
+
+    if sum.is_zero() or session.budget / sum != meta["ratio"]:
+        raise ValueError(f'Expected the ratio to be { meta["ratio"] }, but the budget gives a different ratio')
+
+
+def distribute_airdrop(issuing_address: str, budget: Union[int, float, str, Decimal], seed: str, data_path: Union[str, Path], currency: Union[None, str] = None, endpoints: Union[None, list[dict]] = None, resume: bool = False) -> DistributionResult:
+    """Distributes a previously calculated airdrop from its CSV & metadata files, without any console output or prompts. The files are validated first, exactly like on the command line. Every call runs in a session of its own, with its own payment connection.
+
+    Every payment is written to the distribution journal next to the data files before it's submitted, exactly like on the command line. An interrupted distribution can only be continued with `resume`, which looks up what the journaled payments did on the ledger and only sends what's missing. Payments whose outcome can't be told are never sent again, and are returned as failed for the caller to check.
+
+    Args:
+        issuing_address (str): Issuing address of the distributed token, or "XRP".
+        budget (Union[int, float, str, Decimal]): The total airdrop supply budget the airdrop was calculated with.
+        seed (str): Seed of the wallet the payments are sent from.
+        data_path (Union[str, Path]): Directory holding the `airdrop_data.csv` & `airdrop_metadata.txt` files.
+        currency (Union[None, str]): Currency code or name of the distributed token, if its issuer has issued several.
+        endpoints (Union[None, list[dict]]): XRPL endpoint configurations. Payments are sent through the heaviest one. Defaults to the public XRPL endpoints.
+        resume (bool): Whether to continue the distribution journaled next to the data files.
+
+    Raises:
+        ConnectionError: If XRPLMeta or the XRPL endpoint can't be reached, or the connection is lost while payments are in flight.
+        FileNotFoundError: If the data or metadata file is missing.
+        FileExistsError: If a distribution journal already exists, but `resume` isn't set.
+        ValueError: If any of the arguments are invalid, the files don't validate, or the journal belongs to another distribution.
+        OSError: If the distribution journal can't be written.
+
+    Returns:
+        DistributionResult: Every sent and failed payment.
+    """
+
+    session = new_session()
+
+    try:
+        session.start_time = time()
+
+        if not isinstance(endpoints, type(None)) and not set_endpoints(session, endpoints):
+            raise ValueError("XRPL endpoints are invalid")
+
+        update_yielding_token(session, (issuing_address, resolve_token(issuing_address, currency)))
+
+        if float(budget) <= 0 or not set_airdrop_budget(session, float(budget)):
+            raise ValueError(f'Budget "{ budget }" must be larger than 0')
+
+        if not register_wallet(session, seed):
+            raise ValueError("Wallet seed is invalid")
+
+        data_path = Path(data_path)
+
+        if not set_meta(session, Path(data_path, "airdrop_metadata.txt")) or not set_data(session, Path(data_path, "airdrop_data.csv")) or not set_path(session, data_path):
+            raise FileNotFoundError(f'Could not find the data & metadata files in "{ data_path }"')
+
+        if not validate_metadata(session) or not validate_data(session):
+            raise ValueError("Data or metadata file contents are missing or modified")
+
+        validate_distribution(session)
+
+        journal_path, header = get_distribution_journal(session)
+        journal              = read_distribution_journal(journal_path)
+
+        if not resume or isinstance(journal, type(None)):
+
+            if not isinstance(journal, type(None)) and len(journal[1]) >= 1:
+                raise FileExistsError(f'A distribution journal already exists at "{ journal_path }", so these payments may have been sent before. Pass resume=True to send only what is missing')
+
+            if not open_distribution_journal(session, journal_path, header, False):
+                raise OSError(f'Could not write the distribution journal "{ journal_path }"')
+
+        else:
+            journal_header, records = journal
+
+            if journal_header != header:
+                raise ValueError(f'The distribution journal "{ journal_path }" belongs to another distribution')
+
+            sent, submitted, lookups = read_journaled_payments(session, records)
+            outcomes                 = reconcile_payments(session, lookups) if len(lookups) >= 1 else { }
+
+            if not open_distribution_journal(session, journal_path, header, True):
+                raise OSError(f'Could not write the distribution journal "{ journal_path }"')
+
+            settle_journaled_payments(session, sent, submitted, outcomes)
+
+        issuer, (id, _) = session.yielding
+
+        payments  = [ (entry["address"], (issuer, id, entry["yield"])) for entry in session.data ]
+        remaining = [ index for index, (destination, _) in enumerate(payments) if destination not in session.journaled ]
+        sequences = { }
+
+        def on_submit(position: int, sequence: int, hash: str, first_ledger: Union[None, int], last_ledger: Union[None, int]) -> None:
+
+            destination, (_, _, amount) = payments[remaining[position]]
+
+            sequences[position] = sequence
+
+            # Nothing may be submitted without being journaled first, or an interrupted run couldn't be resumed safely.
+            if not journal_payment(session, "submitted", destination, amount, sequence, first_ledger, last_ledger, hash):
+                raise OSError(f'Could not write the distribution journal "{ journal_path }"')
+
+        def on_payment(position: int, hash: Union[None, str], success: bool) -> None:
+
+            destination, (_, _, amount) = payments[remaining[position]]
+
+            journal_payment(session, "sent" if success else "failed", destination, amount, sequences.get(position), hash=hash)
+
+        results = { }
+
+        try:
+            if len(remaining) >= 1:
+                results = dict(zip(remaining, submit_payments(session, [ payments[index] for index in remaining ], on_payment, on_submit)))
+
+        finally:
+            close_distribution_journal(session)
+
+        sent   = [ ]
+        failed = [ ]
+
+        for index, entry in enumerate(session.data):
+
+            payment = { "destination": entry["address"], "amount": entry["yield"] }
+
+            # Journaled destinations without a hash may or may not have been paid by an earlier run.
+            if results.get(index, not isinstance(session.journaled.get(entry["address"]), type(None))):
+                sent.append(payment)
+                continue
+
+            failed.append(payment)
+
+        return DistributionResult(sent=sent, failed=failed)
+
+    finally:
+        close_payment_client(session)
@@ -1,10 +1,24 @@
-"""Locally saved data. Includes the XRPLMeta data, and terms of use check."""
-"""Author: spunk-developer <xspunk.developer@gmail.com>                   """
+"""Locally saved data. Includes the XRPLMeta token index, ledger snapshots, and terms of use check."""
+"""Author: spunk-developer <xspunk.developer@gmail.com>                                      """
 
-from os import path
+from contextlib import closing
+from hashlib    import sha256
+from decimal    import Decimal
+from sqlite3    import Connection, connect
+from typing     import Union
+from time       import time
+from os         import fsync, makedirs, path, remove
+
+from airdrop.session import AirdropSession
 
 META_FILE_PATH:        str  = path.normpath(path.abspath(path.expanduser('~/.xnet-airdrop-meta')))
 
+TOKEN_INDEX_PATH:      str  = path.normpath(path.abspath(path.expanduser('~/.xnet-airdrop-tokens.sqlite')))
+
+LEDGER_CACHE_PATH:     str  = path.normpath(path.abspath(path.expanduser('~/.xnet-airdrop-ledger.sqlite')))
+
+JOURNAL_DIR_PATH:      str  = path.normpath(path.abspath(path.expanduser('~/.xnet-airdrop-balances')))
+
 ACCEPTED_TERMS_OF_USE: bool = False
 
 def get_terms_of_use() -> bool:
@@ -39,3 +53,605 @@ def accept_terms_of_use() -> None:
 
     except:
         return
+
+
+def open_token_index() -> Connection:
+    """Opens the on-disk XRPLMeta token index, creating the tables if they don't exist yet. Tokens are looked up by issuer through the primary key, and by currency or name through their own indexes.
+
+    Returns:
+        Connection: SQLite connection to the index.
+    """
+
+    global TOKEN_INDEX_PATH
+
+    connection = connect(TOKEN_INDEX_PATH)
+
+    connection.execute("CREATE TABLE IF NOT EXISTS tokens (issuer TEXT NOT NULL, position INTEGER NOT NULL, currency TEXT NOT NULL, name TEXT, PRIMARY KEY (issuer, position))")
+    connection.execute("CREATE INDEX IF NOT EXISTS tokens_currency ON tokens (currency)")
+    connection.execute("CREATE INDEX IF NOT EXISTS tokens_name ON tokens (name)")
+
+    # Indexes written before sync markers existed are synced again in full.
+    if "marker" not in [ column for _, column, *_ in connection.execute("PRAGMA table_info(sync)") ]:
+        connection.execute("DROP TABLE IF EXISTS sync")
+
+    connection.execute("CREATE TABLE IF NOT EXISTS sync (id INTEGER PRIMARY KEY CHECK (id = 0), count INTEGER NOT NULL, marker TEXT, time REAL NOT NULL)")
+
+    return connection
+
+
+def has_token_index() -> bool:
+    """Tells whether a complete local XRPLMeta token index exists on disk.
+
+    Returns:
+        bool: `True` if an index has been written, `False` otherwise.
+    """
+
+    global TOKEN_INDEX_PATH
+
+    if not path.isfile(TOKEN_INDEX_PATH):
+        return False
+
+    return not isinstance(read_token_index_count(), type(None))
+
+
+def read_token_index_count() -> Union[None, int]:
+    """Reads the token count XRPLMeta reported when the local index was written, making sure the index actually holds that many tokens.
+
+    Returns:
+        Union[None, int]: The token count, or `None` if there's no readable and complete index.
+    """
+
+    try:
+        with closing(open_token_index()) as connection:
+            row    = connection.execute("SELECT count FROM sync WHERE id = 0").fetchone()
+            stored = connection.execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+
+            if isinstance(row, type(None)) or int(row[0]) != stored:
+                return None
+
+            return int(row[0])
+
+    except:
+        return None
+
+
+def read_token_index_marker() -> tuple[Union[None, str], Union[None, float]]:
+    """Reads the content marker of the XRPLMeta tokens the local index was written from, along with when it was written.
+
+    Returns:
+        tuple[Union[None, str], Union[None, float]]: The marker and the UNIX time of the sync, each `None` if unknown.
+    """
+
+    try:
+        with closing(open_token_index()) as connection:
+            row = connection.execute("SELECT marker, time FROM sync WHERE id = 0").fetchone()
+
+            if isinstance(row, type(None)):
+                return None, None
+
+            return row[0], float(row[1])
+
+    except:
+        return None, None
+
+
+def read_issued_tokens(issuer: str) -> list[tuple[str, Union[None, str]]]:
+    """Reads the tokens a single issuer has issued from the local index.
+
+    Args:
+        issuer (str): The issuing address.
+
+    Returns:
+        list[tuple[str, Union[None, str]]]: The token identifiers and names, or an empty list if the issuer isn't known or the index is unreadable.
+    """
+
+    try:
+        with closing(open_token_index()) as connection:
+            rows = connection.execute("SELECT currency, name FROM tokens WHERE issuer = ? ORDER BY position", (issuer,))
+
+            return [ (currency, name) for currency, name in rows ]
+
+    except:
+        return [ ]
+
+
+def find_issued_token(issued_tokens: list[tuple[str, Union[None, str]]], currency: str) -> Union[None, tuple[str, Union[None, str]]]:
+    """Finds an issued token by either its currency code or its name, ignoring case.
+
+    Args:
+        issued_tokens (list[tuple[str, Union[None, str]]]): The tokens issued by a single address, as returned by `read_issued_tokens`.
+        currency (str): The currency code or name to look for.
+
+    Returns:
+        Union[None, tuple[str, Union[None, str]]]: The matching `(id, name)` token, or `None` if nothing matched.
+    """
+
+    for id, name in issued_tokens:
+
+        if id.lower() == currency.lower() or (type(name) is str and name.lower() == currency.lower()):
+            return (id, name)
+
+    return None
+
+
+def write_token_index(count: int, tokens: dict[str, list[tuple[str, Union[None, str]]]], marker: Union[None, str] = None) -> bool:
+    """Replaces the local XRPLMeta token index in a single transaction, so an interrupted write leaves the previous index intact.
+
+    Args:
+        count (int): The token count XRPLMeta reported.
+        tokens (dict[str, list[tuple[str, Union[None, str]]]]): The issued tokens per issuer.
+        marker (Union[None, str]): Content marker of the tokens the index was written from, if known.
+
+    Returns:
+        bool: `True` if the index was written, `False` otherwise.
+    """
+
+    try:
+        with closing(open_token_index()) as connection:
+            with connection:
+                connection.execute("DELETE FROM tokens")
+                connection.executemany("INSERT INTO tokens VALUES (?, ?, ?, ?)", [ (issuer, position, currency, name) for issuer, issued in tokens.items() for position, (currency, name) in enumerate(issued) ])
+                connection.execute("INSERT OR REPLACE INTO sync VALUES (0, ?, ?, ?)", (count, marker, time()))
+
+        return True
+
+    except:
+        return False
+
+
+def delete_token_index() -> bool:
+    """Deletes the local XRPLMeta token index, so the next fetch starts from scratch.
+
+    Returns:
+        bool: `True` if no index exists after the call, `False` otherwise.
+    """
+
+    global TOKEN_INDEX_PATH
+
+    try:
+        if path.isfile(TOKEN_INDEX_PATH):
+            remove(TOKEN_INDEX_PATH)
+
+        return True
+
+    except:
+        return False
+
+
+def open_ledger_cache() -> Connection:
+    """Opens the on-disk ledger snapshot cache, creating the tables if they don't exist yet.
+
+    Returns:
+        Connection: SQLite connection to the cache.
+    """
+
+    global LEDGER_CACHE_PATH
+
+    connection = connect(LEDGER_CACHE_PATH)
+
+    connection.execute("CREATE TABLE IF NOT EXISTS balances (ledger_index INTEGER NOT NULL, account TEXT NOT NULL, currency TEXT NOT NULL, balance TEXT NOT NULL, PRIMARY KEY (ledger_index, currency, account))")
+    connection.execute("CREATE TABLE IF NOT EXISTS trustlines (ledger_index INTEGER NOT NULL, issuer TEXT NOT NULL, currency TEXT NOT NULL, position INTEGER NOT NULL, account TEXT NOT NULL, PRIMARY KEY (ledger_index, issuer, currency, position))")
+
+    return connection
+
+
+def read_cached_balances(ledger_index: int, currency: str) -> dict[str, Decimal]:
+    """Reads every cached balance for a given ledger snapshot and currency.
+
+    Args:
+        ledger_index (int): The ledger index the balances were fetched at.
+        currency (str): The currency key the balances were stored under.
+
+    Returns:
+        dict[str, Decimal]: Cached balances per account, or an empty dictionary if nothing is cached or the cache is unreadable.
+    """
+
+    try:
+        with closing(open_ledger_cache()) as connection:
+            rows = connection.execute("SELECT account, balance FROM balances WHERE ledger_index = ? AND currency = ?", (ledger_index, currency))
+
+            return { account: Decimal(balance) for account, balance in rows }
+
+    except:
+        return { }
+
+
+def write_cached_balances(ledger_index: int, currency: str, balances: dict[str, Decimal]) -> bool:
+    """Writes fetched balances for a given ledger snapshot and currency. A ledger snapshot never changes, so these never expire.
+
+    Args:
+        ledger_index (int): The ledger index the balances were fetched at.
+        currency (str): The currency key to store the balances under.
+        balances (dict[str, Decimal]): Balances per account, including zero balances.
+
+    Returns:
+        bool: `True` if the balances were written, `False` otherwise.
+    """
+
+    try:
+        with closing(open_ledger_cache()) as connection:
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO balances VALUES (?, ?, ?, ?)", [ (ledger_index, account, currency, str(balance)) for account, balance in balances.items() ])
+
+        return True
+
+    except:
+        return False
+
+
+def read_cached_trustlines(ledger_index: int, issuer: str, currency: str) -> Union[None, list[str]]:
+    """Reads the cached trustline addresses set against a token at a given ledger snapshot.
+
+    Args:
+        ledger_index (int): The ledger index the trustlines were fetched at.
+        issuer (str): The issuing address.
+        currency (str): The issued token identifier.
+
+    Returns:
+        Union[None, list[str]]: The trustline addresses in their original order, or `None` if nothing is cached.
+    """
+
+    try:
+        with closing(open_ledger_cache()) as connection:
+            rows = connection.execute("SELECT account FROM trustlines WHERE ledger_index = ? AND issuer = ? AND currency = ? ORDER BY position", (ledger_index, issuer, currency)).fetchall()
+
+            if len(rows) <= 0:
+                return None
+
+            return [ account for account, in rows ]
+
+    except:
+        return None
+
+
+def write_cached_trustlines(ledger_index: int, issuer: str, currency: str, trustlines: list[str]) -> bool:
+    """Writes the trustline addresses set against a token at a given ledger snapshot.
+
+    Args:
+        ledger_index (int): The ledger index the trustlines were fetched at.
+        issuer (str): The issuing address.
+        currency (str): The issued token identifier.
+        trustlines (list[str]): The trustline addresses.
+
+    Returns:
+        bool: `True` if the trustlines were written, `False` otherwise.
+    """
+
+    try:
+        with closing(open_ledger_cache()) as connection:
+            with connection:
+                connection.execute("DELETE FROM trustlines WHERE ledger_index = ? AND issuer = ? AND currency = ?", (ledger_index, issuer, currency))
+                connection.executemany("INSERT INTO trustlines VALUES (?, ?, ?, ?, ?)", [ (ledger_index, issuer, currency, position, account) for position, account in enumerate(trustlines) ])
+
+        return True
+
+    except:
+        return False
+
+
+def set_resume(session: AirdropSession, resume: bool) -> None:
+    """Sets whether the balance or distribution journal of a previous run should be resumed instead of started over.
+
+    Args:
+        session (AirdropSession): The session to set the flag of.
+        resume (bool): The resume flag.
+    """
+
+    session.resume = resume is True
+
+
+def get_resume(session: AirdropSession) -> bool:
+    """Returns whether a previously interrupted run should be resumed.
+
+    Args:
+        session (AirdropSession): The session in question.
+
+    Returns:
+        bool: The resume flag.
+    """
+
+    return session.resume
+
+
+def get_balance_journal_path(currency: str) -> str:
+    """Returns the path of the balance journal for a single currency key. Every yielding token gets a journal of its own, so the jobs of a multi-job run don't start each other's journals over.
+
+    Args:
+        currency (str): The currency key balances are fetched for.
+
+    Returns:
+        str: Path of the journal.
+    """
+
+    global JOURNAL_DIR_PATH
+
+    return path.join(JOURNAL_DIR_PATH, f'{ sha256(currency.encode("UTF8")).hexdigest()[:16] }.journal')
+
+
+def read_journal_ledger_index(session: AirdropSession, currencies: list[str]) -> Union[None, int]:
+    """Reads the ledger index a previous run's balance journals were written at, if resuming. Only the journals of the run's own currency keys are considered, as journals of other tokens may have been written at any other ledger. Every journal of a run shares its ledger, so the most recently written one is read.
+
+    Args:
+        session (AirdropSession): The session to resume.
+        currencies (list[str]): The currency keys balances are fetched for.
+
+    Returns:
+        Union[None, int]: The journaled ledger index, or `None` if we're not resuming or there's no readable journal.
+    """
+
+    if not session.resume:
+        return None
+
+    journals = { get_balance_journal_path(currency): currency for currency in currencies if not isinstance(currency, type(None)) }
+    journals = { journal_path: currency for journal_path, currency in journals.items() if path.isfile(journal_path) }
+
+    try:
+        journal_path = max(journals, key=path.getmtime)
+
+        with open(journal_path, "r", encoding="UTF8") as file:
+            ledger_index, currency = file.readline().strip().split(" ", 1)
+
+            # The file name is only a hash of the key, so the header has the final say.
+            if currency != journals[journal_path]:
+                return None
+
+            return int(ledger_index)
+
+    except:
+        return None
+
+
+def open_balance_journal(session: AirdropSession, ledger_index: int, currency: str) -> dict[str, Decimal]:
+    """Opens the append-only balance journal of `currency`. When resuming a journal written for the same ledger and currency, its entries are kept and returned, otherwise the journal is started over.
+
+    Args:
+        session (AirdropSession): The session to open the journal for.
+        ledger_index (int): The ledger index balances are fetched at.
+        currency (str): The currency key balances are fetched for.
+
+    Returns:
+        dict[str, Decimal]: Balances journaled by a previous run, including zero balances.
+    """
+
+    global JOURNAL_DIR_PATH
+
+    header       = f'{ ledger_index } { currency }'
+    journal_path = get_balance_journal_path(currency)
+    journals     = { }
+
+    if session.resume and path.isfile(journal_path):
+
+        try:
+            with open(journal_path, "r", encoding="UTF8") as file:
+                if file.readline().strip() == header:
+
+                    for line in file:
+
+                        # A torn last line is expected if the process died mid-write, we simply fetch that address again.
+                        try:
+                            address, balance = line.strip().split(",")
+                            journals[address] = Decimal(balance)
+
+                        except:
+                            continue
+
+        except:
+            journals = { }
+
+    try:
+        makedirs(JOURNAL_DIR_PATH, exist_ok=True)
+
+        session.balance_journal = open(journal_path, "w", encoding="UTF8")
+
+        session.balance_journal.write(f'{ header }\n')
+
+        for address, balance in journals.items():
+            session.balance_journal.write(f'{ address },{ balance }\n')
+
+        session.balance_journal.flush()
+
+    except:
+        session.balance_journal = None
+
+    return journals
+
+
+def journal_balance(session: AirdropSession, address: str, balance: Union[None, Decimal]) -> None:
+    """Appends a single fetched balance to the balance journal.
+
+    Args:
+        session (AirdropSession): The session holding the open journal.
+        address (str): The trustline address.
+        balance (Union[None, Decimal]): The fetched balance. `None` is journaled as a zero balance.
+    """
+
+    if isinstance(session.balance_journal, type(None)):
+        return
+
+    if isinstance(balance, type(None)):
+        balance = Decimal()
+
+    try:
+        session.balance_journal.write(f'{ address },{ balance }\n')
+        session.balance_journal.flush()
+
+    except:
+        return
+
+
+def close_balance_journal(session: AirdropSession) -> None:
+    """Closes the balance journal, if one is open.
+
+    Args:
+        session (AirdropSession): The session holding the journal.
+    """
+
+    if isinstance(session.balance_journal, type(None)):
+        return
+
+    try:
+        session.balance_journal.close()
+
+    except:
+        pass
+
+    session.balance_journal = None
+
+
+def read_distribution_journal(journal_path: str) -> Union[None, tuple[str, list[dict]]]:
+    """Reads the distribution journal written by a previous run.
+
+    Args:
+        journal_path (str): Path of the journal.
+
+    Returns:
+        Union[None, tuple[str, list[dict]]]: The journal header along with every journaled payment record, or `None` if there's no readable journal.
+    """
+
+    if not path.isfile(journal_path):
+        return None
+
+    records = [ ]
+
+    try:
+        with open(journal_path, "r", encoding="UTF8") as file:
+
+            header = file.readline().strip()
+
+            for line in file:
+
+                # A torn last line is expected if the process died mid-write. Payments are journaled before they're submitted, so nothing is lost.
+                try:
+                    status, destination, amount, sequence, first_ledger, last_ledger, hash = line.strip().split(",")
+
+                    records.append(
+                        {
+                            "status": status,
+                            "destination": destination,
+                            "amount": Decimal(amount),
+                            "sequence": int(sequence) if len(sequence) >= 1 else None,
+                            "first_ledger": int(first_ledger) if len(first_ledger) >= 1 else None,
+                            "last_ledger": int(last_ledger) if len(last_ledger) >= 1 else None,
+                            "hash": hash if len(hash) >= 1 else None
+                        }
+                    )
+
+                except:
+                    continue
+
+        return header, records
+
+    except:
+        return None
+
+
+def open_distribution_journal(session: AirdropSession, journal_path: str, header: str, append: bool) -> bool:
+    """Opens the append-only distribution journal.
+
+    Args:
+        session (AirdropSession): The session to open the journal for.
+        journal_path (str): Path of the journal.
+        header (str): Identifies the distribution the journal belongs to. Only written when starting over.
+        append (bool): Whether to continue the journal of a previous run instead of starting over.
+
+    Returns:
+        bool: `True` if the journal could be opened, `False` otherwise.
+    """
+
+    try:
+        if append and path.isfile(journal_path):
+
+            # A torn last line would swallow the first record appended after it, so it's cut off first.
+            with open(journal_path, "rb+") as file:
+
+                end = file.seek(0, 2)
+
+                while end >= 1:
+                    start = max(0, end - 4096)
+
+                    file.seek(start)
+
+                    newline = file.read(end - start).rfind(b"\n")
+
+                    if newline >= 0:
+                        end = start + newline + 1
+                        break
+
+                    end = start
+
+                if end != file.seek(0, 2):
+                    file.truncate(end)
+                    file.flush()
+
+                    fsync(file.fileno())
+
+            session.distribution_journal = open(journal_path, "a", encoding="UTF8")
+
+            return True
+
+        session.distribution_journal = open(journal_path, "w", encoding="UTF8")
+
+        session.distribution_journal.write(f'{ header }\n')
+        session.distribution_journal.flush()
+
+        fsync(session.distribution_journal.fileno())
+
+        return True
+
+    except:
+        session.distribution_journal = None
+
+        return False
+
+
+def journal_payment(session: AirdropSession, status: str, destination: str, amount: Decimal, sequence: Union[None, int] = None, first_ledger: Union[None, int] = None, last_ledger: Union[None, int] = None, hash: Union[None, str] = None) -> bool:
+    """Appends a single payment record to the distribution journal, making sure it has hit the disk before returning.
+
+    Args:
+        session (AirdropSession): The session holding the open journal.
+        status (str): Either "submitted", written right before a payment is submitted, "sent" or "failed".
+        destination (str): Destination address of the payment.
+        amount (Decimal): Amount of the payment.
+        sequence (Union[None, int]): The sequence the payment was signed with.
+        first_ledger (Union[None, int]): Latest validated ledger index when the payment was signed, or submitted if it was signed ahead of time.
+        last_ledger (Union[None, int]): The `LastLedgerSequence` of the payment, if it has one.
+        hash (Union[None, str]): Hash of the signed payment.
+
+    Returns:
+        bool: `True` if the record was written, `False` otherwise.
+    """
+
+    if isinstance(session.distribution_journal, type(None)):
+        return False
+
+    fields = [ status, destination, amount, sequence, first_ledger, last_ledger, hash ]
+
+    try:
+        session.distribution_journal.write(",".join([ "" if isinstance(field, type(None)) else str(field) for field in fields ]) + "\n")
+        session.distribution_journal.flush()
+
+        fsync(session.distribution_journal.fileno())
+
+        return True
+
+    except:
+        return False
+
+
+def close_distribution_journal(session: AirdropSession) -> None:
+    """Closes the distribution journal, if one is open.
+
+    Args:
+        session (AirdropSession): The session holding the journal.
+    """
+
+    if isinstance(session.distribution_journal, type(None)):
+        return
+
+    try:
+        session.distribution_journal.close()
+
+    except:
+        pass
+
+    session.distribution_journal = None
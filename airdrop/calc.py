@@ -4,60 +4,61 @@
 from decimal import Decimal
 from typing  import Union
 
-AIRDROP_TOTAL_SUM:    Decimal              = Decimal(0.0)
+from airdrop.session import AirdropSession
 
-AIRDROP_TOTAL_BUDGET: Union[None, Decimal] = None
-
-AIRDROP_RATIO:        Union[None, Decimal] = None
-
-def get_budget() -> Union[None, Decimal]:
+def get_budget(session: AirdropSession) -> Union[None, Decimal]:
     """Returns the current airdrop budget state.
 
+    Args:
+        session (AirdropSession): The session in question.
+
     Returns:
         Union[None, Decimal]: The airdrop budget.
     """
 
-    global AIRDROP_TOTAL_BUDGET
-    return AIRDROP_TOTAL_BUDGET
+    return session.budget
 
 
-def get_ratio() -> Union[None, Decimal]:
+def get_ratio(session: AirdropSession) -> Union[None, Decimal]:
     """Returns the current airdrop ratio.
 
+    Args:
+        session (AirdropSession): The session in question.
+
     Returns:
         Union[None, Decimal]: The ratio, which is the budget divided by ratio.
     """
-    global AIRDROP_RATIO
-    return AIRDROP_RATIO
+    return session.ratio
 
 
-def get_sum() -> float:
+def get_sum(session: AirdropSession) -> float:
     """Returns the current airdrop total sum state.
 
+    Args:
+        session (AirdropSession): The session in question.
+
     Returns:
         float: The total sum of all trustline balances.
     """
 
-    global AIRDROP_TOTAL_SUM
-    return AIRDROP_TOTAL_SUM
+    return session.sum
 
 
-def set_airdrop_budget(amount: Union[float, int]) -> bool:
+def set_airdrop_budget(session: AirdropSession, amount: Union[float, int]) -> bool:
     """Sets the total airdrop budget to given `amount`.
 
     Args:
+        session (AirdropSession): The session to set the budget of.
         amount (float): The amount that the budget should be. Preferably represented as a float.
 
     Returns:
         bool: _description_
     """
 
-    global AIRDROP_TOTAL_BUDGET
-
     try:
 
-        if isinstance(AIRDROP_TOTAL_BUDGET, type(None)):
-            AIRDROP_TOTAL_BUDGET = Decimal(amount)
+        if isinstance(session.budget, type(None)):
+            session.budget = Decimal(amount)
 
             return True
 
@@ -67,59 +68,60 @@ def set_airdrop_budget(amount: Union[float, int]) -> bool:
         return False
 
 
-def increment_airdrop_sum(amount: Union[Decimal, list[Decimal]]) -> None:
+def increment_airdrop_sum(session: AirdropSession, amount: Union[Decimal, list[Decimal]]) -> None:
     """Increments the total airdrop sum, which is the total sum of all trustline balances.
 
     Args:
+        session (AirdropSession): The session to increment the sum of.
         amount (Union[Decimal, list[Decimal]]): The amount which to increment with.
     """
 
-    global AIRDROP_TOTAL_SUM
-
     try:
         for balance in amount:
-            AIRDROP_TOTAL_SUM += balance
+            session.sum += balance
 
     except TypeError:
-        AIRDROP_TOTAL_SUM += amount
+        session.sum += amount
 
 
-def calculate_airdrop_ratio() -> bool:
+def calculate_airdrop_ratio(session: AirdropSession) -> bool:
     """Calculates the total airdrop ratio if the prequisites are set.
 
+    Args:
+        session (AirdropSession): The session to calculate the ratio of.
+
     Returns:
         bool: Returns `True` if all prequisites are present, returns `False` otherwise.
     """
 
-    global AIRDROP_TOTAL_BUDGET, AIRDROP_TOTAL_SUM, AIRDROP_RATIO
-
-    if isinstance(AIRDROP_TOTAL_BUDGET, type(None)) or AIRDROP_TOTAL_BUDGET.is_zero():
+    if isinstance(session.budget, type(None)) or session.budget.is_zero():
         return False
 
-    if AIRDROP_TOTAL_SUM.is_zero() or AIRDROP_TOTAL_BUDGET.is_zero():
+    if session.sum.is_zero() or session.budget.is_zero():
 
-        AIRDROP_RATIO = Decimal()
+        session.ratio = Decimal()
 
         return True
 
-    AIRDROP_RATIO = AIRDROP_TOTAL_BUDGET / AIRDROP_TOTAL_SUM
+    session.ratio = session.budget / session.sum
 
     return True
 
 
-def calculate_yield(balance: Decimal) -> Union[float, None]:
+def calculate_yield(session: AirdropSession, balance: Decimal) -> Union[float, None]:
     """Calculates the yield for any given anonymous balance.
 
     Args:
+        session (AirdropSession): The session holding the ratio.
         balance (Decimal): The balance which to multiply.
 
     Returns:
         Union[Decimal, None]: `None` if the ratio hasn't been set, otherwise correct yield.
     """
 
-    global AIRDROP_RATIO
+    ratio = session.ratio
 
-    if isinstance(AIRDROP_RATIO, type(None)):
+    if isinstance(ratio, type(None)):
         return None
 
-    return balance * AIRDROP_RATIO
+    return balance * ratio
@@ -5,10 +5,7 @@ from pathlib import Path
 from typing  import Optional
 from typer   import Option, Typer, Exit
 
-from airdrop.preflight import preflight_validate_yielding_address, preflight_calculate_remaining_steps, preflight_validate_issuing_address, preflight_validate_supply_balance, preflight_validate_data_path, preflight_confirm_distribte, preflight_fetch_metadata, preflight_validate_output, preflight_validate_seed, preflight_print_banner, preflight_check_cache, preflight_confirm_calculate
-from airdrop.steps     import step_validate_distribution_inputs, step_begin_airdrop_distributions, step_begin_airdrop_calculations, step_fetch_trustline_balances, step_calculate_airdrop_yield, step_end_airdrop_calculations, step_fetch_issuer_trustlines, step_validate_calculations, step_distribute_airdrop, step_validate_ratio, step_validate_count
-from airdrop.cache     import rehydrate_terms_of_use
-from airdrop           import __app_version__, __app_name__, console
+from airdrop import __app_version__, __app_name__, console
 
 cli = Typer()
 
@@ -27,6 +24,11 @@ def distribute(
         "-i",
         help="Specifies the issuing address for the distributed token.",
     ),
+    currency: Optional[str] = Option(
+        None,
+        "--currency",
+        help="Specifies the currency code or name of the distributed token, for issuing addresses that have issued several tokens."
+    ),
     budget: Optional[float] = Option(
         None,
         "--budget",
@@ -46,30 +48,111 @@ def distribute(
         help="Specifies the input data & meta files path.",
         resolve_path=True,
         file_okay=True
+    ),
+    endpoints: Optional[Path] = Option(
+        None,
+        "--endpoints",
+        "-n",
+        help="Specifies a JSON file listing the XRPL endpoints to use, along with their weights and concurrency limits.",
+        resolve_path=True,
+        exists=True,
+        file_okay=True,
+        dir_okay=False
+    ),
+    window: int = Option(
+        32,
+        "--window",
+        "-w",
+        help="Specifies how many payments are kept submitted but not yet validated at once. Payments are sent through the heaviest XRPL endpoint."
+    ),
+    ledger_window: int = Option(
+        20,
+        "--ledger-window",
+        help="Specifies how many ledgers past the latest validated one a payment may still be validated in, before it's considered expired and gets resubmitted."
+    ),
+    fee: Optional[int] = Option(
+        None,
+        "--fee",
+        help="Specifies a fixed fee in drops paid by every payment. By default, payments pay the open ledger fee instead."
+    ),
+    max_fee: int = Option(
+        1000,
+        "--max-fee",
+        help="Specifies the most drops a single payment may pay. Payments capped below the open ledger fee get queued, and are resubmitted if the ledger doesn't take them."
+    ),
+    presign: bool = Option(
+        False,
+        "--presign",
+        help="Signs every payment locally without sending any, and saves them into airdrop_signed.csv next to the data files. The cold wallet sequence and fee are only read once for the whole batch."
+    ),
+    signed: bool = Option(
+        False,
+        "--signed",
+        help="Sends the payments previously signed with --presign from airdrop_signed.csv as they are, instead of signing them while sending."
+    ),
+    resume: bool = Option(
+        False,
+        "--resume",
+        "-r",
+        help="Resumes an interrupted distribution. Payments in the distribution journal next to the data files are checked against the ledger, and only the missing ones are sent."
+    ),
+    headless: bool = Option(
+        False,
+        "--headless",
+        "--yes",
+        help="Runs without any prompts or rendering, accepting the terms of use and emitting progress as JSON lines. Every required option has to be given, and failures exit with a non-zero code."
     )
 ):
-    # Pre-preflight stuff
-    console.clear()
-    rehydrate_terms_of_use()
-
-    # Preflight stuff
-    preflight_check_cache()
-    preflight_print_banner()
-    preflight_calculate_remaining_steps(issuing_address, budget, seed, data)
-    preflight_fetch_metadata()
-    preflight_validate_yielding_address(issuing_address)
-    preflight_validate_supply_balance(budget)
-    preflight_validate_seed(seed)
-    preflight_validate_data_path(data)
-    preflight_confirm_distribte()
-
-    # Actual distribution procedure
-    step_begin_airdrop_distributions()
-    step_validate_distribution_inputs()
-    step_validate_count()
-    step_validate_calculations()
-    step_validate_ratio()
-    step_distribute_airdrop()
+    # Subsystems are only imported once a command actually runs, so `--help` and `--version` don't pay for loading xrpl-py.
+    from airdrop.preflight import preflight_validate_yielding_address, preflight_calculate_remaining_steps, preflight_validate_supply_balance, preflight_validate_data_path, preflight_confirm_distribte, preflight_fetch_metadata, preflight_validate_seed, preflight_print_banner, preflight_check_cache, preflight_validate_endpoints, preflight_validate_payment_window, preflight_validate_ledger_window, preflight_validate_payment_fee, preflight_validate_presign, preflight_validate_resume
+    from airdrop.steps     import step_validate_distribution_inputs, step_begin_airdrop_distributions, step_validate_signed_payments, step_open_distribution_journal, step_validate_calculations, step_distribute_airdrop, step_presign_airdrop, step_validate_ratio, step_validate_count
+    from airdrop.cache     import rehydrate_terms_of_use
+    from airdrop.util      import headless_exit_code, set_headless
+    from airdrop.session   import new_session
+
+    set_headless(headless)
+
+    session = new_session()
+
+    with headless_exit_code():
+
+        # Pre-preflight stuff
+        console.clear()
+        rehydrate_terms_of_use()
+
+        # Preflight stuff
+        preflight_check_cache()
+        preflight_print_banner()
+        preflight_calculate_remaining_steps(issuing_address, budget, seed, data)
+        preflight_fetch_metadata()
+        preflight_validate_yielding_address(session, issuing_address, currency)
+        preflight_validate_supply_balance(session, budget)
+        preflight_validate_seed(session, seed)
+        preflight_validate_data_path(session, data)
+        preflight_validate_endpoints(session, endpoints)
+        preflight_validate_payment_window(session, window)
+        preflight_validate_ledger_window(session, ledger_window)
+        preflight_validate_payment_fee(session, fee, max_fee)
+        preflight_validate_presign(presign, signed)
+        preflight_validate_resume(session, resume)
+        preflight_confirm_distribte(session)
+
+        # Actual distribution procedure
+        step_begin_airdrop_distributions(session)
+        step_validate_distribution_inputs(session)
+        step_validate_count(session)
+        step_validate_calculations(session)
+        step_validate_ratio(session)
+
+        if presign:
+            step_presign_airdrop(session)
+            return
+
+        if signed:
+            step_validate_signed_payments(session)
+
+        step_open_distribution_journal(session)
+        step_distribute_airdrop(session)
 
 
 @cli.command(help="Runs airdrop calculations for given issuing address trustline holders.")
@@ -86,6 +169,16 @@ def calculate(
         "-y",
         help="Specifies the the issuing address for the token that is used to calculate the actual airdrop distribution (Issuing token per yield token) itself.",
     ),
+    issuing_currency: Optional[str] = Option(
+        None,
+        "--issuing-currency",
+        help="Specifies the currency code or name of the airdropped token, for issuing addresses that have issued several tokens."
+    ),
+    yielding_currency: Optional[str] = Option(
+        None,
+        "--yielding-currency",
+        help="Specifies the currency code or name of the yielding token, for yielding addresses that have issued several tokens."
+    ),
     budget: Optional[float] = Option(
         None,
         "--budget",
@@ -101,29 +194,114 @@ def calculate(
         file_okay=True,
         dir_okay=False,
         writable=True
+    ),
+    jobs: Optional[Path] = Option(
+        None,
+        "--jobs",
+        "-j",
+        help="Specifies a JSON file listing several airdrops to calculate in a single run, each with a \"budget\", a \"csv\" output path and optionally a \"yielding_address\" and \"yielding_currency\". The issuer's trustlines are only fetched once, and jobs sharing a yielding token share its balances. Replaces --budget and --csv.",
+        resolve_path=True,
+        exists=True,
+        file_okay=True,
+        dir_okay=False
+    ),
+    engine: str = Option(
+        "async",
+        "--engine",
+        "-e",
+        help="Specifies the engine used for fetching trustline balances. Either \"async\", which pipelines many requests over each socket, or \"threaded\"."
+    ),
+    window: int = Option(
+        32,
+        "--window",
+        "-w",
+        help="Specifies how many balance requests are kept in flight per socket. The threaded engine sends them as one batch."
+    ),
+    hedge_after: Optional[float] = Option(
+        None,
+        "--hedge-after",
+        help="Specifies after how many milliseconds the async engine sends a duplicate of a slow balance request to the fastest other endpoint. Disabled by default."
+    ),
+    ledger_index: Optional[int] = Option(
+        None,
+        "--ledger-index",
+        "-l",
+        help="Specifies the ledger index every trustline and balance request is pinned to. Defaults to the latest validated ledger at the start of the run."
+    ),
+    resume: bool = Option(
+        False,
+        "--resume",
+        "-r",
+        help="Resumes an interrupted run, skipping trustlines whose balances were already journaled. Unless --ledger-index is given, the journaled ledger index is reused."
+    ),
+    endpoints: Optional[Path] = Option(
+        None,
+        "--endpoints",
+        "-n",
+        help="Specifies a JSON file listing the XRPL endpoints to use, along with their weights and concurrency limits.",
+        resolve_path=True,
+        exists=True,
+        file_okay=True,
+        dir_okay=False
+    ),
+    headless: bool = Option(
+        False,
+        "--headless",
+        "--yes",
+        help="Runs without any prompts or rendering, accepting the terms of use and emitting progress as JSON lines. Every required option has to be given, and failures exit with a non-zero code."
     )
 ):
-    # Pre-preflight stuff
-    console.clear()
-    rehydrate_terms_of_use()
-
-    # Preflight stuff
-    preflight_check_cache()
-    preflight_print_banner()
-    preflight_calculate_remaining_steps(issuing_address, yielding_address, budget, csv)
-    preflight_fetch_metadata()
-    preflight_validate_issuing_address(issuing_address)
-    preflight_validate_yielding_address(yielding_address)
-    preflight_validate_supply_balance(budget)
-    preflight_validate_output(csv)
-    preflight_confirm_calculate()
-
-    # Main procedure
-    step_begin_airdrop_calculations()
-    step_fetch_issuer_trustlines()
-    step_fetch_trustline_balances()
-    step_calculate_airdrop_yield()
-    step_end_airdrop_calculations()
+    from airdrop.preflight import preflight_validate_yielding_address, preflight_calculate_remaining_steps, preflight_validate_issuing_address, preflight_validate_supply_balance, preflight_fetch_metadata, preflight_validate_output, preflight_print_banner, preflight_check_cache, preflight_confirm_calculate, preflight_validate_balance_engine, preflight_validate_ledger_index, preflight_validate_resume, preflight_validate_endpoints, preflight_validate_jobs
+    from airdrop.steps     import step_begin_airdrop_calculations, step_fetch_trustline_balances, step_calculate_airdrop_yield, step_end_airdrop_calculations, step_fetch_issuer_trustlines, step_run_airdrop_jobs
+    from airdrop.cache     import rehydrate_terms_of_use
+    from airdrop.util      import headless_exit_code, set_headless
+    from airdrop.session   import new_session
+
+    set_headless(headless)
+
+    session = new_session()
+
+    with headless_exit_code():
+
+        # Pre-preflight stuff
+        console.clear()
+        rehydrate_terms_of_use()
+
+        # Preflight stuff
+        preflight_check_cache()
+        preflight_print_banner()
+        preflight_fetch_metadata()
+
+        # Job files carry their own budgets, outputs and optionally yielding tokens.
+        if isinstance(jobs, type(None)):
+            preflight_calculate_remaining_steps(issuing_address, yielding_address, budget, csv)
+            preflight_validate_issuing_address(session, issuing_address, issuing_currency)
+            preflight_validate_yielding_address(session, yielding_address, yielding_currency)
+            preflight_validate_supply_balance(session, budget)
+            preflight_validate_output(session, csv)
+
+        else:
+            preflight_calculate_remaining_steps(issuing_address)
+            preflight_validate_issuing_address(session, issuing_address, issuing_currency)
+            preflight_validate_jobs(session, jobs, yielding_address, yielding_currency)
+
+        preflight_validate_balance_engine(session, engine, window, hedge_after)
+        preflight_validate_ledger_index(session, ledger_index)
+        preflight_validate_resume(session, resume)
+        preflight_validate_endpoints(session, endpoints)
+        preflight_confirm_calculate(session)
+
+        # Main procedure
+        step_begin_airdrop_calculations(session)
+
+        if isinstance(jobs, type(None)):
+            step_fetch_issuer_trustlines(session)
+            step_fetch_trustline_balances(session)
+            step_calculate_airdrop_yield(session)
+            step_end_airdrop_calculations(session)
+
+        else:
+            step_run_airdrop_jobs(session)
 
 
 @cli.callback()
@@ -8,25 +8,24 @@ from sys     import platform
 from csv     import DictWriter
 from os      import environ, lstat, path
 
-CSV_OUTPUT_PATH: Union[None, str] = None
+from airdrop.session import AirdropSession
 
 
-def set_output_path(path: str) -> bool:
+def set_output_path(session: AirdropSession, path: str) -> bool:
     """Sets the CSV file output path to given input.
 
     Args:
+        session (AirdropSession): The session to set the path of.
         path (str): The path itself. If it doesn't end with `.csv` we automatically append the format.
 
     Returns:
         bool: `True` if the path hasn't been defined previously, `False` otherwise
     """
 
-    global CSV_OUTPUT_PATH
-
-    if not isinstance(CSV_OUTPUT_PATH, type(None)):
+    if not isinstance(session.csv, type(None)):
         return False
 
-    CSV_OUTPUT_PATH = path
+    session.csv = path
 
     return True
 
@@ -139,12 +138,14 @@ def generate_csv(output_path: str, headers: list[str], data: list[dict]) -> bool
         return False
 
 
-def get_csv() -> Union[None, str]:
+def get_csv(session: AirdropSession) -> Union[None, str]:
     """Returns the CSV path.
 
+    Args:
+        session (AirdropSession): The session in question.
+
     Returns:
         Union[None, str]: CSV path.
     """
 
-    global CSV_OUTPUT_PATH
-    return CSV_OUTPUT_PATH
+    return session.csv
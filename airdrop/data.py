@@ -4,120 +4,135 @@
 from pathlib import Path
 from decimal import Decimal
 from typing  import Union
-from csv     import reader
+from csv     import DictReader, reader
 
-DATA_FILE_CONTENTS: Union[None, dict[str, Decimal]] = None
+from airdrop.session import AirdropSession
 
-META_FILE_CONTENTS: Union[None, dict[str, Decimal]] = None
 
-DATA_FILE_PATH: Union[None, Path]                   = None
-
-META_FILE_PATH: Union[None, Path]                   = None
-
-BASE_FILE_PATH: Union[None, Path]                   = None
-
-
-def set_path(base_path: Path) -> bool:
+def set_path(session: AirdropSession, base_path: Path) -> bool:
     """Sets the base filepath, which is used for other misc file saving.
 
     Args:
+        session (AirdropSession): The session to set the path of.
         base_path (Path): The base path.
 
     Returns:
         bool: `True` if the base path could be set, `False` otherwise.
     """
 
-    global BASE_FILE_PATH
-
-    if not isinstance(BASE_FILE_PATH, type(None)):
+    if not isinstance(session.base_path, type(None)):
         return False
 
-    BASE_FILE_PATH = base_path
+    session.base_path = base_path
 
     return True
 
-def get_path() -> Union[None, Path]:
+def get_path(session: AirdropSession) -> Union[None, Path]:
     """Returns the base file path.
 
+    Args:
+        session (AirdropSession): The session in question.
+
     Returns:
         Union[None, Path]: Base file path current state.
     """
 
-    global BASE_FILE_PATH
-    return BASE_FILE_PATH
+    return session.base_path
 
 
-def set_data(data: Path) -> bool:
+def set_data(session: AirdropSession, data: Path) -> bool:
     """Sets the data file path. Does some existence checks.
 
     Args:
+        session (AirdropSession): The session to set the path of.
         data (Path): The actual data file path.
 
     Returns:
         bool: `True` if path can be set, if the file exists and IS a file, `False` otherwise.
     """
 
-    global DATA_FILE_PATH
-
-    if not isinstance(DATA_FILE_PATH, type(None)) or not data.exists() or not data.is_file():
+    if not isinstance(session.data_path, type(None)) or not data.exists() or not data.is_file():
         return False
 
-    DATA_FILE_PATH = data
+    session.data_path = data
 
     return True
 
 
-def set_meta(meta: Path) -> bool:
+def set_meta(session: AirdropSession, meta: Path) -> bool:
     """Sets the metadata file path. Does some existence checks.
 
     Args:
+        session (AirdropSession): The session to set the path of.
         meta (Path): The actual metadata file path.
 
     Returns:
         bool: `True` if path can be set, if the file exists and IS a file, `False` otherwise.
     """
 
-    global META_FILE_PATH
+    if not isinstance(session.meta_path, type(None)) or not meta.exists() or not meta.is_file():
+        return False
+
+    session.meta_path = meta
+
+    return True
+
 
-    if not isinstance(META_FILE_PATH, type(None)) or not meta.exists() or not meta.is_file():
+def set_signed(session: AirdropSession, signed: Path) -> bool:
+    """Sets the signed payments file path. Does some existence checks.
+
+    Args:
+        session (AirdropSession): The session to set the path of.
+        signed (Path): The actual signed payments file path.
+
+    Returns:
+        bool: `True` if path can be set, if the file exists and IS a file, `False` otherwise.
+    """
+
+    if not isinstance(session.signed_path, type(None)) or not signed.exists() or not signed.is_file():
         return False
 
-    META_FILE_PATH = meta
+    session.signed_path = signed
 
     return True
 
 
-def get_data() -> Union[None, list[dict[str, Union[str, Decimal, tuple[str, Decimal]]]]]:
+def get_data(session: AirdropSession) -> Union[None, list[dict[str, Union[str, Decimal, tuple[str, Decimal]]]]]:
     """Returns the file contents of the data file.
 
+    Args:
+        session (AirdropSession): The session in question.
+
     Returns:
         Union[None, Path]: The current state of the data file.
     """
 
-    global DATA_FILE_CONTENTS
-    return DATA_FILE_CONTENTS
+    return session.data
 
 
-def get_meta() -> Union[None, dict[str, Decimal]]:
+def get_meta(session: AirdropSession) -> Union[None, dict[str, Decimal]]:
     """Returns the file contents of the metadata file.
 
+    Args:
+        session (AirdropSession): The session in question.
+
     Returns:
         Union[None, Path]: The current state of the meta file.
     """
 
-    global META_FILE_CONTENTS
-    return META_FILE_CONTENTS
+    return session.meta
 
 
-def validate_metadata() -> bool:
+def validate_metadata(session: AirdropSession) -> bool:
     """Validates generated metadata file's contents while also parsing them.
 
+    Args:
+        session (AirdropSession): The session whose metadata file is parsed.
+
     Returns:
         bool: `True` if all required lines are present and got parsed successfully, `False` otherwise.
     """
 
-    global META_FILE_CONTENTS, META_FILE_PATH
-
     meta_file: Union[None, list[str]] = None
     data:      dict[str, Decimal]     = { }
 
@@ -129,15 +144,15 @@ def validate_metadata() -> bool:
     ]
 
     try:
-        with open(META_FILE_PATH) as file:
+        with open(session.meta_path) as file:
 
             meta_file = file.read().splitlines()
 
             if len(meta_file) <= 0:
                 return False
 
-        # We filter out the elapsed time due to it being cosmetic only
-        meta_file       = list(filter(lambda item: "Total elapsed time" not in item, meta_file))
+        # We filter out the elapsed time due to it being cosmetic only, and the ledger index due to it being informational only
+        meta_file       = list(filter(lambda item: "Total elapsed time" not in item and "Ledger index" not in item, meta_file))
         validated_keys = item_keys.copy()
 
         for line in meta_file:
@@ -186,7 +201,7 @@ def validate_metadata() -> bool:
 
             data[key] = line
 
-        META_FILE_CONTENTS = data
+        session.meta = data
 
         return True
 
@@ -194,19 +209,20 @@ def validate_metadata() -> bool:
         return False
 
 
-def validate_data() -> bool:
+def validate_data(session: AirdropSession) -> bool:
     """Validates and categorizes the actual airdrop data.
 
+    Args:
+        session (AirdropSession): The session whose data file is parsed.
+
     Returns:
         bool: `True` if the data has been validated and parsed correctly, `False` otherwise.
     """
 
-    global DATA_FILE_CONTENTS, DATA_FILE_PATH
-
     data_file: Union[None, list[str]] = None
 
     try:
-        with open(DATA_FILE_PATH) as file:
+        with open(session.data_path) as file:
 
             data_file     = file.read().splitlines()
             currency_code = None
@@ -265,7 +281,47 @@ def validate_data() -> bool:
 
             data_file = data
 
-        DATA_FILE_CONTENTS = data_file
+        session.data = data_file
+
+        return True
+
+    except:
+        return False
+
+
+def validate_signed_data(session: AirdropSession) -> bool:
+    """Parses the signed payments file written by `distribute --presign`. Whether the payments match the data file is left for the caller to check.
+
+    Args:
+        session (AirdropSession): The session whose signed payments file is parsed.
+
+    Returns:
+        bool: `True` if every row has been parsed correctly, and rows are ordered by consecutive sequences, `False` otherwise.
+    """
+
+    signed: list[dict[str, Union[str, int, Decimal]]] = [ ]
+
+    try:
+        with open(session.signed_path, encoding="UTF8", newline="") as file:
+
+            for row in DictReader(file):
+
+                signed.append(
+                    {
+                        "destination": row["destination"],
+                        "amount": Decimal(row["amount"]),
+                        "sequence": int(row["sequence"]),
+                        "hash": row["hash"],
+                        "blob": row["blob"]
+                    }
+                )
+
+        for previous, entry in zip(signed, signed[1:]):
+
+            if entry["sequence"] != previous["sequence"] + 1:
+                return False
+
+        session.signed = signed
 
         return True
 
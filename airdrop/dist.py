@@ -2,65 +2,225 @@
 """Author: spunk-developer <xspunk.developer@gmail.com>"""
 
 from xrpl.models.amounts.issued_currency_amount import IssuedCurrencyAmount
-from xrpl.clients.json_rpc_client               import JsonRpcClient
-from xrpl.models.transactions                   import Payment
+from xrpl.models.requests.account_info          import AccountInfo
+from xrpl.models.requests.submit_only           import SubmitOnly
+from xrpl.models.requests.unsubscribe           import Unsubscribe
+from xrpl.models.requests.subscribe             import Subscribe, StreamParameter
+from xrpl.models.requests.ledger                import Ledger
+from xrpl.models.requests.fee                   import Fee
+from xrpl.models.requests.tx                    import Tx
+from xrpl.models.transactions                   import Payment, Transaction
 from xrpl.core.addresscodec                     import is_valid_classic_address
-from xrpl.transaction                           import autofill_and_sign, submit_and_wait
+from xrpl.transaction                           import sign
 from xrpl.wallet                                import Wallet
 from xrpl.utils                                 import xrp_to_drops
+from concurrent.futures                         import ProcessPoolExecutor
+from collections                                import deque
+from itertools                                  import repeat
+from asyncio                                    import AbstractEventLoop, new_event_loop, run_coroutine_threadsafe, sleep
+from threading                                  import Lock, Thread
 from decimal                                    import Decimal, ROUND_DOWN
-from typing                                     import Union
+from typing                                     import Callable, Union
+from os                                         import cpu_count
 
-ACTIVE_WALLET: Union[None, Wallet]        = None
+from airdrop.session import AirdropSession
+from airdrop.xrpl    import AsyncMultiplexedClient, get_endpoints, validate_response
+from airdrop         import console
 
-XRPL_CLIENT:   Union[None, JsonRpcClient] = None
+PAYMENT_LOOP:     Union[None, AbstractEventLoop] = None
 
-from airdrop import console
+PAYMENT_LOCK:     Lock                           = Lock()
 
-def get_client() -> JsonRpcClient:
-    """Similar to `xrpl.get_client()` function, except it returns a JSON-RPC client instead.
+PAYMENT_ATTEMPTS: int                            = 3
+
+BASE_FEE:         int                            = 10
+
+STREAM_TIMEOUT:   float                          = 10.0
+
+SIGNING_WORKERS:  Union[None, int]               = None
+
+
+class PaymentFeeError(ValueError):
+    """Raised when the XRPL asks for a base fee larger than the most drops a single payment may pay, so no payment could ever be applied."""
+
+    def __init__(self, max_fee: int, base_fee: int) -> None:
+        super().__init__(max_fee, base_fee)
+
+        self.max_fee:  int = max_fee
+        self.base_fee: int = base_fee
+
+
+def get_payment_loop() -> AbstractEventLoop:
+    """Returns the event loop every payment is sent from, starting it in a background thread the first time. As the loop outlives any single distribution, so does the payment connection running on it.
+
+    Returns:
+        AbstractEventLoop: The payment event loop.
+    """
+
+    global PAYMENT_LOOP, PAYMENT_LOCK
+
+    with PAYMENT_LOCK:
+
+        if isinstance(PAYMENT_LOOP, type(None)):
+
+            PAYMENT_LOOP = new_event_loop()
+
+            Thread(target=PAYMENT_LOOP.run_forever, daemon=True).start()
+
+    return PAYMENT_LOOP
+
+
+def run_payment_task(session: AirdropSession, coroutine):
+    """Runs `coroutine` on the payment event loop, blocking until it's done. Every blocking entrypoint of the payment engine goes through here. As every task of a session shares its account stream, they run one after another.
+
+    Args:
+        session (AirdropSession): The session whose payment tasks are run one after another.
+        coroutine (Coroutine): The coroutine to run.
+
+    Returns:
+        Any: Whatever the coroutine returned.
+    """
+
+    async def run_exclusively():
+
+        async with session.payment_tasks:
+            return await coroutine
+
+    return run_coroutine_threadsafe(run_exclusively(), get_payment_loop()).result()
+
+
+def get_payment_window(session: AirdropSession) -> int:
+    """Returns the amount of payments we allow to be submitted but not yet validated at once.
+
+    Args:
+        session (AirdropSession): The session in question.
+
+    Returns:
+        int: Current payment window.
+    """
+
+    return session.payment_window
+
+
+def set_payment_window(session: AirdropSession, window: int) -> bool:
+    """Sets the amount of payments we allow to be submitted but not yet validated at once.
+
+    Args:
+        session (AirdropSession): The session to set the window of.
+        window (int): The window size. Must be at least 1.
+
+    Returns:
+        bool: `True` if the window is valid and got set, `False` otherwise.
+    """
+
+    if type(window) is not int or window < 1:
+        return False
+
+    session.payment_window = window
+
+    return True
+
+
+def get_ledger_window(session: AirdropSession) -> int:
+    """Returns how many ledgers past the latest validated one a payment may still be validated in, which is set as its `LastLedgerSequence`.
+
+    Args:
+        session (AirdropSession): The session in question.
 
     Returns:
-        JsonRpcClient: XRPL JSON-RPC client.
+        int: Current ledger window.
     """
 
-    global XRPL_CLIENT
+    return session.ledger_window
 
-    if isinstance(XRPL_CLIENT, type(None)):
 
-        XRPL_CLIENT = JsonRpcClient("https://xrplcluster.com/")
+def set_ledger_window(session: AirdropSession, window: int) -> bool:
+    """Sets how many ledgers past the latest validated one a payment may still be validated in.
 
-    return XRPL_CLIENT
+    Args:
+        session (AirdropSession): The session to set the window of.
+        window (int): The window size. Must be at least 1.
+
+    Returns:
+        bool: `True` if the window is valid and got set, `False` otherwise.
+    """
+
+    if type(window) is not int or window < 1:
+        return False
+
+    session.ledger_window = window
+
+    return True
+
+
+def get_payment_fee(session: AirdropSession) -> tuple[Union[None, int], int]:
+    """Returns the fee strategy every payment is signed with.
+
+    Args:
+        session (AirdropSession): The session in question.
+
+    Returns:
+        tuple[Union[None, int], int]: The fixed fee in drops, or `None` if the open ledger fee is paid instead, along with the most drops a single payment may pay.
+    """
 
+    return session.payment_fee, session.max_payment_fee
 
-def get_wallet() -> Union[None, Wallet]:
-    """Returns the currently active wallet.
+
+def set_payment_fee(session: AirdropSession, fee: Union[None, int], max_fee: int) -> bool:
+    """Sets the fee strategy every payment is signed with. Payments either pay a fixed fee, or whatever it currently costs to get into the open ledger, but never more than `max_fee`. A capped fee below the open ledger fee gets payments queued rather than rejected, as long as it's above the minimum fee. Neither fee may be below the reference base fee of `BASE_FEE` drops, as payments paying less are never applied.
+
+    Args:
+        session (AirdropSession): The session to set the strategy of.
+        fee (Union[None, int]): The fixed fee in drops, or `None` to pay the open ledger fee.
+        max_fee (int): The most drops a single payment may pay. A fixed fee can't be larger.
+
+    Returns:
+        bool: `True` if the strategy is valid and got set, `False` otherwise.
+    """
+
+    global BASE_FEE
+
+    if type(max_fee) is not int or max_fee < BASE_FEE:
+        return False
+
+    if not isinstance(fee, type(None)) and (type(fee) is not int or fee < BASE_FEE or fee > max_fee):
+        return False
+
+    session.payment_fee     = fee
+    session.max_payment_fee = max_fee
+
+    return True
+
+
+def get_wallet(session: AirdropSession) -> Union[None, Wallet]:
+    """Returns the wallet payments are sent from.
+
+    Args:
+        session (AirdropSession): The session in question.
 
     Returns:
         Union[None, Wallet]: Current wallet state.
     """
 
-    global ACTIVE_WALLET
-    return ACTIVE_WALLET
+    return session.wallet
 
 
-def register_wallet(seed: str) -> bool:
-    """Sets the currently used wallet based on the secret (seed).
+def register_wallet(session: AirdropSession, seed: str) -> bool:
+    """Sets the wallet payments are sent from based on the secret (seed).
 
     Args:
+        session (AirdropSession): The session to set the wallet of.
         seed (str): The seed itself.
 
     Returns:
         bool: `True` if the seed is valid and wallet could be created, `False` otherwise.
     """
 
-    global ACTIVE_WALLET
-
-    if not isinstance(ACTIVE_WALLET, type(None)):
+    if not isinstance(session.wallet, type(None)):
         return False
 
     try:
-        ACTIVE_WALLET = Wallet.from_seed(seed)
+        session.wallet = Wallet.from_seed(seed)
 
         return True
 
@@ -68,55 +228,765 @@ def register_wallet(seed: str) -> bool:
         return False
 
 
-def send_token_payment(destination: str, transaction: tuple[str, str, Decimal]) -> bool:
-    """Sends any amount of arbitrary token to `destination` address.
+def build_payment(session: AirdropSession, destination: str, transaction: tuple[str, str, Decimal], **fields) -> Payment:
+    """Builds an unsigned payment of any amount of arbitrary token from the session's wallet to `destination` address.
 
     Args:
+        session (AirdropSession): The session holding the wallet the payment is sent from.
         destination (str): Destination address. Needs to be classic address.
         transaction (tuple[str, str, Decimal]): Actual transaction.
+        **fields: Any other payment fields, like `fee` or `sequence`. Whatever is left out has to be autofilled before signing.
 
     Returns:
-        bool: `True` if the request was successful, `False` otherwise.
+        Payment: The unsigned payment.
     """
 
-    client = get_client()
-    wallet = get_wallet()
+    wallet = get_wallet(session)
 
     issuer, token, amount = transaction
 
+    if token.lower() == "xrp":
+        return Payment(destination=destination, account=wallet.classic_address, amount=xrp_to_drops(amount), **fields)
+
+    return Payment(
+        destination=destination,
+        account=wallet.classic_address,
+        amount=IssuedCurrencyAmount(
+            currency=token,
+            issuer=issuer,
+            value=str(amount.quantize(Decimal('.000001'), rounding=ROUND_DOWN))
+        ),
+        **fields
+    )
+
+
+def send_token_payment(session: AirdropSession, destination: str, transaction: tuple[str, str, Decimal]) -> bool:
+    """Sends any amount of arbitrary token to `destination` address.
+
+    Args:
+        session (AirdropSession): The session holding the wallet and the payment connection.
+        destination (str): Destination address. Needs to be classic address.
+        transaction (tuple[str, str, Decimal]): Actual transaction.
+
+    Returns:
+        bool: `True` if the request was successful, `False` otherwise.
+    """
+
+    if not is_valid_classic_address(destination):
+        return False
+
     try:
-        is_valid_classic_address(destination)
+        return submit_payments(session, [ (destination, transaction) ])[0]
 
     except:
         return False
 
+
+async def fetch_account_sequence(session: AirdropSession, client: AsyncMultiplexedClient) -> tuple[int, int]:
+    """Fetches the next sequence of the session's wallet as of the latest validated ledger.
+
+    Args:
+        session (AirdropSession): The session holding the wallet.
+        client (AsyncMultiplexedClient): Open XRPL WebSocket client.
+
+    Raises:
+        AssertionError: If the XRPL didn't give us a valid response.
+
+    Returns:
+        tuple[int, int]: The sequence and the ledger index.
+    """
+
+    response = await client.request(AccountInfo(account=get_wallet(session).classic_address, ledger_index="validated"))
+
+    validate_response(response)
+
+    return response.result["account_data"]["Sequence"], response.result["ledger_index"]
+
+
+async def fetch_account_state(session: AirdropSession, client: AsyncMultiplexedClient) -> tuple[int, int, str]:
+    """Fetches everything needed to sign payments locally: the next sequence of the session's wallet, the latest validated ledger index and the fee to pay.
+
+    Args:
+        session (AirdropSession): The session holding the wallet and the fee strategy.
+        client (AsyncMultiplexedClient): Open XRPL WebSocket client.
+
+    Raises:
+        AssertionError: If the XRPL didn't give us a valid response.
+        PaymentFeeError: If the XRPL asks for a base fee larger than the maximum fee.
+
+    Returns:
+        tuple[int, int, str]: The sequence, the ledger index and the fee in drops.
+    """
+
+    sequence, ledger = await fetch_account_sequence(session, client)
+
+    return sequence, ledger, await fetch_payment_fee(session, client)
+
+
+async def fetch_payment_fee(session: AirdropSession, client: AsyncMultiplexedClient) -> str:
+    """Picks the fee to pay for the next payments according to the fee strategy set by `set_payment_fee`. The XRPL is only asked for the open ledger fee if no fixed fee is set.
+
+    Args:
+        session (AirdropSession): The session holding the fee strategy.
+        client (AsyncMultiplexedClient): Open XRPL WebSocket client.
+
+    Raises:
+        AssertionError: If the XRPL didn't give us a valid response.
+        PaymentFeeError: If the XRPL asks for a base fee larger than the maximum fee.
+
+    Returns:
+        str: The fee in drops.
+    """
+
+    if not isinstance(session.payment_fee, type(None)):
+        return str(session.payment_fee)
+
+    response = await client.request(Fee())
+
+    validate_response(response)
+
+    drops    = response.result["drops"]
+    base_fee = int(drops["base_fee"])
+
+    # Capping the fee below the base fee would get every single payment rejected.
+    if session.max_payment_fee < base_fee:
+        raise PaymentFeeError(session.max_payment_fee, base_fee)
+
+    return str(min(int(drops["open_ledger_fee"]), session.max_payment_fee))
+
+
+async def get_payment_client(session: AirdropSession) -> AsyncMultiplexedClient:
+    """Returns the client every payment is sent through, connected to the heaviest configured XRPL endpoint. The connection is kept open in between distributions & reconnected only if it got lost, so a session started from an earlier one keeps using it.
+
+    Args:
+        session (AirdropSession): The session holding the endpoints and the payment connection.
+
+    Raises:
+        ConnectionError: If the XRPL endpoint couldn't be connected to.
+
+    Returns:
+        AsyncMultiplexedClient: The open client.
+    """
+
+    endpoint = max(get_endpoints(session), key=lambda endpoint: endpoint.weight)
+
+    if not isinstance(session.payment_client, type(None)) and session.payment_client.is_open() and session.payment_client.url == endpoint.url:
+        return session.payment_client
+
+    if not isinstance(session.payment_client, type(None)) and session.payment_client.is_open():
+        await session.payment_client.close()
+
+    session.payment_client = None
+    session.payment_stream = None
+
+    client = AsyncMultiplexedClient(endpoint.url)
+
+    await client.open()
+
+    session.payment_client = client
+
+    return client
+
+
+async def get_account_stream(session: AirdropSession) -> AsyncMultiplexedClient:
+    """Returns the payment client, subscribed to the session's wallet's transactions and to closed ledgers. The subscription is only renewed if the wallet changed or the connection got lost, and updates left over from an earlier distribution are dropped.
+
+    Args:
+        session (AirdropSession): The session holding the wallet and the payment connection.
+
+    Raises:
+        ConnectionError: If the XRPL endpoint couldn't be connected to.
+        AssertionError: If the XRPL didn't accept the subscription.
+
+    Returns:
+        AsyncMultiplexedClient: The subscribed client.
+    """
+
+    client  = await get_payment_client(session)
+    account = get_wallet(session).classic_address
+
+    if session.payment_stream != account:
+
+        if not isinstance(session.payment_stream, type(None)):
+            validate_response(await client.request(Unsubscribe(accounts=[ session.payment_stream ], streams=[ StreamParameter.LEDGER ])))
+
+        session.payment_stream = None
+
+        validate_response(await client.request(Subscribe(accounts=[ account ], streams=[ StreamParameter.LEDGER ])))
+
+        session.payment_stream = account
+
+    client.clear_messages()
+
+    return client
+
+
+def close_payment_client(session: AirdropSession) -> None:
+    """Closes the payment connection, if it's open. The next distribution connects again.
+
+    Args:
+        session (AirdropSession): The session holding the payment connection.
+    """
+
+    async def close() -> None:
+
+        if not isinstance(session.payment_client, type(None)) and session.payment_client.is_open():
+            await session.payment_client.close()
+
+        session.payment_client = None
+        session.payment_stream = None
+
+    if isinstance(session.payment_client, type(None)):
+        return
+
+    run_payment_task(session, close())
+
+
+async def receive_stream_message(client: AsyncMultiplexedClient) -> dict:
+    """Waits for the next message on the account stream returned by `get_account_stream`.
+
+    Args:
+        client (AsyncMultiplexedClient): The subscribed client.
+
+    Raises:
+        ConnectionError: If the connection was lost.
+        AssertionError: If the XRPL didn't give us a valid response.
+
+    Returns:
+        dict: The message. If the stream stays quiet for `STREAM_TIMEOUT` seconds, a closed ledger message for the latest validated ledger is made up instead, as a quiet stream doesn't mean no ledgers closed.
+    """
+
+    global STREAM_TIMEOUT
+
+    message = await client.receive(STREAM_TIMEOUT)
+
+    if isinstance(message, type(None)):
+        return { "type": "ledgerClosed", "ledger_index": await fetch_validated_ledger_index(client) }
+
+    return message
+
+
+async def fetch_validated_ledger_index(client: AsyncMultiplexedClient) -> int:
+    """Fetches the latest validated ledger index.
+
+    Args:
+        client (AsyncMultiplexedClient): Open XRPL WebSocket client.
+
+    Raises:
+        AssertionError: If the XRPL didn't give us a valid response.
+
+    Returns:
+        int: The ledger index.
+    """
+
+    response = await client.request(Ledger(ledger_index="validated"))
+
+    validate_response(response)
+
+    return response.result["ledger_index"]
+
+
+async def confirm_payment(hash: str, first_ledger: int, last_ledger: int, client: AsyncMultiplexedClient) -> tuple[bool, Union[None, str]]:
+    """Looks up the final outcome of a payment whose ledger window has passed. A payment is only considered missing if the server has every ledger of its window, so it can never be sent twice.
+
+    Args:
+        hash (str): Hash of the signed payment.
+        first_ledger (int): Latest validated ledger index when the payment was submitted.
+        last_ledger (int): The `LastLedgerSequence` of the payment, or the last ledger it could have been validated in.
+        client (AsyncMultiplexedClient): Open XRPL WebSocket client.
+
+    Returns:
+        tuple[bool, Union[None, str]]: Whether the outcome is final, along with the transaction result if the payment made it into a validated ledger, or `None` if it never will.
+    """
+
     try:
-        if token.lower() == "xrp":
-            request = Payment(destination=destination, account=wallet.address, amount=xrp_to_drops(amount))
-            request  = autofill_and_sign(request, client, wallet)
+        response = await client.request(Tx(transaction=hash, min_ledger=first_ledger, max_ledger=last_ledger))
 
-            response = submit_and_wait(request, client)
+    except:
+        return False, None
 
-            if not response.is_successful():
-                return False
+    if response.is_successful():
 
-        else:
-            request = Payment(
-                destination=destination,
-                account=wallet.address,
-                amount=IssuedCurrencyAmount(
-                    currency=token,
-                    issuer=issuer,
-                    value=str(amount.quantize(Decimal('.000001'), rounding=ROUND_DOWN))
-                )
-            )
+        if response.result.get("validated") is True:
+            return True, response.result["meta"]["TransactionResult"]
 
-            response = submit_and_wait(request, client, wallet)
+        return False, None
 
-            if not response.is_successful():
-                return False
+    if response.result.get("error") == "txnNotFound" and response.result.get("searched_all") is True:
+        return True, None
 
-        return True
+    return False, None
+
+
+async def submit_payments_pipelined(session: AirdropSession, payments: list[tuple[str, tuple[str, str, Decimal]]], callback: Union[None, Callable[[int, Union[None, str], bool], None]] = None, on_submit: Union[None, Callable[[int, int, str, Union[None, int], Union[None, int]], None]] = None) -> list[bool]:
+    """Sends payments from the session's wallet by signing them locally with consecutive sequences, and keeping up to the session's payment window of them submitted but not yet validated. Validations are tracked through the account's transaction stream, so many payments can land in each ledger.
+
+    Payments are signed with a `LastLedgerSequence` the session's ledger window ahead, and with the fee picked by `fetch_payment_fee`. Whenever a payment isn't applied, like when its fee was capped below what the ledger currently asks for, or its window passes without it being validated, submitting pauses until every payment in flight has settled. The sequence and fee are then read again and the payment is resubmitted, up to `PAYMENT_ATTEMPTS` times in total. Payments the server holds for a retry are only considered not applied once their window has passed, as it may still apply them until then.
+
+    Args:
+        session (AirdropSession): The session holding the wallet, the payment connection and the payment settings.
+        payments (list[tuple[str, tuple[str, str, Decimal]]]): The payments, each as a destination address along with the actual transaction.
+        callback (Union[None, Callable[[int, Union[None, str], bool], None]]): Optionally called with the index of every payment as soon as it has settled, along with the hash of its last submission, if it made it into a validated ledger, and whether it succeeded.
+        on_submit (Union[None, Callable[[int, int, str, Union[None, int], Union[None, int]], None]]): Optionally called right before every submission with the index of the payment, along with the sequence, hash and ledger window it was signed with. Anything written down here survives the process dying mid-submission.
+
+    Raises:
+        ConnectionError: If the XRPL endpoint couldn't be connected to, or the connection was lost.
+        AssertionError: If the XRPL didn't give us a valid response.
+        PaymentFeeError: If the XRPL asks for a base fee larger than the maximum fee.
+
+    Returns:
+        list[bool]: Whether each payment succeeded, in the same order as `payments`.
+    """
+
+    global PAYMENT_ATTEMPTS
+
+    wallet = get_wallet(session)
+    window = session.ledger_window
+
+    results:   list[bool]                          = [ False ] * len(payments)
+    attempts:  list[int]                           = [ 0 ] * len(payments)
+    pending:   deque[int]                          = deque(range(len(payments)))
+    in_flight: dict[str, tuple[int, int, int]]     = { }
+
+    def settle(index: int, hash: Union[None, str], result: Union[None, str]) -> None:
+
+        results[index] = result == "tesSUCCESS"
+
+        if not isinstance(callback, type(None)):
+            callback(index, hash, results[index])
+
+    def retry(index: int) -> None:
+
+        if attempts[index] >= PAYMENT_ATTEMPTS:
+            settle(index, None, None)
+            return
+
+        pending.appendleft(index)
+
+    client = await get_account_stream(session)
+
+    while len(pending) >= 1:
+
+        sequence, ledger, fee = await fetch_account_state(session, client)
+        stalled               = False
+
+        while len(pending) >= 1 or len(in_flight) >= 1:
+
+            while len(pending) >= 1 and not stalled and len(in_flight) < session.payment_window:
+
+                index                    = pending.popleft()
+                destination, transaction = payments[index]
+                attempts[index]         += 1
+
+                if not is_valid_classic_address(destination):
+                    settle(index, None, None)
+                    continue
+
+                signed = sign(build_payment(session, destination, transaction, sequence=sequence, fee=fee, last_ledger_sequence=ledger + window), wallet)
+
+                if not isinstance(on_submit, type(None)):
+                    on_submit(index, sequence, signed.get_hash(), ledger, ledger + window)
+
+                response = await client.request(SubmitOnly(tx_blob=signed.blob()))
+                result   = response.result.get("engine_result", "") if response.is_successful() else ""
+
+                # Claimed results consume the sequence, so they're only final once validated.
+                if result.startswith(("tes", "tec")) or result in [ "terQUEUED", "terPRE_SEQ" ]:
+                    in_flight[signed.get_hash()] = (index, ledger, ledger + window)
+                    sequence                    += 1
+                    continue
+
+                # Malformed payments will never be applied, no matter how often we resubmit them.
+                if result.startswith("tem"):
+                    settle(index, None, None)
+                    continue
+
+                # Held for a retry by the server, which may still apply it later, so it's settled by its window like any other payment in flight. Until then it leaves a gap every later payment would be stuck behind.
+                if result.startswith("ter"):
+                    in_flight[signed.get_hash()] = (index, ledger, ledger + window)
+                    stalled                      = True
+                    continue
+
+                # Anything else didn't consume the sequence, and can never be applied without being submitted again.
+                stalled = True
+
+                retry(index)
+
+            if len(in_flight) <= 0:
+                break
+
+            message = await receive_stream_message(client)
+
+            if message.get("type") == "transaction" and message.get("validated") is True:
+
+                hash = message.get("transaction", { }).get("hash")
+
+                if hash not in in_flight:
+                    continue
+
+                index, _, _ = in_flight.pop(hash)
+
+                settle(index, hash, message["meta"]["TransactionResult"])
+
+            if message.get("type") == "ledgerClosed":
+
+                ledger = max(ledger, message["ledger_index"])
+
+                for hash, (index, first_ledger, last_ledger) in list(in_flight.items()):
+
+                    if last_ledger >= message["ledger_index"]:
+                        continue
+
+                    final, result = await confirm_payment(hash, first_ledger, last_ledger, client)
+
+                    if not final:
+                        continue
+
+                    in_flight.pop(hash)
+
+                    if not isinstance(result, type(None)):
+                        settle(index, hash, result)
+                        continue
+
+                    stalled = True
+
+                    retry(index)
+
+    return results
+
+
+def submit_payments(session: AirdropSession, payments: list[tuple[str, tuple[str, str, Decimal]]], callback: Union[None, Callable[[int, Union[None, str], bool], None]] = None, on_submit: Union[None, Callable[[int, int, str, Union[None, int], Union[None, int]], None]] = None) -> list[bool]:
+    """Blocking entrypoint for the pipelined payment engine.
+
+    Args:
+        session (AirdropSession): The session holding the wallet, the payment connection and the payment settings.
+        payments (list[tuple[str, tuple[str, str, Decimal]]]): The payments, each as a destination address along with the actual transaction.
+        callback (Union[None, Callable[[int, Union[None, str], bool], None]]): Optionally called with the index of every payment as soon as it has settled, along with the hash of its last submission and whether it succeeded.
+        on_submit (Union[None, Callable[[int, int, str, Union[None, int], Union[None, int]], None]]): Optionally called right before every submission with the index of the payment, along with its sequence, hash and ledger window.
+
+    Returns:
+        list[bool]: Whether each payment succeeded, in the same order as `payments`.
+    """
+
+    return run_payment_task(session, submit_payments_pipelined(session, payments, callback, on_submit))
+
+
+def sign_payment(payment: Payment, wallet: Wallet) -> tuple[str, str]:
+    """Signs a single payment. Lives at module level so it can run in a worker process.
+
+    Args:
+        payment (Payment): The payment, with every field filled in.
+        wallet (Wallet): The wallet to sign with.
+
+    Returns:
+        tuple[str, str]: The hash & blob of the signed payment.
+    """
+
+    signed = sign(payment, wallet)
+
+    return signed.get_hash(), signed.blob()
+
+
+def sign_payments(session: AirdropSession, payments: list[tuple[str, tuple[str, str, Decimal]]], sequence: int, fee: str) -> list[tuple[int, str, str]]:
+    """Signs payments from the session's wallet ahead of time, with consecutive sequences starting from `sequence`. Signing is CPU-bound, so it's spread across `SIGNING_WORKERS` processes.
+
+    The payments don't carry a `LastLedgerSequence`, so they can be submitted any time later. As each one has its own sequence, none of them can be applied more than once.
+
+    Args:
+        session (AirdropSession): The session holding the wallet.
+        payments (list[tuple[str, tuple[str, str, Decimal]]]): The payments, each as a destination address along with the actual transaction.
+        sequence (int): The next sequence of the session's wallet.
+        fee (str): The fee in drops paid by every payment.
+
+    Returns:
+        list[tuple[int, str, str]]: The sequence, hash & blob of every signed payment, in the same order as `payments`.
+    """
+
+    global SIGNING_WORKERS
+
+    wallet   = get_wallet(session)
+    workers  = SIGNING_WORKERS if not isinstance(SIGNING_WORKERS, type(None)) else cpu_count() or 1
+    unsigned = [ build_payment(session, destination, transaction, sequence=sequence + index, fee=fee) for index, (destination, transaction) in enumerate(payments) ]
+
+    if workers <= 1 or len(unsigned) <= 1:
+        signed = [ sign_payment(payment, wallet) for payment in unsigned ]
+
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            signed = list(executor.map(sign_payment, unsigned, repeat(wallet), chunksize=max(1, len(unsigned) // (workers * 4))))
+
+    return [ (payment.sequence, hash, blob) for payment, (hash, blob) in zip(unsigned, signed) ]
+
+
+def verify_signed_payment(session: AirdropSession, destination: str, transaction: tuple[str, str, Decimal], sequence: int, hash: str, blob: str) -> bool:
+    """Makes sure a payment signed ahead of time is exactly the given payment from the session's wallet, so a modified blob file can't send anything else.
+
+    Args:
+        session (AirdropSession): The session holding the wallet.
+        destination (str): Destination address. Needs to be classic address.
+        transaction (tuple[str, str, Decimal]): Actual transaction.
+        sequence (int): The sequence the payment was signed with.
+        hash (str): The hash of the signed payment.
+        blob (str): The signed payment itself.
+
+    Returns:
+        bool: `True` if the blob holds the given payment and hash, `False` otherwise.
+    """
+
+    try:
+        signed   = Transaction.from_blob(blob)
+        expected = Transaction.from_blob(build_payment(session, destination, transaction, sequence=sequence, fee=signed.fee).blob())
+
+        if not isinstance(signed, Payment) or signed.get_hash() != hash or signed.sequence != sequence:
+            return False
+
+        return signed.account == expected.account and signed.destination == expected.destination and signed.amount == expected.amount
 
     except:
         return False
+
+
+def fetch_signing_state(session: AirdropSession) -> tuple[int, str]:
+    """Fetches the next sequence of the session's wallet and the fee to pay, which is everything needed to sign a batch of payments ahead of time.
+
+    Args:
+        session (AirdropSession): The session holding the wallet, the payment connection and the fee strategy.
+
+    Raises:
+        ConnectionError: If the XRPL endpoint couldn't be connected to.
+        AssertionError: If the XRPL didn't give us a valid response.
+        PaymentFeeError: If the XRPL asks for a base fee larger than the maximum fee.
+
+    Returns:
+        tuple[int, str]: The sequence and the fee in drops.
+    """
+
+    async def fetch() -> tuple[int, str]:
+
+        sequence, _, fee = await fetch_account_state(session, await get_payment_client(session))
+
+        return sequence, fee
+
+    return run_payment_task(session, fetch())
+
+
+async def submit_signed_pipelined(session: AirdropSession, signed: list[tuple[int, str, str]], callback: Union[None, Callable[[int, Union[None, str], Union[None, bool]], None]] = None, on_submit: Union[None, Callable[[int, int, str, Union[None, int], Union[None, int]], None]] = None) -> list[Union[None, bool]]:
+    """Submits payments signed ahead of time by `sign_payments`, in sequence order, keeping up to the session's payment window of them submitted but not yet validated.
+
+    The blobs can't be signed again, so a blob that isn't applied is simply resubmitted once every payment in flight has settled, up to `PAYMENT_ATTEMPTS` times in total. Each blob carries its own sequence, so resubmitting one can never pay twice. Only blobs that can never be applied fail, while blobs that run out of attempts have an unknown outcome, as the server may still hold them. Once the account's sequence has moved past a blob without it being validated, the blob is looked up. If it can't be found in a validated ledger, its outcome is unknown, as the endpoint may not hold the ledger it was validated in.
+
+    Args:
+        session (AirdropSession): The session holding the payment connection and the payment settings.
+        signed (list[tuple[int, str, str]]): The sequence, hash & blob of every signed payment, ordered by sequence.
+        callback (Union[None, Callable[[int, Union[None, str], Union[None, bool]], None]]): Optionally called with the index of every payment as soon as it has settled, along with its hash, if it made it into a validated ledger, and whether it succeeded, or `None` if that's unknown.
+        on_submit (Union[None, Callable[[int, int, str, Union[None, int], Union[None, int]], None]]): Optionally called right before every submission with the index of the payment, along with its sequence, the latest validated ledger index and hash. Presigned payments have no `LastLedgerSequence`, so it's given as `None`.
+
+    Raises:
+        ConnectionError: If the XRPL endpoint couldn't be connected to, or the connection was lost.
+        AssertionError: If the XRPL didn't give us a valid response.
+
+    Returns:
+        list[Union[None, bool]]: Whether each payment succeeded, or `None` if that's unknown, in the same order as `signed`.
+    """
+
+    global PAYMENT_ATTEMPTS
+
+    results:   list[Union[None, bool]]    = [ False ] * len(signed)
+    attempts:  list[int]                  = [ 0 ] * len(signed)
+    pending:   deque[int]                 = deque(range(len(signed)))
+    in_flight: dict[str, tuple[int, int]] = { }
+
+    def settle(index: int, hash: Union[None, str], result: Union[None, str], known: bool = True) -> None:
+
+        results[index] = result == "tesSUCCESS" if known else None
+
+        if not isinstance(callback, type(None)):
+            callback(index, hash, results[index])
+
+    def retry(index: int) -> None:
+
+        # The blob may still be held somewhere and applied later, so running out of attempts doesn't make it a failure.
+        if attempts[index] >= PAYMENT_ATTEMPTS:
+            settle(index, signed[index][1], None, False)
+            return
+
+        pending.append(index)
+
+    async def confirm(index: int) -> None:
+
+        _, hash, _ = signed[index]
+
+        try:
+            response = await client.request(Tx(transaction=hash))
+
+        except:
+            response = None
+
+        if not isinstance(response, type(None)) and response.is_successful() and response.result.get("validated") is True:
+            settle(index, hash, response.result["meta"]["TransactionResult"])
+            return
+
+        # The sequence is gone, but this very blob may have taken it in a ledger the endpoint doesn't hold, so it's left for --resume to reconcile.
+        settle(index, hash, None, False)
+
+    client = await get_account_stream(session)
+
+    while len(pending) >= 1:
+
+        _, ledger = await fetch_account_sequence(session, client)
+        stalled   = False
+        pending   = deque(sorted(pending))
+
+        while len(pending) >= 1 or len(in_flight) >= 1:
+
+            while len(pending) >= 1 and not stalled and len(in_flight) < session.payment_window:
+
+                index                = pending.popleft()
+                sequence, hash, blob = signed[index]
+                attempts[index]     += 1
+
+                if not isinstance(on_submit, type(None)):
+                    on_submit(index, sequence, hash, ledger, None)
+
+                response = await client.request(SubmitOnly(tx_blob=blob))
+                result   = response.result.get("engine_result", "") if response.is_successful() else ""
+
+                if result.startswith(("tes", "tec")) or result in [ "terQUEUED", "terPRE_SEQ" ]:
+                    in_flight[hash] = (index, ledger)
+                    continue
+
+                # The sequence has already been used, possibly by this very blob in an earlier run.
+                if result in [ "tefPAST_SEQ", "tefALREADY" ]:
+                    await confirm(index)
+                    continue
+
+                # Malformed blobs, or blobs the account can never apply, like ones signed with a key it no longer accepts.
+                if result.startswith(("tem", "tef")):
+                    settle(index, None, None)
+                    continue
+
+                stalled = True
+
+                retry(index)
+
+            if len(in_flight) <= 0:
+                break
+
+            message = await receive_stream_message(client)
+
+            if message.get("type") == "transaction" and message.get("validated") is True:
+
+                hash = message.get("transaction", { }).get("hash")
+
+                if hash not in in_flight:
+                    continue
+
+                index, _ = in_flight.pop(hash)
+
+                settle(index, hash, message["meta"]["TransactionResult"])
+
+            if message.get("type") == "ledgerClosed":
+
+                ledger = max(ledger, message["ledger_index"])
+                stale  = [ hash for hash, (_, submitted) in in_flight.items() if ledger - submitted > session.ledger_window ]
+
+                if len(stale) <= 0:
+                    continue
+
+                sequence, _ = await fetch_account_sequence(session, client)
+
+                for hash in stale:
+
+                    index, _ = in_flight.pop(hash)
+
+                    if signed[index][0] < sequence:
+                        await confirm(index)
+                        continue
+
+                    # Still waiting on an earlier sequence, so it goes back in line behind it.
+                    stalled = True
+
+                    retry(index)
+
+    return results
+
+
+def submit_signed_payments(session: AirdropSession, signed: list[tuple[int, str, str]], callback: Union[None, Callable[[int, Union[None, str], Union[None, bool]], None]] = None, on_submit: Union[None, Callable[[int, int, str, Union[None, int], Union[None, int]], None]] = None) -> list[Union[None, bool]]:
+    """Blocking entrypoint for submitting payments signed ahead of time.
+
+    Args:
+        session (AirdropSession): The session holding the payment connection and the payment settings.
+        signed (list[tuple[int, str, str]]): The sequence, hash & blob of every signed payment, ordered by sequence.
+        callback (Union[None, Callable[[int, Union[None, str], Union[None, bool]], None]]): Optionally called with the index of every payment as soon as it has settled, along with its hash and whether it succeeded, or `None` if that's unknown.
+        on_submit (Union[None, Callable[[int, int, str, Union[None, int], Union[None, int]], None]]): Optionally called right before every submission with the index of the payment, along with its sequence and hash.
+
+    Returns:
+        list[Union[None, bool]]: Whether each payment succeeded, or `None` if that's unknown, in the same order as `signed`.
+    """
+
+    return run_payment_task(session, submit_signed_pipelined(session, signed, callback, on_submit))
+
+
+async def reconcile_payments_pipelined(session: AirdropSession, submissions: dict[str, tuple[int, Union[None, int], Union[None, int]]]) -> dict[str, tuple[bool, Union[None, str]]]:
+    """Looks up the outcome of payments submitted by an interrupted run. Payments signed with a ledger window are only looked up once the latest window has passed, so a payment that isn't found can never be validated anymore. Payments without one are only considered missing once the account's sequence has moved past them, and they can't be found in any ledger from their first submission up to the one their sequence was used in.
+
+    Args:
+        session (AirdropSession): The session holding the wallet and the payment connection.
+        submissions (dict[str, tuple[int, Union[None, int], Union[None, int]]]): The hash of every submitted payment, along with its sequence, the latest validated ledger index when it was first submitted, and its `LastLedgerSequence`, if it has one.
+
+    Raises:
+        ConnectionError: If the XRPL endpoint couldn't be connected to, or the connection was lost.
+        AssertionError: If the XRPL didn't give us a valid response.
+
+    Returns:
+        dict[str, tuple[bool, Union[None, str]]]: Whether the outcome of each payment is final, along with the transaction result if it made it into a validated ledger, or `None` if it never will.
+    """
+
+    outcomes = { }
+    windows  = [ last_ledger for _, _, last_ledger in submissions.values() if not isinstance(last_ledger, type(None)) ]
+    client   = await get_payment_client(session)
+
+    while len(windows) >= 1 and await fetch_validated_ledger_index(client) <= max(windows):
+        await sleep(1)
+
+    sequence, ledger = await fetch_account_sequence(session, client)
+
+    for hash, (payment_sequence, first_ledger, last_ledger) in submissions.items():
+
+        if not isinstance(last_ledger, type(None)):
+            outcomes[hash] = await confirm_payment(hash, first_ledger, last_ledger, client)
+            continue
+
+        # Once its sequence is used, a presigned payment was either validated since its first submission, or never will be.
+        if not isinstance(first_ledger, type(None)) and payment_sequence < sequence:
+            outcomes[hash] = await confirm_payment(hash, first_ledger, ledger, client)
+            continue
+
+        try:
+            response = await client.request(Tx(transaction=hash))
+
+        except:
+            outcomes[hash] = (False, None)
+            continue
+
+        if response.is_successful() and response.result.get("validated") is True:
+            outcomes[hash] = (True, response.result["meta"]["TransactionResult"])
+
+        else:
+            outcomes[hash] = (False, None)
+
+    return outcomes
+
+
+def reconcile_payments(session: AirdropSession, submissions: dict[str, tuple[int, Union[None, int], Union[None, int]]]) -> dict[str, tuple[bool, Union[None, str]]]:
+    """Blocking entrypoint for `reconcile_payments_pipelined`.
+
+    Args:
+        session (AirdropSession): The session holding the wallet and the payment connection.
+        submissions (dict[str, tuple[int, Union[None, int], Union[None, int]]]): The hash of every submitted payment, along with its sequence, the latest validated ledger index when it was first submitted, and its `LastLedgerSequence`, if it has one.
+
+    Returns:
+        dict[str, tuple[bool, Union[None, str]]]: Whether the outcome of each payment is final, along with the transaction result if it made it into a validated ledger, or `None` if it never will.
+    """
+
+    return run_payment_task(session, reconcile_payments_pipelined(session, submissions))
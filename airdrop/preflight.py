@@ -2,30 +2,31 @@
 """Author: spunk-developer <xspunk.developer@gmail.com>                                            """
 
 from xrpl.core.addresscodec import XRPLAddressCodecException, decode_seed
-from cache_to_disk          import delete_disk_caches_for_function, delete_old_disk_caches
 from rich.prompt            import IntPrompt, Confirm, Prompt
 from rich.text              import Text
 from pathlib                import Path
 from typing                 import Union
+from json                   import load
 from typer                  import Exit
 from os                     import path
 
-from airdrop.cache import accept_terms_of_use, get_terms_of_use
-from airdrop.calc  import set_airdrop_budget, get_budget
-from airdrop.data  import set_data, set_meta, set_path, get_path
-from airdrop.dist  import register_wallet, get_wallet
-from airdrop.xrpl  import update_issuing_metadata, fetch_xrpl_metadata, update_yielding_token, get_yielding, get_issuer
-from airdrop.util  import get_layout_with_renderable
-from airdrop.csv   import set_output_path, is_path_valid, get_csv
-from airdrop       import console, i18n, t
+from airdrop.session import AirdropSession
+from airdrop.cache   import accept_terms_of_use, get_terms_of_use, delete_token_index, read_issued_tokens, find_issued_token, has_token_index, set_resume
+from airdrop.steps   import set_balance_engine, set_airdrop_jobs, get_airdrop_jobs
+from airdrop.calc    import set_airdrop_budget, get_budget
+from airdrop.data    import set_data, set_meta, set_path, get_path
+from airdrop.dist    import register_wallet, set_payment_window, set_ledger_window, set_payment_fee, get_wallet, BASE_FEE
+from airdrop.xrpl    import update_issuing_metadata, fetch_xrpl_metadata, update_yielding_token, get_ledger_index, set_ledger_index, set_endpoints, get_yielding, get_issuer
+from airdrop.util    import get_layout_with_renderable, is_headless
+from airdrop.csv     import set_output_path, is_path_valid, get_csv
+from airdrop.aio     import set_request_window, set_hedge_after
+from airdrop         import console, i18n, t
 
-CSV_PATH:      Union[None, str]                 = None
+CSV_PATH:               Union[None, str] = None
 
-XRPL_METADATA: dict[str, list[tuple[str, str]]] = { }
+REQUIRED_PARAMS_MISSING                  = 0
 
-REQUIRED_PARAMS_MISSING                         = 0
-
-REQUIRED_PARAMS_VISITED                         = 0
+REQUIRED_PARAMS_VISITED                  = 0
 
 
 def preflight_calculate_remaining_steps(*args) -> None:
@@ -40,12 +41,10 @@ def preflight_calculate_remaining_steps(*args) -> None:
 
 
 def preflight_check_cache() -> None:
-    """Confirms with user if they want to use pre-existing cache or not.
+    """Confirms with user if they want to use pre-existing cache or not. When running headless, the cache is always kept.
     """
 
-    delete_old_disk_caches()
-
-    if not isinstance(fetch_xrpl_metadata.cache_size(), type(None)):
+    if has_token_index() and not is_headless():
 
         user_input = console.input(i18n.rehydrate.metadata_cache)
 
@@ -56,7 +55,7 @@ def preflight_check_cache() -> None:
 
             if user_input.lower() == "no" or user_input.lower() == "n":
 
-                delete_disk_caches_for_function("fetch_xrpl_metadata")
+                delete_token_index()
                 break
 
             user_input = console.input(i18n.rehydrate.metadata_error)
@@ -65,12 +64,16 @@ def preflight_check_cache() -> None:
 
 
 def preflight_print_banner() -> None:
-    """Generates and prints the Airdrop application banner.
+    """Generates and prints the Airdrop application banner. When running headless, the terms of use are accepted on the user's behalf, as passing `--yes` is taken as consent.
 
     Raises:
         Exit: If for some reason the banner generation fails, or console environment is messed up.
     """
 
+    if is_headless():
+        accept_terms_of_use()
+        return
+
     try:
 
         if not get_terms_of_use():
@@ -111,36 +114,38 @@ def preflight_fetch_metadata() -> None:
         Exit: Whenever requests to XRPLMeta fail due to connection issues.
     """
 
-    global XRPL_METADATA
-
     try:
         with console.status(i18n.preflight.metadata_fetch, spinner="dots") as status:
 
             status.start()
 
-            try:
-                XRPL_METADATA = fetch_xrpl_metadata()
-            except Exception as e:
-                console.print(e)
+            fetch_xrpl_metadata()
 
             status.stop()
 
+    # Without a reachable XRPLMeta or a local index to fall back on, we can't validate any addresses.
     except:
         console.print(i18n.preflight.error_fetch_failed)
         raise Exit()
 
 
-def preflight_validate_issuing_address(address) -> None:
+def preflight_validate_issuing_address(session: AirdropSession, address, currency: Union[None, str] = None) -> None:
     """Validates & sets the source issuing address, allowing the user to pick which issued token they wish to use.
 
     Args:
+        session (AirdropSession): The session to set up.
         address (str): The source issuing address.
+        currency (Union[None, str]): Optionally picks the issued token by its currency code or name, instead of asking the user.
 
     Raises:
-        Exit: Either due to an invalid source address, or whenever attempting to override a pre-existing source address.
+        Exit: Either due to an invalid source address, a token that can't be picked, or whenever attempting to override a pre-existing source address.
     """
 
-    global REQUIRED_PARAMS_MISSING, REQUIRED_PARAMS_VISITED, XRPL_METADATA
+    global REQUIRED_PARAMS_MISSING, REQUIRED_PARAMS_VISITED
+
+    if isinstance(address, type(None)) and is_headless():
+        console.print(t(i18n.preflight.error_headless_missing, value="issuing address"))
+        raise Exit()
 
     if isinstance(address, type(None)):
 
@@ -150,7 +155,9 @@ def preflight_validate_issuing_address(address) -> None:
 
         while True:
 
-            if user_input in XRPL_METADATA:
+            issued_tokens = read_issued_tokens(user_input)
+
+            if len(issued_tokens) >= 1:
                 break
 
             user_input = console.input(t(i18n.preflight.error_issuer_invalid, address=user_input))
@@ -158,29 +165,43 @@ def preflight_validate_issuing_address(address) -> None:
         address = user_input
         console.clear()
 
-    elif address not in XRPL_METADATA:
-        console.print(t(i18n.preflight.error_issuer_missing, address=address))
-        raise Exit()
+    else:
+        issued_tokens = read_issued_tokens(address)
+
+        if len(issued_tokens) <= 0:
+            console.print(t(i18n.preflight.error_issuer_missing, address=address))
+            raise Exit()
 
-    issued_tokens_len = len(XRPL_METADATA[address])
+    issued_tokens_len = len(issued_tokens)
     target_token_id   = None
 
-    if issued_tokens_len >= 2:
+    if not isinstance(currency, type(None)):
+        target_token_id = find_issued_token(issued_tokens, currency)
+
+        if isinstance(target_token_id, type(None)):
+            console.print(t(i18n.preflight.error_token_missing, address=address, currency=currency))
+            raise Exit()
+
+    elif issued_tokens_len >= 2 and is_headless():
+        console.print(t(i18n.preflight.error_token_ambiguous, address=address, total=issued_tokens_len))
+        raise Exit()
+
+    elif issued_tokens_len >= 2:
 
         choice_list = ""
         choice_idx  = [ ]
         choices     = [ ]
         idx         = 0
 
-        for id, name in XRPL_METADATA[address]:
+        for id, name in issued_tokens:
 
             newline = "\n"
             idx += 1
 
             choice_idx.append(f'{ idx }')
-            choices.append(id)
+            choices.append((id, name))
 
-            if idx == len(XRPL_METADATA[address]):
+            if idx == issued_tokens_len:
                 newline = ""
 
             if type(name) is str:
@@ -193,26 +214,33 @@ def preflight_validate_issuing_address(address) -> None:
         target_token_id = choices[chosen_idx - 1]
 
     else:
-        target_token_id = XRPL_METADATA[address][0]
+        target_token_id = issued_tokens[0]
 
-    if not update_issuing_metadata(address, target_token_id):
+    if not update_issuing_metadata(session, address, target_token_id):
         console.print(t(i18n.preflight.error_issuer_overwrite, address=address))
         raise Exit()
 
 
-def preflight_validate_yielding_address(address) -> None:
+def preflight_validate_yielding_address(session: AirdropSession, address, currency: Union[None, str] = None) -> None:
     """Validates the "yield" address for the airdrop. Optionally allows user to specify the yield address as XRP.
 
     Args:
+        session (AirdropSession): The session to set up.
         address (str): Actual address, or just "XRP".
+        currency (Union[None, str]): Optionally picks the issued token by its currency code or name, instead of asking the user.
 
     Raises:
-        Exit: If yielding address doesn't exist, or target token has already been set.
+        Exit: If yielding address doesn't exist, the token can't be picked, or target token has already been set.
     """
 
     global REQUIRED_PARAMS_MISSING, REQUIRED_PARAMS_VISITED
 
-    token = None
+    token         = None
+    issued_tokens = [ ]
+
+    if isinstance(address, type(None)) and is_headless():
+        console.print(t(i18n.preflight.error_headless_missing, value="yielding address"))
+        raise Exit()
 
     if isinstance(address, type(None)):
 
@@ -226,7 +254,9 @@ def preflight_validate_yielding_address(address) -> None:
                 token = ("XRP", None)
                 break
 
-            if user_input in XRPL_METADATA:
+            issued_tokens = read_issued_tokens(user_input)
+
+            if len(issued_tokens) >= 1:
                 break
 
             user_input = console.input(t(i18n.preflight.error_issuer_invalid, address=address))
@@ -235,28 +265,38 @@ def preflight_validate_yielding_address(address) -> None:
         console.clear()
 
     else:
-        if address not in XRPL_METADATA:
+        if type(address) is str and address.lower() == "xrp":
+            token = ("XRP", None)
 
-            if type(address) is str and address.lower() == "xrp":
-                token = ("XRP", None)
+        else:
+            issued_tokens = read_issued_tokens(address)
 
-            else:
+            if len(issued_tokens) <= 0:
                 console.print(t(i18n.preflight.error_yielding_missing, address=address))
                 raise Exit()
 
     if address.lower() != "xrp":
-        issued_tokens = XRPL_METADATA[address]
-
         issued_tokens_len = len(issued_tokens)
 
-        if issued_tokens_len >= 2:
+        if not isinstance(currency, type(None)):
+            token = find_issued_token(issued_tokens, currency)
+
+            if isinstance(token, type(None)):
+                console.print(t(i18n.preflight.error_token_missing, address=address, currency=currency))
+                raise Exit()
+
+        elif issued_tokens_len >= 2 and is_headless():
+            console.print(t(i18n.preflight.error_token_ambiguous, address=address, total=issued_tokens_len))
+            raise Exit()
+
+        elif issued_tokens_len >= 2:
 
             choice_list = ""
             choice_idx  = [ ]
             choices     = [ ]
             idx         = 0
 
-            for id, name in XRPL_METADATA[address]:
+            for id, name in issued_tokens:
 
                 newline = "\n"
                 idx    += 1
@@ -264,7 +304,7 @@ def preflight_validate_yielding_address(address) -> None:
                 choice_idx.append(f'{ idx }')
                 choices.append((id, name))
 
-                if idx == len(XRPL_METADATA[address]):
+                if idx == issued_tokens_len:
                     newline = ""
 
                 if type(name) is str:
@@ -277,19 +317,20 @@ def preflight_validate_yielding_address(address) -> None:
             token      = choices[chosen_idx - 1]
 
         else:
-            token = XRPL_METADATA[address][0]
+            token = issued_tokens[0]
 
     id, name = token
 
-    if not update_yielding_token((address, (id, name))):
+    if not update_yielding_token(session, (address, (id, name))):
         console.print(t(i18n.preflight.error_yielding_overwrite, address=address))
         raise Exit()
 
 
-def preflight_validate_supply_balance(input) -> None:
+def preflight_validate_supply_balance(session: AirdropSession, input) -> None:
     """Validates any arbitrary `input` value to see if it is a number that is greater than 0.
 
     Args:
+        session (AirdropSession): The session to set up.
         input (Any): Arbitrary input object which gets validated as a number and cast to a float.
 
     Raises:
@@ -297,6 +338,10 @@ def preflight_validate_supply_balance(input) -> None:
     """
     global REQUIRED_PARAMS_MISSING, REQUIRED_PARAMS_VISITED
 
+    if isinstance(input, type(None)) and is_headless():
+        console.print(t(i18n.preflight.error_headless_missing, value="budget"))
+        raise Exit()
+
     # In the case that balance wasn't passed into the CLI as a parameter, we ask the user directly.
     if isinstance(input, type(None)):
         REQUIRED_PARAMS_VISITED += 1
@@ -319,15 +364,16 @@ def preflight_validate_supply_balance(input) -> None:
         console.print(t(i18n.preflight.error_maximum, value=input))
         raise Exit()
 
-    if not set_airdrop_budget(validated_input):
+    if not set_airdrop_budget(session, validated_input):
         console.print(i18n.preflight.error_overwrite)
         raise Exit()
 
 
-def preflight_validate_output(output_path) -> None:
-    """Validates the CSV output if it exists,
+def preflight_validate_output(session: AirdropSession, output_path) -> None:
+    """Validates the CSV output if it exists. When running headless without a path, no CSV is written and the yields are emitted as JSON lines instead.
 
     Args:
+        session (AirdropSession): The session to set up.
         output_path (Union[str, None]): The path where to save the CSV file. May end with the CSV filename.
 
     Raises:
@@ -336,6 +382,9 @@ def preflight_validate_output(output_path) -> None:
 
     global REQUIRED_PARAMS_MISSING, REQUIRED_PARAMS_VISITED
 
+    if isinstance(output_path, type(None)) and is_headless():
+        return
+
     if isinstance(output_path, type(None)):
 
         REQUIRED_PARAMS_VISITED += 1
@@ -367,24 +416,266 @@ def preflight_validate_output(output_path) -> None:
         if not is_path_valid(output_path):
             raise RuntimeError()
 
-        set_output_path(output_path)
+        set_output_path(session, output_path)
 
     except:
         console.print(t(i18n.preflight.error_empty_path, path=output_path))
         raise Exit()
 
 
-def preflight_confirm_calculate() -> None:
+def preflight_validate_jobs(session: AirdropSession, jobs_path: Path, yielding_address: Union[None, str], yielding_currency: Union[None, str]) -> None:
+    """Reads & validates a JSON file listing several airdrops to calculate against the issuer's holder set in a single run. Every job has a `budget` and a `csv` output path, and optionally a `yielding_address` and `yielding_currency`, which default to the ones given on the command line.
+
+    Args:
+        session (AirdropSession): The session to set up.
+        jobs_path (Path): Path to the job file.
+        yielding_address (Union[None, str]): Yielding address used by jobs that don't specify their own, or "XRP".
+        yielding_currency (Union[None, str]): Currency code or name used by jobs that don't specify their own.
+
+    Raises:
+        Exit: If the file can't be read, or any of the jobs are invalid.
+    """
+
+    try:
+        with open(jobs_path, "r", encoding="UTF8") as file:
+            config = load(file)
+
+        if type(config) is not list or len(config) <= 0 or not all([ type(job) is dict for job in config ]):
+            raise ValueError()
+
+    except:
+        console.print(t(i18n.preflight.error_jobs, path=jobs_path))
+        raise Exit()
+
+    jobs    = [ ]
+    outputs = set()
+
+    for number, job in enumerate(config, start=1):
+
+        address  = job.get("yielding_address", yielding_address)
+        currency = job.get("yielding_currency", yielding_currency)
+        output   = job.get("csv")
+        token    = None
+
+        try:
+            budget = float(job.get("budget"))
+
+        except:
+            console.print(t(i18n.preflight.error_job, job=number, path=jobs_path, reason=f'Budget "{ job.get("budget") }" is not a number'))
+            raise Exit()
+
+        if budget <= 0 or budget > 100000000000000000:
+            console.print(t(i18n.preflight.error_job, job=number, path=jobs_path, reason=f'Budget "{ budget }" must be larger than 0 and at most 100000000000000000'))
+            raise Exit()
+
+        if type(address) is not str:
+            console.print(t(i18n.preflight.error_job, job=number, path=jobs_path, reason="No yielding address was given"))
+            raise Exit()
+
+        if address.lower() == "xrp":
+            token = ("XRP", None)
+
+        else:
+            issued_tokens = read_issued_tokens(address)
+
+            if type(currency) is str:
+                token = find_issued_token(issued_tokens, currency)
+
+            elif len(issued_tokens) == 1:
+                token = issued_tokens[0]
+
+            if isinstance(token, type(None)):
+                console.print(t(i18n.preflight.error_job, job=number, path=jobs_path, reason=f'Could not pick a yielding token issued by "{ address }". Please make sure the address has issued tokens, and give a "yielding_currency" if it has issued several'))
+                raise Exit()
+
+        if type(output) is not str or len(output) <= 0:
+            console.print(t(i18n.preflight.error_job, job=number, path=jobs_path, reason="No CSV output path was given"))
+            raise Exit()
+
+        output = path.abspath(path.normpath(path.expanduser(output)))
+
+        # Every job writes its own data & metadata files, so two jobs sharing a path would overwrite each other.
+        if not is_path_valid(output) or output in outputs:
+            console.print(t(i18n.preflight.error_job, job=number, path=jobs_path, reason=f'CSV output path "{ output }" is either invalid or used by another job'))
+            raise Exit()
+
+        outputs.add(output)
+
+        jobs.append({ "budget": budget, "yielding": (address, token), "csv": output })
+
+    if not set_airdrop_jobs(session, jobs):
+        console.print(t(i18n.preflight.error_jobs, path=jobs_path))
+        raise Exit()
+
+
+def preflight_validate_balance_engine(session: AirdropSession, engine: str, window: int, hedge_after: Union[None, float]) -> None:
+    """Validates & sets the engine used for fetching trustline balances, along with the request window and the asyncio engine hedging threshold.
+
+    Args:
+        session (AirdropSession): The session to set up.
+        engine (str): Either "async" or "threaded".
+        window (int): Amount of requests kept in flight per socket.
+        hedge_after (Union[None, float]): Milliseconds after which the asyncio engine duplicates a slow request to another endpoint, or `None`.
+
+    Raises:
+        Exit: If the engine is unknown, the window is smaller than 1, or the hedging threshold isn't positive.
+    """
+
+    if not set_balance_engine(session, engine):
+        console.print(t(i18n.preflight.error_engine, engine=engine))
+        raise Exit()
+
+    if not set_request_window(session, window):
+        console.print(t(i18n.preflight.error_window, window=window))
+        raise Exit()
+
+    if not set_hedge_after(session, hedge_after):
+        console.print(t(i18n.preflight.error_hedge, hedge=hedge_after))
+        raise Exit()
+
+
+def preflight_validate_payment_window(session: AirdropSession, window: int) -> None:
+    """Validates & sets the amount of payments kept submitted but not yet validated at once.
+
+    Args:
+        session (AirdropSession): The session to set up.
+        window (int): The payment window.
+
+    Raises:
+        Exit: If the window is smaller than 1.
+    """
+
+    if not set_payment_window(session, window):
+        console.print(t(i18n.preflight.error_payment_window, window=window))
+        raise Exit()
+
+
+def preflight_validate_ledger_window(session: AirdropSession, window: int) -> None:
+    """Validates & sets how many ledgers past the latest validated one a payment may still be validated in.
+
+    Args:
+        session (AirdropSession): The session to set up.
+        window (int): The ledger window.
+
+    Raises:
+        Exit: If the window is smaller than 1.
+    """
+
+    if not set_ledger_window(session, window):
+        console.print(t(i18n.preflight.error_ledger_window, window=window))
+        raise Exit()
+
+
+def preflight_validate_payment_fee(session: AirdropSession, fee: Union[None, int], max_fee: int) -> None:
+    """Validates & sets the fee strategy. Payments either pay a fixed fee, or the open ledger fee capped at the maximum fee.
+
+    Args:
+        session (AirdropSession): The session to set up.
+        fee (Union[None, int]): The fixed fee in drops, or `None` to pay the open ledger fee.
+        max_fee (int): The most drops a single payment may pay.
+
+    Raises:
+        Exit: If either fee is below the reference base fee, or the fixed fee exceeds the maximum fee.
+    """
+
+    if not set_payment_fee(session, fee, max_fee):
+        console.print(t(i18n.preflight.error_payment_fee, fee=fee, max_fee=max_fee, base_fee=BASE_FEE))
+        raise Exit()
+
+
+def preflight_validate_presign(presign: bool, signed: bool) -> None:
+    """Makes sure the distribution either signs payments ahead of time or sends previously signed ones, but not both.
+
+    Args:
+        presign (bool): Whether payments should only be signed.
+        signed (bool): Whether previously signed payments should be sent.
+
+    Raises:
+        Exit: If both were asked for.
+    """
+
+    if presign and signed:
+        console.print(i18n.preflight.error_presign_signed)
+        raise Exit()
+
+
+def preflight_validate_endpoints(session: AirdropSession, config_path: Union[None, Path]) -> None:
+    """Reads & sets the XRPL endpoints from a JSON configuration file. The file holds a `websocket` list of endpoints, each with an `url` and optionally a `weight` and `concurrency`. Payments are sent through the heaviest one; a `json_rpc` address left over from older configurations is ignored.
+
+    Args:
+        session (AirdropSession): The session to set up.
+        config_path (Union[None, Path]): Path to the configuration file, or `None` to use the public XRPL endpoints.
+
+    Raises:
+        Exit: If the file can't be read, or any of the endpoints are invalid.
+    """
+
+    if isinstance(config_path, type(None)):
+        return
+
+    try:
+        with open(config_path, "r", encoding="UTF8") as file:
+            config = load(file)
+
+        if "websocket" in config and not set_endpoints(session, config["websocket"]):
+            raise ValueError()
+
+    except:
+        console.print(t(i18n.preflight.error_endpoints, path=config_path))
+        raise Exit()
+
+
+def preflight_validate_ledger_index(session: AirdropSession, ledger_index: Union[None, int]) -> None:
+    """Validates & pins the ledger index used for the whole calculation run. If no index is given, the latest validated ledger gets pinned once the calculations begin.
+
+    Args:
+        session (AirdropSession): The session to set up.
+        ledger_index (Union[None, int]): The ledger index, or `None`.
+
+    Raises:
+        Exit: If the ledger index is not a positive whole number.
+    """
+
+    if isinstance(ledger_index, type(None)):
+        return
+
+    if not set_ledger_index(session, ledger_index):
+        console.print(t(i18n.preflight.error_ledger_index, ledger=ledger_index))
+        raise Exit()
+
+
+def preflight_validate_resume(session: AirdropSession, resume: bool) -> None:
+    """Sets whether the balance or distribution journal of a previously interrupted run should be resumed.
+
+    Args:
+        session (AirdropSession): The session to set up.
+        resume (bool): The resume flag.
+    """
+
+    set_resume(session, resume)
+
+
+def preflight_confirm_calculate(session: AirdropSession) -> None:
     """Prints all the chosen options into terminal, allowing the user to double check their inputs being right.
 
+    Args:
+        session (AirdropSession): The session to confirm.
+
     Raises:
         Exit: If the user exits.
     """
 
-    yielding = get_yielding()
-    issuing  = get_issuer()
-    budget   = get_budget()
-    csv      = get_csv()
+    if is_headless():
+        return
+
+    if len(get_airdrop_jobs(session)) >= 1:
+        preflight_confirm_jobs(session)
+        return
+
+    yielding = get_yielding(session)
+    issuing  = get_issuer(session)
+    budget   = get_budget(session)
+    csv      = get_csv(session)
 
     final_yielding = None
     final_issuing  = None
@@ -409,7 +700,7 @@ def preflight_confirm_calculate() -> None:
 
     final_budget = f'{ budget }'
 
-    confirm = Confirm.ask(t(i18n.preflight.confirm_preflight_calculate, issuing=final_issuing, yielding=final_yielding, budget=final_budget, csv=csv), default=True)
+    confirm = Confirm.ask(t(i18n.preflight.confirm_preflight_calculate, issuing=final_issuing, yielding=final_yielding, budget=final_budget, ledger=get_ledger_index(session), csv=csv), default=True)
 
     if confirm is not True:
         raise Exit()
@@ -417,16 +708,59 @@ def preflight_confirm_calculate() -> None:
         console.clear()
 
 
-def preflight_confirm_distribte() -> None:
+def preflight_confirm_jobs(session: AirdropSession) -> None:
+    """Prints every queued airdrop job into terminal, allowing the user to double check them before the run.
+
+    Args:
+        session (AirdropSession): The session to confirm.
+
+    Raises:
+        Exit: If the user exits.
+    """
+
+    issuing = get_issuer(session)
+    token   = issuing[1]
+    jobs    = [ ]
+
+    final_issuing = token[0]
+
+    if type(token[1]) is str:
+        final_issuing = f'{ token[0] } ({ token[1] })'
+
+    for number, job in enumerate(get_airdrop_jobs(session), start=1):
+        address, (id, name) = job["yielding"]
+
+        final_yielding = id
+
+        if type(name) is str:
+            final_yielding = f'{ id } ({ name })'
+
+        jobs.append(f'   #{ number }: budget { job["budget"] }, yield token { final_yielding }, output { job["csv"] }')
+
+    confirm = Confirm.ask(t(i18n.preflight.confirm_preflight_jobs, issuing=final_issuing, ledger=get_ledger_index(session), jobs="\n".join(jobs)), default=True)
+
+    if confirm is not True:
+        raise Exit()
+    else:
+        console.clear()
+
+
+def preflight_confirm_distribte(session: AirdropSession) -> None:
     """Prints all chosen distribution options into console.
 
+    Args:
+        session (AirdropSession): The session to confirm.
+
     Raises:
         Exit: If user didn't accept the choices.
     """
 
-    issuer, currency = get_yielding()
-    wallet           = get_wallet()
-    filepaths        = get_path()
+    if is_headless():
+        return
+
+    issuer, currency = get_yielding(session)
+    wallet           = get_wallet(session)
+    filepaths        = get_path(session)
 
     token_name = None
     token_id   = None
@@ -458,10 +792,11 @@ def preflight_confirm_distribte() -> None:
 
     console.clear()
 
-def preflight_validate_seed(seed: Union[str, None]) -> None:
+def preflight_validate_seed(session: AirdropSession, seed: Union[str, None]) -> None:
     """Validates the input seed address which'll be used for getting the cold wallet.
 
     Args:
+        session (AirdropSession): The session to set up.
         seed (Union[str, None]): The input seed, or none.
 
     Raises:
@@ -470,6 +805,10 @@ def preflight_validate_seed(seed: Union[str, None]) -> None:
 
     global REQUIRED_PARAMS_VISITED, REQUIRED_PARAMS_MISSING
 
+    if isinstance(seed, type(None)) and is_headless():
+        console.print(t(i18n.preflight.error_headless_missing, value="seed"))
+        raise Exit()
+
     if isinstance(seed, type(None)):
 
         REQUIRED_PARAMS_VISITED += 1
@@ -498,7 +837,7 @@ def preflight_validate_seed(seed: Union[str, None]) -> None:
     try:
         decode_seed(seed)
 
-        if not register_wallet(seed):
+        if not register_wallet(session, seed):
 
             raise XRPLAddressCodecException()
 
@@ -506,10 +845,11 @@ def preflight_validate_seed(seed: Union[str, None]) -> None:
         console.print(t(i18n.preflight.error_seed, seed=seed))
         raise Exit()
 
-def preflight_validate_data_path(input_path: Union[Path, None]) -> None:
+def preflight_validate_data_path(session: AirdropSession, input_path: Union[Path, None]) -> None:
     """Validates and sets the required datafile paths.
 
     Args:
+        session (AirdropSession): The session to set up.
         input_path (Union[Path, None]): The actual path itself.
 
     Raises:
@@ -518,6 +858,10 @@ def preflight_validate_data_path(input_path: Union[Path, None]) -> None:
 
     global REQUIRED_PARAMS_VISITED, REQUIRED_PARAMS_MISSING
 
+    if isinstance(input_path, type(None)) and is_headless():
+        console.print(t(i18n.preflight.error_headless_missing, value="data path"))
+        raise Exit()
+
     if isinstance(input_path, type(None)):
 
         REQUIRED_PARAMS_VISITED += 1
@@ -549,15 +893,15 @@ def preflight_validate_data_path(input_path: Union[Path, None]) -> None:
     meta = Path(input_path, "airdrop_metadata.txt")
     data = Path(input_path, "airdrop_data.csv")
 
-    if not set_meta(meta):
+    if not set_meta(session, meta):
         console.print(t(i18n.preflight.error_filepaths, filetype="airdrop_metadata.txt", filepath=meta.absolute()))
         raise Exit()
 
-    if not set_data(data):
+    if not set_data(session, data):
         console.print(t(i18n.preflight.error_filepaths, filetype="airdrop_data.csv", filepath=data.absolute()))
         raise Exit()
 
-    if not set_path(input_path):
+    if not set_path(session, input_path):
         console.print(t(i18n.preflight.error_filepaths, filetype="", filepath=input_path.absolute()))
         raise Exit()
 
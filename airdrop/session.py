@@ -0,0 +1,95 @@
+"""State of a single airdrop calculation or distribution.  """
+"""Author: spunk-developer <xspunk.developer@gmail.com>   """
+
+from dataclasses import dataclass, field
+from xrpl.wallet import Wallet
+from decimal     import Decimal
+from asyncio     import Lock as AsyncLock
+from pathlib     import Path
+from typing      import TextIO, Union
+
+
+@dataclass
+class AirdropSession():
+    """Everything a single airdrop calculation or distribution reads & writes, handed to every step and helper taking part in it. Sessions don't share any state, so several of them can run side by side in one process. Only rate limiters, endpoint latencies and the token index are kept per process, as they describe the endpoints and XRPLMeta rather than a run."""
+
+    # Tokens, as `(address, (currency, name))`
+    issuer:               Union[None, tuple[str, tuple[str, Union[None, str]]]] = None
+    yielding:             Union[None, tuple[str, tuple[str, Union[None, str]]]] = None
+    ledger_index:         Union[None, int]                                      = None
+
+    # Calculations
+    budget:               Union[None, Decimal]                                  = None
+    sum:                  Decimal                                               = field(default_factory=Decimal)
+    ratio:                Union[None, Decimal]                                  = None
+    csv:                  Union[None, str]                                      = None
+    jobs:                 list[dict]                                            = field(default_factory=list)
+
+    # Balance engine
+    engine:               str                                                   = "async"
+    request_window:       int                                                   = 32
+    hedge_after:          Union[None, float]                                    = None
+
+    # Fetched data
+    start_time:           Union[None, float]                                    = None
+    trustlines:           list[str]                                             = field(default_factory=list)
+    balances:             dict[str, Decimal]                                    = field(default_factory=dict)
+    yields:               dict[str, Decimal]                                    = field(default_factory=dict)
+    single_pass:          bool                                                  = False
+    absent:               set[tuple[int, str, str, Union[None, str]]]           = field(default_factory=set)
+    resume:               bool                                                  = False
+    balance_journal:      Union[None, TextIO]                                   = None
+
+    # Connections
+    endpoints:            list["Endpoint"]                                      = field(default_factory=list)
+    pool:                 Union[None, "ClientPool"]                             = None
+    client:               Union[None, "MultiplexedClient"]                      = None
+    payment_client:       Union[None, "AsyncMultiplexedClient"]                 = None
+    payment_stream:       Union[None, str]                                      = None
+    payment_tasks:        AsyncLock                                             = field(default_factory=AsyncLock)
+
+    # Distribution
+    wallet:               Union[None, Wallet]                                   = None
+    base_path:            Union[None, Path]                                     = None
+    data_path:            Union[None, Path]                                     = None
+    meta_path:            Union[None, Path]                                     = None
+    data:                 Union[None, list[dict]]                               = None
+    meta:                 Union[None, dict[str, Decimal]]                       = None
+    signed_path:          Union[None, Path]                                     = None
+    signed:               Union[None, list[dict]]                               = None
+    journaled:            dict[str, Union[None, str]]                           = field(default_factory=dict)
+    distribution_journal: Union[None, TextIO]                                   = None
+    payment_window:       int                                                   = 32
+    ledger_window:        int                                                   = 20
+    payment_fee:          Union[None, int]                                      = None
+    max_payment_fee:      int                                                   = 1000
+
+
+def new_session(previous: Union[None, AirdropSession] = None) -> AirdropSession:
+    """Creates a fresh session. A warm process can run airdrops back to back without reconnecting, by starting each session from the one before it, which hands over its endpoints and open connections.
+
+    Args:
+        previous (Union[None, AirdropSession]): A finished session whose endpoints & connections are taken over. It's left without any, so closing it can't close them.
+
+    Returns:
+        AirdropSession: The new session.
+    """
+
+    session = AirdropSession()
+
+    if isinstance(previous, type(None)):
+        return session
+
+    session.endpoints      = previous.endpoints
+    session.pool           = previous.pool
+    session.client         = previous.client
+    session.payment_client = previous.payment_client
+    session.payment_stream = previous.payment_stream
+    session.payment_tasks  = previous.payment_tasks
+
+    previous.pool           = None
+    previous.client         = None
+    previous.payment_client = None
+    previous.payment_stream = None
+
+    return session
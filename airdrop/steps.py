@@ -1,40 +1,91 @@
 """The actual procdere steps needed to finish the whole airdrop."""
 """Author: spunk-developer <xspunk.developer@gmail.com>         """
 
-from rich.progress import Progress
-from rich.padding  import Padding
-from rich.table    import Table
-from rich.text     import Text
-from datetime      import timedelta
-from decimal       import Decimal
-from typing        import Union
-from typer         import Exit
-from time          import time
-from os            import path
+from xrpl.core.addresscodec import is_valid_classic_address
+from rich.progress          import Progress
+from rich.padding           import Padding
+from rich.table             import Table
+from rich.text              import Text
+from datetime               import timedelta
+from decimal                import Decimal
+from pathlib                import Path
+from typing                 import Union
+from typer                  import Exit
+from time                   import time
+from os                     import path
+
+from airdrop.session import AirdropSession
+from airdrop.thread  import fetch_trustline_balances_threaded
+from airdrop.cache   import write_cached_trustlines, read_cached_trustlines, write_cached_balances, read_cached_balances, read_journal_ledger_index, close_balance_journal, open_balance_journal, journal_balance, read_distribution_journal, open_distribution_journal, close_distribution_journal, journal_payment, get_resume
+from airdrop.aio     import fetch_trustline_balances_async
+from airdrop.data    import validate_metadata, validate_signed_data, validate_data, set_signed
+from airdrop.dist    import submit_signed_payments, verify_signed_payment, fetch_signing_state, reconcile_payments, submit_payments, sign_payments, PaymentFeeError
+from airdrop.xrpl    import fetch_trustlines_with_balances, iter_trustlines, get_balance_key, get_client, get_ledger_index, set_ledger_index, pin_ledger_index, populate_clients, dispose_clients, get_request_attempts, BalanceFetchError
+from airdrop.calc    import calculate_airdrop_ratio, calculate_yield, increment_airdrop_sum
+from airdrop.util    import get_layout_with_renderable, is_headless, emit
+from airdrop.csv     import generate_metadata, generate_csv
+from airdrop         import console, i18n, t
+
+
+def set_balance_engine(session: AirdropSession, engine: str) -> bool:
+    """Sets which engine is used for fetching trustline balances.
+
+    Args:
+        session (AirdropSession): The session to set the engine of.
+        engine (str): Either "async" or "threaded".
+
+    Returns:
+        bool: `True` if `engine` is a known engine, `False` otherwise.
+    """
+
+    if engine not in [ "async", "threaded" ]:
+        return False
+
+    session.engine = engine
+
+    return True
+
+
+def get_airdrop_jobs(session: AirdropSession) -> list[dict]:
+    """Returns the airdrop jobs queued from a job file.
+
+    Args:
+        session (AirdropSession): The session in question.
+
+    Returns:
+        list[dict]: Every job, holding its `budget`, `yielding` token and `csv` output path. Empty unless a job file was given.
+    """
+
+    return session.jobs
 
-from airdrop.thread import fetch_trustline_balances_threaded
-from airdrop.data   import validate_metadata, validate_data, get_meta, get_data, get_path
-from airdrop.dist   import send_token_payment
-from airdrop.xrpl   import fetch_trustlines, get_yielding, get_client, get_issuer, populate_clients, dispose_clients
-from airdrop.calc   import calculate_airdrop_ratio, calculate_yield, increment_airdrop_sum, get_budget, get_ratio, get_sum
-from airdrop.util   import get_layout_with_renderable
-from airdrop.csv    import generate_metadata, generate_csv, get_csv
-from airdrop        import console, i18n, t
 
-AIRDROP_START_TIME:         Union[None, float] = None
+def set_airdrop_jobs(session: AirdropSession, jobs: list[dict]) -> bool:
+    """Queues airdrop jobs, which are all calculated against a single fetch of the issuer's trustlines.
 
-FETCHED_TRUSTLINE_BALANCES: dict[str, Decimal] = { }
+    Args:
+        session (AirdropSession): The session to queue the jobs in.
+        jobs (list[dict]): Every job, holding its `budget`, `yielding` token and `csv` output path.
 
-FETCHED_TARGET_TRUSTLINES:  list[str]          = [ ]
+    Returns:
+        bool: `True` if no jobs were queued previously and `jobs` isn't empty, `False` otherwise.
+    """
+
+    if len(session.jobs) >= 1 or len(jobs) <= 0:
+        return False
+
+    session.jobs = jobs
 
-INDIVIDUAL_TRUSTILE_YIELD:  dict[str, Decimal] = { }
+    return True
 
-def step_begin_airdrop_calculations() -> None:
-    """Prints the beginning message and takes a time snapshot for future timings."""
 
-    global AIRDROP_START_TIME
+def step_begin_airdrop_calculations(session: AirdropSession) -> None:
+    """Prints the beginning message and takes a time snapshot for future timings.
+
+    Args:
+        session (AirdropSession): The session to run in.
+    """
 
-    AIRDROP_START_TIME = time()
+    session.start_time = time()
 
     start_marker = Text.assemble(
         ("B" , "#902EF4"), ("e" , "#7F41FE"), ("g" , "#6C50FF"),
@@ -52,17 +103,31 @@ def step_begin_airdrop_calculations() -> None:
 
     console.print(Padding(start_marker, (1, 2)))
 
-    if not populate_clients():
+    if not populate_clients(session):
         console.print(i18n.steps.error_clients)
         raise Exit()
 
+    # Resumed runs continue on the ledger their own journals were written at, unless a ledger was given explicitly.
+    journal_ledger_index = read_journal_ledger_index(session, [ get_balance_key(job["yielding"]) for job in session.jobs ] if len(session.jobs) >= 1 else [ get_balance_key(session.yielding) ])
+
+    if not isinstance(journal_ledger_index, type(None)):
+        set_ledger_index(session, journal_ledger_index)
+
+    if not pin_ledger_index(session, get_client(session)):
+        console.print(i18n.steps.error_ledger)
+        raise Exit()
+
+    console.print(t(i18n.steps.ledger_pinned, ledger=get_ledger_index(session)))
+
 
-def step_begin_airdrop_distributions() -> None:
-    """Prints the beginning message and takes a time snapshot for future timings."""
+def step_begin_airdrop_distributions(session: AirdropSession) -> None:
+    """Prints the beginning message and takes a time snapshot for future timings.
 
-    global AIRDROP_START_TIME
+    Args:
+        session (AirdropSession): The session to run in.
+    """
 
-    AIRDROP_START_TIME = time()
+    session.start_time = time()
 
     start_marker = Text.assemble(
         ("B" , "#902EF4"), ("e" , "#7F41FE"), ("g" , "#6C50FF"),
@@ -81,27 +146,61 @@ def step_begin_airdrop_distributions() -> None:
     console.print(Padding(start_marker, (1, 2)))
 
 
-def step_fetch_issuer_trustlines():
+def step_fetch_issuer_trustlines(session: AirdropSession):
     """Begins the initial part of the airdrop process - Fetching the trustlines set against a given token.
 
+    Args:
+        session (AirdropSession): The session to run in.
+
     Raises:
         Exit: If the request fails or returns un-validated data from the XRPL.
     """
 
-    global FETCHED_TARGET_TRUSTLINES
-
-    issuing_metadata = get_issuer()
+    issuing_metadata = session.issuer
+    yielding         = session.yielding
 
     address = issuing_metadata[0]
     token   = issuing_metadata[1]
 
-    start_time = time()
+    # When the yield is the issued token itself, the issuer's lines already carry every holder's balance.
+    session.single_pass = yielding[0] == address and yielding[1][0] == token[0]
+
+    ledger_index = get_ledger_index(session)
+    start_time   = time()
+
+    # A pinned ledger snapshot never changes, so a previous run's trustlines are as good as fresh ones. Their balances are then served by the balance cache.
+    if type(ledger_index) is int:
+        cached = read_cached_trustlines(ledger_index, address, token[0])
 
-    with get_client() as client:
+        if not isinstance(cached, type(None)):
+            session.trustlines  = cached
+            session.single_pass = False
+
+            console.print(t(i18n.steps.trustlines_fetch_success, count=len(session.trustlines), address=address, delta=timedelta(seconds=int(time() - start_time))))
+            emit("trustlines", count=len(session.trustlines), cached=True)
+            return
+
+    with get_client(session) as client:
         with console.status(t(i18n.steps.trustlines_fetch, address=address), spinner="dots") as status:
             try:
                 status.start()
-                FETCHED_TARGET_TRUSTLINES = fetch_trustlines(address, token[0], client)
+
+                if session.single_pass:
+                    balances = fetch_trustlines_with_balances(session, address, token[0], client)
+
+                    session.trustlines = list(balances.keys())
+                    session.balances   = { holder: balance for holder, balance in balances.items() if not balance.is_zero() }
+
+                    if type(ledger_index) is int:
+                        write_cached_balances(ledger_index, get_balance_key(session.yielding), balances)
+
+                else:
+                    session.trustlines = [ ]
+
+                    for page in iter_trustlines(session, address, token[0], client):
+                        session.trustlines.extend(page)
+                        status.update(t(i18n.steps.trustlines_fetch_progress, address=address, count=len(session.trustlines)))
+
                 status.stop()
 
             except:
@@ -109,49 +208,128 @@ def step_fetch_issuer_trustlines():
                 console.print(t(i18n.steps.error_trustline_fetch, address=address))
                 raise Exit()
 
-    console.print(t(i18n.steps.trustlines_fetch_success, count=len(FETCHED_TARGET_TRUSTLINES), address=address, delta=timedelta(seconds=int(time() - start_time))))
+    if type(ledger_index) is int:
+        write_cached_trustlines(ledger_index, address, token[0], session.trustlines)
 
+    console.print(t(i18n.steps.trustlines_fetch_success, count=len(session.trustlines), address=address, delta=timedelta(seconds=int(time() - start_time))))
+    emit("trustlines", count=len(session.trustlines), cached=False)
 
-def step_fetch_trustline_balances():
+
+def step_fetch_trustline_balances(session: AirdropSession):
     """Fetches all trustline balances required to do the final calculations.
 
+    Args:
+        session (AirdropSession): The session to run in.
+
     Raises:
         Exit: Most likely getting rate limited.
     """
 
-    global FETCHED_TRUSTLINE_BALANCES, FETCHED_TARGET_TRUSTLINES
+    _, currency = session.yielding
 
-    yielding_metadata = get_yielding()
-
-    token = yielding_metadata[0]
-    name  = yielding_metadata[1]
+    token, name = currency
 
     if isinstance(name, type(None)):
         name = token
 
-    start_time = time()
+    # Balances were already collected while paging through the issuer's trustlines.
+    if session.single_pass:
+        console.print(t(i18n.steps.balances_fetch_success, token=name, count=len(session.balances), delta=timedelta(seconds=0)))
+        emit("balances", count=len(session.balances))
+        return
+
+    ledger_index = get_ledger_index(session)
+    start_time   = time()
+    cached       = { }
+
+    if type(ledger_index) is int:
+        cached = read_cached_balances(ledger_index, get_balance_key(session.yielding))
+
+        cached.update(open_balance_journal(session, ledger_index, get_balance_key(session.yielding)))
 
-    with console.status(t(i18n.steps.balances_fetch, token=name, count=len(FETCHED_TARGET_TRUSTLINES)), spinner="dots") as status:
+    missing = [ address for address in session.trustlines if address not in cached ]
+    fetched = { }
+    visited = 0
+
+    def on_balance(address: str, balance: Union[None, Decimal]) -> None:
+
+        nonlocal visited
+
+        journal_balance(session, address, balance)
+
+        visited += 1
+
+        if visited % 1000 == 0 or visited == len(missing):
+            emit("balances_progress", fetched=visited, total=len(missing))
+
+    with console.status(t(i18n.steps.balances_fetch, token=name, count=len(missing)), spinner="dots") as status:
 
         status.start()
-        FETCHED_TRUSTLINE_BALANCES = fetch_trustline_balances_threaded(token, FETCHED_TARGET_TRUSTLINES)
+
+        try:
+            if len(missing) <= 0:
+                pass
+
+            elif session.engine == "threaded":
+                fetched = fetch_trustline_balances_threaded(session, token, missing, on_balance)
+
+            else:
+                fetched = fetch_trustline_balances_async(session, token, missing, on_balance)
+
+        except BalanceFetchError as error:
+            status.stop()
+            close_balance_journal(session)
+
+            if isinstance(error.error, type(None)):
+                console.print(t(i18n.steps.error_balances_failed, address=error.address, attempts=get_request_attempts()))
+
+            else:
+                console.print(t(i18n.steps.error_balances_reject, address=error.address, error=error.error, ledger=ledger_index))
+
+            raise Exit()
+
+        except:
+            status.stop()
+            close_balance_journal(session)
+            console.print(i18n.steps.error_clients)
+            raise Exit()
+
         status.stop()
 
-    console.print(t(i18n.steps.balances_fetch_success, token=name, count=len(FETCHED_TRUSTLINE_BALANCES), delta=timedelta(seconds=int(time() - start_time))))
+    close_balance_journal(session)
+
+    # The engines filter out empty balances, so anything missing from their output is cached as a zero balance.
+    if type(ledger_index) is int and len(missing) >= 1:
+        write_cached_balances(ledger_index, get_balance_key(session.yielding), { address: fetched.get(address, Decimal()) for address in missing })
+
+    session.balances = { }
+
+    for address in session.trustlines:
+
+        balance = fetched.get(address, cached.get(address))
 
+        if isinstance(balance, type(None)) or balance.is_zero():
+            continue
 
-def step_calculate_airdrop_yield():
+        session.balances[address] = balance
+
+    console.print(t(i18n.steps.balances_fetch_success, token=name, count=len(session.balances), delta=timedelta(seconds=int(time() - start_time))))
+    emit("balances", count=len(session.balances))
+
+
+def step_calculate_airdrop_yield(session: AirdropSession):
     """Generates all user-facing text into console while calculating all airdrop related balances.
-    """
 
-    global FETCHED_TRUSTLINE_BALANCES, INDIVIDUAL_TRUSTILE_YIELD
+    Args:
+        session (AirdropSession): The session to run in.
+    """
 
     with console.status(i18n.steps.yield_sum, spinner="dots") as status:
 
         status.start()
 
-        increment_airdrop_sum(FETCHED_TRUSTLINE_BALANCES.values())
-        if not calculate_airdrop_ratio():
+        increment_airdrop_sum(session, session.balances.values())
+        if not calculate_airdrop_ratio(session):
             # @TODO(spunk-developer): Do some fancy-ass error handling here.
             status.stop()
 
@@ -159,14 +337,14 @@ def step_calculate_airdrop_yield():
 
         status.stop()
 
-    with Progress(console=console) as progress:
+    with Progress(console=console, disable=is_headless()) as progress:
 
-        task = progress.add_task(description=i18n.steps.yield_result, start=False, total=len(FETCHED_TRUSTLINE_BALANCES))
+        task = progress.add_task(description=i18n.steps.yield_result, start=False, total=len(session.balances))
 
-        for address, balance in FETCHED_TRUSTLINE_BALANCES.items():
+        for address, balance in session.balances.items():
             progress.update(task, description=t(i18n.steps.yield_result_account, address=address))
 
-            resulting_yield = calculate_yield(balance)
+            resulting_yield = calculate_yield(session, balance)
 
             if isinstance(resulting_yield, type(None)):
                 # @TODO(spunk-developer): More fancy error handling
@@ -174,36 +352,118 @@ def step_calculate_airdrop_yield():
                 progress.remove_task(task)
                 raise Exit()
 
-            INDIVIDUAL_TRUSTILE_YIELD[address] = resulting_yield
+            session.yields[address] = resulting_yield
 
             progress.advance(task)
 
         progress.remove_task(task)
 
 
-def step_end_airdrop_calculations():
+def write_airdrop_csv(session: AirdropSession) -> bool:
+    """Writes the calculated yields into the session's CSV data file, along with the metadata file the distribution is validated against.
+
+    Args:
+        session (AirdropSession): A session with calculated yields and a CSV path.
+
+    Returns:
+        bool: `True` if both files were written, `False` otherwise.
+    """
+
+    _, currency = session.yielding
+    ratio       = session.ratio
+    sum         = session.sum
+
+    token, name = currency
+
+    if isinstance(name, type(None)):
+        name = token
+
+    headers = [ "Address", f'{ name }', "Yield" ]
+    data    = [ ]
+
+    if sum >= 1:
+        headers = [ "Address", f'{ name }', "Yield", "Split" ]
+
+    for address in session.trustlines:
+
+        if address not in session.trustlines or address not in session.yields:
+            continue
+
+        balance = session.balances[address]
+        result  = session.yields[address]
+
+        if sum >= 1:
+            split   = ( result / sum ) * 100
+
+            data.append(
+                {
+                    "Address"  : address,
+                    f'{ name }': balance,
+                    "Yield"    : result,
+                    "Split"    : f'{ split }%'
+                }
+            )
+
+        else:
+            data.append(
+                {
+                    "Address"  : address,
+                    f'{ name }': balance,
+                    "Yield"    : result
+                }
+            )
+
+    metadata = [
+        f'Filtered trustlines: { len(session.trustlines) - len(session.balances) }',
+        f'Total elapsed time:  { timedelta(seconds=int(time() - session.start_time)) }',
+        f'Fetched trustlines:  { len(session.trustlines) }',
+        f'Trustline sum:       { sum }',
+        f'Airdrop ratio:       { ratio }',
+        f'Ledger index:        { get_ledger_index(session) }'
+    ]
+
+    return generate_csv(session.csv, headers, data) and generate_metadata(session.csv, metadata)
+
+
+def step_end_airdrop_calculations(session: AirdropSession, dispose: bool = True, clear: bool = True):
     """Prints total ratio into console while saving OR printing results as well.
 
+    Args:
+        session (AirdropSession): The session to run in.
+        dispose (bool): Whether the XRPL clients get disposed, which is left out while further airdrop jobs still need them.
+        clear (bool): Whether the console is cleared first, which is left out after the first airdrop job so earlier results stay visible.
+
     Raises:
         Exit: If CSV saving was chosen, being unable to save to chosen path.
     """
 
-    global FETCHED_TRUSTLINE_BALANCES, INDIVIDUAL_TRUSTILE_YIELD, FETCHED_TARGET_TRUSTLINES, AIRDROP_START_TIME
+    if clear:
+        console.clear()
 
-    console.clear()
-    dispose_clients()
+    if dispose:
+        dispose_clients(session)
 
-    _, currency = get_yielding()
-    ratio       = get_ratio()
-    path        = get_csv()
-    sum         = get_sum()
+    _, currency = session.yielding
+    ratio       = session.ratio
+    path        = session.csv
+    sum         = session.sum
 
     token, name = currency
 
     if isinstance(name, type(None)):
         name = token
 
-    if isinstance(path, type(None)):
+    # Headless runs without a CSV hand the yields to whoever reads the JSON lines.
+    if isinstance(path, type(None)) and is_headless():
+
+        for address in session.trustlines:
+
+            if address not in session.yields:
+                continue
+
+            emit("yield", address=address, balance=session.balances[address], amount=session.yields[address])
+
+    elif isinstance(path, type(None)):
 
         table = Table(title=i18n.steps.print_header)
 
@@ -214,16 +474,16 @@ def step_end_airdrop_calculations():
         if sum >= 1:
             table.add_column("Split",   justify="left", style="#57F6F0")
 
-        for address in FETCHED_TARGET_TRUSTLINES:
+        for address in session.trustlines:
 
-            if address not in FETCHED_TARGET_TRUSTLINES or address not in INDIVIDUAL_TRUSTILE_YIELD:
+            if address not in session.trustlines or address not in session.yields:
                 continue
 
-            balance = f'{ FETCHED_TRUSTLINE_BALANCES[address] }'
-            result  = f'{ INDIVIDUAL_TRUSTILE_YIELD[address] }'
+            balance = f'{ session.balances[address] }'
+            result  = f'{ session.yields[address] }'
 
             if sum >= 1:
-                split   = f'{ (INDIVIDUAL_TRUSTILE_YIELD[address] / sum) * 100 }'
+                split   = f'{ (session.yields[address] / sum) * 100 }'
                 table.add_row(address, balance, result, split)
 
             else:
@@ -233,53 +493,21 @@ def step_end_airdrop_calculations():
 
     else:
 
-        headers = [ "Address", f'{ name }', "Yield" ]
-        data    = [ ]
-
-        if sum >= 1:
-            headers = [ "Address", f'{ name }', "Yield", "Split" ]
-
-        for address in FETCHED_TARGET_TRUSTLINES:
-
-            if address not in FETCHED_TARGET_TRUSTLINES or address not in INDIVIDUAL_TRUSTILE_YIELD:
-                continue
-
-            balance = FETCHED_TRUSTLINE_BALANCES[address]
-            result  = INDIVIDUAL_TRUSTILE_YIELD[address]
-
-            if sum >= 1:
-                split   = ( result / sum ) * 100
-
-                data.append(
-                    {
-                        "Address"  : address,
-                        f'{ name }': balance,
-                        "Yield"    : result,
-                        "Split"    : f'{ split }%'
-                    }
-                )
-
-            else:
-                data.append(
-                    {
-                        "Address"  : address,
-                        f'{ name }': balance,
-                        "Yield"    : result
-                    }
-                )
-
-        metadata = [
-            f'Filtered trustlines: { len(FETCHED_TARGET_TRUSTLINES) - len(FETCHED_TRUSTLINE_BALANCES) }',
-            f'Total elapsed time:  { timedelta(seconds=int(time() - AIRDROP_START_TIME)) }',
-            f'Fetched trustlines:  { len(FETCHED_TARGET_TRUSTLINES) }',
-            f'Trustline sum:       { sum }',
-            f'Airdrop ratio:       { ratio }'
-        ]
-
-        if not generate_csv(path, headers, data) or not generate_metadata(path, metadata):
+        if not write_airdrop_csv(session):
             console.print(t(i18n.steps.error_saving_csv, path=path))
             raise Exit()
 
+        emit("csv", path=path)
+
+    emit(
+        "result",
+        fetched=len(session.trustlines),
+        filtered=len(session.trustlines) - len(session.balances),
+        sum=sum,
+        ratio=ratio,
+        ledger_index=get_ledger_index(session),
+        elapsed=round(time() - session.start_time, 3)
+    )
 
     results = Table(box=None, show_header=False, show_edge=False, padding=(0, 2, 0, 0))
 
@@ -288,17 +516,17 @@ def step_end_airdrop_calculations():
 
     results.add_row(
         Text("Filtered trustlines", "#902EF4"),
-        Text(f'{len(FETCHED_TARGET_TRUSTLINES):,}', "white")
+        Text(f'{len(session.trustlines):,}', "white")
     )
 
     results.add_row(
         Text("Total elapsed time", "#0086FF"),
-        Text(str(timedelta(seconds=int(time() - AIRDROP_START_TIME))), "white")
+        Text(str(timedelta(seconds=int(time() - session.start_time))), "white")
     )
 
     results.add_row(
         Text("Fetched trustlines", "#00B6FF"),
-        Text(f'{len(FETCHED_TARGET_TRUSTLINES):,}', "white")
+        Text(f'{len(session.trustlines):,}', "white")
     )
 
     results.add_row(
@@ -312,12 +540,73 @@ def step_end_airdrop_calculations():
     )
 
     console.print(get_layout_with_renderable(Padding(results, (6, 6), expand=True)))
-    dispose_clients()
 
+    if dispose:
+        dispose_clients(session)
 
-def step_validate_distribution_inputs():
+
+def step_run_airdrop_jobs(session: AirdropSession):
+    """Runs every queued airdrop job against a single fetch of the issuer's trustlines. Jobs sharing a yielding token share its fetched balances as well, and every yielding token gets a balance journal of its own, so a resumed run picks up every job where it left off.
+
+    Args:
+        session (AirdropSession): The session to run in.
+
+    Raises:
+        Exit: If any of the jobs fail.
+    """
+
+    balances = { }
+
+    for number, job in enumerate(session.jobs, start=1):
+
+        # Every job runs in a session of its own, sharing the run's issuer, pinned ledger, holder set, settings and connections.
+        job_session = AirdropSession(
+            issuer=session.issuer,
+            yielding=job["yielding"],
+            ledger_index=session.ledger_index,
+            budget=Decimal(job["budget"]),
+            csv=job["csv"],
+            engine=session.engine,
+            request_window=session.request_window,
+            hedge_after=session.hedge_after,
+            start_time=session.start_time,
+            trustlines=session.trustlines,
+            absent=session.absent,
+            resume=session.resume,
+            endpoints=session.endpoints,
+            pool=session.pool,
+            client=session.client
+        )
+
+        console.print(t(i18n.steps.job_begin, job=number, total=len(session.jobs), path=job["csv"]))
+        emit("job", number=number, total=len(session.jobs), csv=job["csv"])
+
+        # The holder set doesn't depend on the yielding token, so only the first job fetches it.
+        if number == 1:
+            step_fetch_issuer_trustlines(job_session)
+
+            session.trustlines = job_session.trustlines
+
+        key = get_balance_key(job_session.yielding)
+
+        if key in balances:
+            job_session.balances = balances[key]
+
+        else:
+            step_fetch_trustline_balances(job_session)
+
+            balances[key] = job_session.balances
+
+        step_calculate_airdrop_yield(job_session)
+        step_end_airdrop_calculations(job_session, dispose=number == len(session.jobs), clear=number == 1)
+
+
+def step_validate_distribution_inputs(session: AirdropSession):
     """Validates input meta & data file contents.
 
+    Args:
+        session (AirdropSession): The session to run in.
+
     Raises:
         Exit: If either the metadata or data files are mangled in any way.
     """
@@ -326,7 +615,7 @@ def step_validate_distribution_inputs():
 
         status.start()
 
-        if not validate_metadata():
+        if not validate_metadata(session):
 
             console.print(i18n.steps.error_input_meta)
 
@@ -334,7 +623,7 @@ def step_validate_distribution_inputs():
 
         status.update(i18n.steps.input_data_validation)
 
-        if not validate_data():
+        if not validate_data(session):
 
             console.print(i18n.steps.error_input_data)
 
@@ -345,15 +634,18 @@ def step_validate_distribution_inputs():
     console.print(i18n.steps.input_data_success)
 
 
-def step_validate_count():
+def step_validate_count(session: AirdropSession):
     """Validates the stored trustline counts.
 
+    Args:
+        session (AirdropSession): The session to run in.
+
     Raises:
         Exit: If the meta or data cannot be fetched, or if the data validation fails.
     """
 
-    meta = get_meta()
-    data = get_data()
+    meta = session.meta
+    data = session.data
 
     if isinstance(meta, type(None)) or isinstance(data, type(None)):
         raise Exit()
@@ -373,15 +665,18 @@ def step_validate_count():
         status.stop()
 
 
-def step_validate_calculations():
+def step_validate_calculations(session: AirdropSession):
     """Validates the overall sum calculation as declared in the metadata file.
 
+    Args:
+        session (AirdropSession): The session to run in.
+
     Raises:
         Exit: If either meta or data isn't set, or if the calculations fail.
     """
 
-    meta = get_meta()
-    data = get_data()
+    meta = session.meta
+    data = session.data
 
     sum   = Decimal()
     token = None
@@ -416,11 +711,11 @@ def step_validate_calculations():
     console.print(t(i18n.steps.validate_calculation_success, token=token))
 
 
-def step_validate_ratio():
+def step_validate_ratio(session: AirdropSession):
 
-    budget = get_budget()
-    meta   = get_meta()
-    data   = get_data()
+    budget = session.budget
+    meta   = session.meta
+    data   = session.data
 
     ratio = Decimal()
     sum   = Decimal()
@@ -458,14 +753,17 @@ def step_validate_ratio():
     console.print(t(i18n.steps.validate_ratio_success, token=token))
 
 
-def step_distribute_airdrop():
-    """Distributes actual airdrop amount based on the input data.
-    """
+def get_distributed_token(session: AirdropSession) -> tuple[str, str, str]:
+    """Returns the token distributed in `session`.
 
-    global AIRDROP_START_TIME
+    Args:
+        session (AirdropSession): The session in question.
 
-    issuer, currency = get_yielding()
-    data             = get_data()
+    Returns:
+        tuple[str, str, str]: The issuer, the currency code and the display name of the token.
+    """
+
+    issuer, currency = session.yielding
     name             = None
     id               = None
 
@@ -478,20 +776,338 @@ def step_distribute_airdrop():
     if isinstance(name, type(None)):
         name = id
 
-    failed = [ ]
+    return issuer, id, name
 
-    with console.status(None, spinner="dots") as status:
+
+def step_presign_airdrop(session: AirdropSession):
+    """Signs every payment of the input data ahead of time without sending any, and saves them next to the data files. The cold wallet sequence and fee are only read once for the whole batch.
+
+    Args:
+        session (AirdropSession): The session to run in.
+
+    Raises:
+        Exit: If any destination is invalid, the sequence or fee can't be read, or the signed payments can't be saved.
+    """
+
+    issuer, id, name = get_distributed_token(session)
+    payments         = [ (entry["address"], (issuer, id, entry["yield"])) for entry in session.data ]
+    signed_path      = path.abspath(path.normpath(f'{ session.base_path }{ path.sep }airdrop_signed.csv'))
+
+    for destination, _ in payments:
+
+        if not is_valid_classic_address(destination):
+
+            console.print(t(i18n.steps.error_presign_destination, destination=destination))
+
+            raise Exit()
+
+    with console.status(t(i18n.steps.presign_working, token=name, count=len(payments)), spinner="dots") as status:
 
         status.start()
 
-        for entry in data:
+        try:
+            sequence, fee = fetch_signing_state(session)
+
+        except PaymentFeeError as error:
+            console.print(t(i18n.steps.error_base_fee, base_fee=error.base_fee, max_fee=error.max_fee))
+
+            raise Exit()
+
+        except:
+            console.print(i18n.steps.error_presign_state)
+
+            raise Exit()
 
-            destination = entry["address"]
-            amount      = entry["yield"]
+        signed = sign_payments(session, payments, sequence, fee)
 
-            status.update(t(i18n.steps.distribute_working, amount=amount, token=name, destination=destination))
+        status.stop()
+
+    rows = [ { "destination": destination, "amount": amount, "sequence": sequence, "hash": hash, "blob": blob } for (destination, (_, _, amount)), (sequence, hash, blob) in zip(payments, signed) ]
+
+    if not generate_csv(signed_path, [ "destination", "amount", "sequence", "hash", "blob" ], rows):
+
+        console.print(t(i18n.steps.error_saving_csv, path=signed_path))
+
+        raise Exit()
+
+    console.print(t(i18n.steps.presign_success, count=len(signed), first=sequence, last=sequence + len(signed) - 1, path=signed_path))
+    emit("presign", count=len(signed), sequence=sequence, fee=fee, path=signed_path)
+
+
+def step_validate_signed_payments(session: AirdropSession):
+    """Validates the payments signed ahead of time by `step_presign_airdrop`, making sure they are exactly the payments of the input data, in the same order, and signed by the cold wallet.
+
+    Args:
+        session (AirdropSession): The session to run in.
+
+    Raises:
+        Exit: If the signed payments file is missing, or doesn't match the input data.
+    """
+
+    issuer, id, _ = get_distributed_token(session)
+    signed_path   = Path(session.base_path, "airdrop_signed.csv")
+
+    with console.status(i18n.steps.signed_validation, spinner="dots") as status:
+
+        status.start()
+
+        if not set_signed(session, signed_path) or not validate_signed_data(session) or len(session.signed) != len(session.data):
+
+            console.print(t(i18n.steps.error_signed, path=signed_path))
+
+            raise Exit()
+
+        for entry, signed in zip(session.data, session.signed):
+
+            if entry["address"] != signed["destination"] or entry["yield"] != signed["amount"] or not verify_signed_payment(session, entry["address"], (issuer, id, entry["yield"]), signed["sequence"], signed["hash"], signed["blob"]):
+
+                console.print(t(i18n.steps.error_signed, path=signed_path))
+
+                raise Exit()
+
+        status.stop()
+
+    console.print(t(i18n.steps.signed_success, count=len(session.signed)))
+
+
+def get_distribution_journal(session: AirdropSession) -> tuple[str, str]:
+    """Returns where the distribution journal of the session's data files lives, along with the header identifying the distribution it belongs to.
+
+    Args:
+        session (AirdropSession): The session, holding validated data & metadata files and a wallet.
+
+    Returns:
+        tuple[str, str]: The journal path and header.
+    """
+
+    _, id, _ = get_distributed_token(session)
+
+    journal_path = path.abspath(path.normpath(f'{ session.base_path }{ path.sep }airdrop_distribution.journal'))
+    header       = f'{ session.wallet.classic_address } { id } { len(session.data) } { session.meta["sum"] }'
+
+    return journal_path, header
+
+
+def read_journaled_payments(session: AirdropSession, records: list[dict]) -> tuple[dict[str, str], dict[str, dict[str, dict]], dict[str, tuple[int, Union[None, int], Union[None, int]]]]:
+    """Sorts the records of a resumed distribution journal into payments known to have been sent, and payments whose outcome has to be looked up on the ledger.
+
+    Args:
+        session (AirdropSession): The session, holding validated data files.
+        records (list[dict]): The journaled payment records.
+
+    Returns:
+        tuple[dict[str, str], dict[str, dict[str, dict]], dict[str, tuple[int, Union[None, int], Union[None, int]]]]: The hash of every sent payment per destination, the submitted records per destination and hash, and the submissions to pass to `reconcile_payments`.
+    """
+
+    amounts   = { entry["address"]: entry["yield"] for entry in session.data }
+    blobs     = { entry["destination"]: entry["hash"] for entry in session.signed or [ ] }
+    sent      = { }
+    submitted = { }
+
+    for record in records:
+
+        if record["destination"] not in amounts:
+            continue
+
+        if record["status"] == "sent":
+            sent[record["destination"]] = record["hash"]
+
+        # A payment is looked up from its first submission on, so later records of the same hash are skipped.
+        elif record["status"] == "submitted" and not isinstance(record["hash"], type(None)):
+            submitted.setdefault(record["destination"], { }).setdefault(record["hash"], record)
+
+    # Presigned payments that are about to be sent again as they are can't pay twice, so they're left for the engine to settle.
+    lookups = { hash: (record["sequence"], record["first_ledger"], record["last_ledger"]) for destination, hashes in submitted.items() if destination not in sent for hash, record in hashes.items() if blobs.get(destination) != hash }
+
+    return sent, submitted, lookups
+
+
+def settle_journaled_payments(session: AirdropSession, sent: dict[str, str], submitted: dict[str, dict[str, dict]], outcomes: dict[str, tuple[bool, Union[None, str]]]) -> int:
+    """Journals every submitted payment the ledger shows as sent, and marks every journaled destination in `session.journaled`, so it's never paid again. The distribution journal has to be open.
+
+    Args:
+        session (AirdropSession): The session, holding validated data files.
+        sent (dict[str, str]): The hash of every payment journaled as sent, per destination.
+        submitted (dict[str, dict[str, dict]]): The submitted records per destination and hash.
+        outcomes (dict[str, tuple[bool, Union[None, str]]]): The outcomes returned by `reconcile_payments`.
+
+    Returns:
+        int: How many destinations may or may not have been paid.
+    """
+
+    amounts = { entry["address"]: entry["yield"] for entry in session.data }
+    unknown = 0
+
+    for destination, hashes in submitted.items():
+
+        if destination in sent:
+            continue
+
+        results = [ (hash, outcomes[hash]) for hash in hashes if hash in outcomes ]
+
+        for hash, (final, result) in results:
+
+            if final and result == "tesSUCCESS":
+
+                record            = hashes[hash]
+                sent[destination] = hash
+
+                journal_payment(session, "sent", destination, amounts[destination], record["sequence"], hash=hash)
+
+                break
+
+        if destination in sent or all([ final for _, (final, _) in results ]):
+            continue
+
+        session.journaled[destination] = None
+
+        unknown += 1
+
+    for destination, hash in sent.items():
+        session.journaled[destination] = hash
+
+    return unknown
+
+
+def step_open_distribution_journal(session: AirdropSession):
+    """Opens the distribution journal next to the data files, which every payment is written to as it goes. When resuming, payments submitted by an earlier run are reconciled with the ledger first, so only what's missing gets sent.
+
+    Args:
+        session (AirdropSession): The session to run in.
+
+    Raises:
+        Exit: If a journal exists but we're not resuming, the journal belongs to another distribution, the ledger can't be reached, or the journal can't be written.
+    """
+
+    journal_path, header = get_distribution_journal(session)
+    journal              = read_distribution_journal(journal_path)
+
+    if not get_resume(session) or isinstance(journal, type(None)):
+
+        if not isinstance(journal, type(None)) and len(journal[1]) >= 1:
+
+            console.print(t(i18n.steps.error_journal_exists, path=journal_path))
+
+            raise Exit()
 
-            if not send_token_payment(destination, (issuer, id, amount)):
+        if not open_distribution_journal(session, journal_path, header, False):
+
+            console.print(t(i18n.steps.error_journal, path=journal_path))
+
+            raise Exit()
+
+        return
+
+    journal_header, records = journal
+
+    if journal_header != header:
+
+        console.print(t(i18n.steps.error_journal_mismatch, path=journal_path))
+
+        raise Exit()
+
+    sent, submitted, lookups = read_journaled_payments(session, records)
+    outcomes                 = { }
+
+    with console.status(t(i18n.steps.journal_reconcile, count=len(lookups)), spinner="dots") as status:
+
+        status.start()
+
+        try:
+            if len(lookups) >= 1:
+                outcomes = reconcile_payments(session, lookups)
+
+        except:
+            status.stop()
+            console.print(i18n.steps.error_clients)
+            raise Exit()
+
+        status.stop()
+
+    if not open_distribution_journal(session, journal_path, header, True):
+
+        console.print(t(i18n.steps.error_journal, path=journal_path))
+
+        raise Exit()
+
+    unknown = settle_journaled_payments(session, sent, submitted, outcomes)
+
+    console.print(t(i18n.steps.journal_resumed, sent=len(sent), unknown=unknown, remaining=len(session.data) - len(sent) - unknown))
+    emit("resume", sent=len(sent), unknown=unknown, remaining=len(session.data) - len(sent) - unknown)
+
+
+def step_distribute_airdrop(session: AirdropSession):
+    """Distributes actual airdrop amount based on the input data. Payments signed ahead of time are sent as they are, if they have been validated by `step_validate_signed_payments`. The distribution journal has to be opened by `step_open_distribution_journal` first.
+
+    Args:
+        session (AirdropSession): The session to run in.
+    """
+
+    issuer, id, name = get_distributed_token(session)
+    data             = session.data
+
+    failed      = [ ]
+    settled     = set()
+    sequences   = { }
+    interrupted = None
+    payments    = [ (entry["address"], (issuer, id, entry["yield"])) for entry in data ]
+    remaining = [ index for index, (destination, _) in enumerate(payments) if destination not in session.journaled ]
+
+    # Payments whose outcome couldn't be reconciled with the ledger are never sent again, as they may still have made it.
+    for destination, (_, _, amount) in payments:
+
+        if destination not in session.journaled or not isinstance(session.journaled[destination], type(None)):
+            continue
+
+        failed.append(
+            {
+                "destination": destination,
+                "amount": amount
+            }
+        )
+
+        console.print(t(i18n.steps.distribute_unknown, token=name, destination=destination))
+        emit("payment", destination=destination, amount=amount, hash=None, status="unknown")
+
+    with console.status(None, spinner="dots") as status:
+
+        def on_submit(position: int, sequence: int, hash: str, first_ledger: Union[None, int], last_ledger: Union[None, int]) -> None:
+
+            index                       = remaining[position]
+            destination, (_, _, amount) = payments[index]
+
+            sequences[index] = sequence
+
+            # Nothing may be submitted without being journaled first, or an interrupted run couldn't be resumed safely.
+            if not journal_payment(session, "submitted", destination, amount, sequence, first_ledger, last_ledger, hash):
+                raise OSError
+
+        def on_payment(position: int, hash: Union[None, str], success: Union[None, bool]) -> None:
+
+            index                       = remaining[position]
+            destination, (_, _, amount) = payments[index]
+
+            settled.add(index)
+            status.update(t(i18n.steps.distribute_working, token=name, count=len(settled), total=len(remaining)))
+
+            # A payment that may or may not have been validated stays journaled as submitted, so --resume reconciles it instead of sending it again.
+            if isinstance(success, type(None)):
+
+                failed.append(
+                    {
+                        "destination": destination,
+                        "amount": amount
+                    }
+                )
+
+                console.print(t(i18n.steps.distribute_unconfirmed, amount=amount, token=name, destination=destination))
+                emit("payment", destination=destination, amount=amount, hash=hash, status="unknown")
+
+                return
+
+            journal_payment(session, "sent" if success else "failed", destination, amount, sequences.get(index), hash=hash)
+
+            if not success:
 
                 failed.append(
                     {
@@ -501,10 +1117,55 @@ def step_distribute_airdrop():
                 )
 
                 console.print(t(i18n.steps.distribute_error, amount=amount, token=name, destination=destination))
+                emit("payment", destination=destination, amount=amount, hash=hash, status="failed")
 
-                continue
+                return
 
             console.print(t(i18n.steps.distribute_success, amount=amount, token=name, destination=destination))
+            emit("payment", destination=destination, amount=amount, hash=hash, status="sent")
+
+        status.start()
+        status.update(t(i18n.steps.distribute_working, token=name, count=0, total=len(remaining)))
+
+        try:
+            if len(remaining) <= 0:
+                pass
+
+            elif not isinstance(session.signed, type(None)):
+                submit_signed_payments(session, [ (session.signed[index]["sequence"], session.signed[index]["hash"], session.signed[index]["blob"]) for index in remaining ], on_payment, on_submit)
+
+            else:
+                submit_payments(session, [ payments[index] for index in remaining ], on_payment, on_submit)
+
+        except BaseException as error:
+            if isinstance(error, PaymentFeeError):
+                console.print(t(i18n.steps.error_base_fee, base_fee=error.base_fee, max_fee=error.max_fee))
+
+            # Payments still in flight may or may not have made it, so they're reported as failed for the operator to check, and left for --resume to reconcile.
+            console.print(t(i18n.steps.distribute_interrupted, amount=len(remaining) - len(settled)))
+
+            for index in remaining:
+
+                if index in settled:
+                    continue
+
+                destination, (_, _, amount) = payments[index]
+
+                failed.append(
+                    {
+                        "destination": destination,
+                        "amount": amount
+                    }
+                )
+
+                emit("payment", destination=destination, amount=amount, hash=None, status="failed")
+
+            # Interrupts and exits still end the run once everything unsettled has been reported.
+            if not isinstance(error, Exception):
+                interrupted = error
+
+        finally:
+            close_distribution_journal(session)
 
         status.stop()
 
@@ -512,7 +1173,7 @@ def step_distribute_airdrop():
 
     if len(failed) >= 1:
 
-        log_path = path.abspath(path.normpath(f'{ get_path() }{ path.sep }distribute_failure.csv'))
+        log_path = path.abspath(path.normpath(f'{ session.base_path }{ path.sep }distribute_failure.csv'))
 
         console.print(t(i18n.steps.distribute_warn, token=name, amount=len(failed), log=log_path))
 
@@ -533,5 +1194,9 @@ def step_distribute_airdrop():
 
             console.print(table)
 
-    console.print(Padding(f'Finished distribution in [prominent]{ str(timedelta(seconds=int(time() - AIRDROP_START_TIME))) }[/prominent]!', (1, 2)))
+    if not isinstance(interrupted, type(None)):
+        raise interrupted
+
+    console.print(Padding(f'Finished distribution in [prominent]{ str(timedelta(seconds=int(time() - session.start_time))) }[/prominent]!', (1, 2)))
+    emit("distribution", sent=len(data) - len(failed), failed=len(failed), elapsed=round(time() - session.start_time, 3))
 
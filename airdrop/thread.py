@@ -1,96 +1,169 @@
 """Multithreading code to help with aggressive rate limiting. """
 """Author: spunk-developer <xspunk.developer@gmail.com>       """
 
-from xrpl.clients.websocket_client import WebsocketClient
-from concurrent.futures            import ThreadPoolExecutor
+from concurrent.futures            import ThreadPoolExecutor, as_completed
 from decimal                       import Decimal
-from typing                        import Union
-from time                          import sleep
+from typing                        import Callable, Union
+from time                          import sleep, time
 
-from airdrop.xrpl import fetch_account_balance, get_available_client, return_client
+from airdrop.session import AirdropSession
+from airdrop.aio     import get_request_window
+from airdrop.xrpl    import RateLimitedError, RequestRejectedError, BalanceFetchError, RateLimiter, fetch_account_balances, fetch_load_factor, get_rate_limiter, get_client_pool, record_latency, get_backoff, get_request_attempts
 
-TARGET_TOKEN: Union[None, str] = None
+POOL_TIMEOUT: float = 60.0
 
 
-def fetch_trustline_balance(trustline: str) -> tuple[str, Decimal]:
-    """Fetches a single trustline balance in a multithreaded context.
+def fetch_trustline_balance_batch(session: AirdropSession, token: str, trustlines: list[str]) -> list[tuple[str, Union[None, Decimal]]]:
+    """Fetches a batch of trustline balances over a single pooled socket in a multithreaded context, retrying the ones that failed up to `REQUEST_ATTEMPTS` times in total.
 
     Args:
-        trustline (str): The given trustline which to fetch their balance for.
+        session (AirdropSession): The session holding the client pool, the pinned ledger and the yielding token.
+        token (str): The token in question which to get the trustline balances for.
+        trustlines (list[str]): The given trustlines which to fetch their balances for.
+
+    Raises:
+        BalanceFetchError: If the XRPL rejected any of the requests, or they kept failing.
 
     Returns:
-        tuple[str, Decimal]: A tuple containing the original trustline address and fetched token balance.
+        list[tuple[str, Union[None, Decimal]]]: Tuples containing the original trustline addresses and fetched token balances.
     """
 
-    # Accessing a global variable from a threaded context is probably a REALLY bad idea
-    # in most cases, however since we're only reading the variable it should be fine.
-    #
-    # If shit goes wrong, you know who to blame!
-    global TARGET_TOKEN
+    global POOL_TIMEOUT
 
-    balance: Union[None, Decimal]         = None
-    client:  Union[None, WebsocketClient] = None
-    fail:    Union[None, int]             = None
+    fetched:   list[tuple[str, Union[None, Decimal]]] = [ ]
+    pending:   list[str]                              = list(trustlines)
+    limiter:   Union[None, RateLimiter]               = None
+    throttled: bool                                   = False
+    rejected:  Union[None, BalanceFetchError]         = None
+    attempt:   int                                    = 0
+    pool                                              = get_client_pool(session)
 
     while True:
-        client = get_available_client()
+        try:
+            # Blocks until a client is free, the pool marks the client as failed if the batch can't be sent.
+            with pool.lease(POOL_TIMEOUT) as client:
+                limiter = get_rate_limiter(client.url)
 
-        if not isinstance(client, type(None)):
-            break
+                for _ in pending:
+                    limiter.acquire()
 
-    while True:
-        try:
-            if not client.is_open():
-                client.open()
+                start_time = time()
+                results    = fetch_account_balances(session, pending, token, client)
 
-            balance = fetch_account_balance(trustline, TARGET_TOKEN, client)
+                record_latency(client.url, time() - start_time)
 
-            return_client(client)
+                failed    = [ ]
+                throttled = False
 
-            break
+                for address, result in zip(pending, results):
 
-        except:
-            if isinstance(fail, type(None)):
-                fail = 10
+                    # Asking again for a ledger or account the server doesn't know about would never succeed.
+                    if isinstance(result, RequestRejectedError):
+                        rejected = BalanceFetchError(address, result.error)
+
+                    if isinstance(result, Exception):
+                        throttled = throttled or isinstance(result, RateLimitedError)
+
+                        failed.append(address)
+                        continue
+
+                    limiter.on_success()
+
+                    fetched.append((address, result))
+
+                pending = failed
+
+                # Load sampling is best-effort, a failed sample shouldn't throw away the fetched balances.
+                if limiter.wants_load_sample():
+                    try:
+                        limiter.on_load(fetch_load_factor(client))
+
+                    except:
+                        pass
+
+            if not isinstance(rejected, type(None)):
+                raise rejected
+
+            if len(pending) <= 0:
+                break
+
+            attempt += 1
+
+            if attempt >= get_request_attempts():
+                raise BalanceFetchError(pending[0])
+
+            # The server asked us to slow down, so we retry soon at a lower rate instead of waiting out a long backoff.
+            if throttled:
+                limiter.on_throttle()
+
+                sleep(get_backoff(attempt, 0.5, 10.0))
 
             else:
-                fail = fail * 2
+                sleep(get_backoff(attempt))
+
+        except BalanceFetchError:
+            raise
+
+        # Includes timing out on a busy pool, which counts against the attempts like any other failure.
+        except:
+            attempt += 1
 
-                if fail >= 300:
-                    fail = 300
+            if attempt >= get_request_attempts():
+                raise BalanceFetchError(pending[0])
 
-            for _ in range(fail):
-                sleep(1)
+            sleep(get_backoff(attempt))
 
-    return (trustline, balance)
+    return fetched
 
 
-def fetch_trustline_balances_threaded(token: str, trustlines: list[str]) -> dict[str, Decimal]:
+def fetch_trustline_balances_threaded(session: AirdropSession, token: str, trustlines: list[str], callback: Union[None, Callable[[str, Union[None, Decimal]], None]] = None) -> dict[str, Decimal]:
     """Sets up a multithreaded context for fetching trustline balances from the XRPL.
 
     Args:
+        session (AirdropSession): The session holding the client pool, the request window, the pinned ledger and the yielding token.
         token (str): The token in question which to get the trustline balances for.
         trustlines (list[str]): List of all trustlines which to fetch balances for.
+        callback (Union[None, Callable[[str, Union[None, Decimal]], None]]): Optionally called from the calling thread with every balance as soon as it has been fetched.
+
+    Raises:
+        BalanceFetchError: If any trustline balance couldn't be fetched.
 
     Returns:
         dict[str, Decimal]: Dictionary containing fetched trustline balances, which has been filtered to not include zero-balance trustlines.
     """
 
-    global TARGET_TOKEN
+    fetched  = { }
+    balances = { }
+    window   = get_request_window(session)
+    batches  = [ trustlines[index:index + window] for index in range(0, len(trustlines), window) ]
+
+    # One worker per pooled client, any extra workers would only ever be waiting on the pool.
+    with ThreadPoolExecutor(max_workers=max(1, len(get_client_pool(session).clients))) as pool:
 
-    TARGET_TOKEN = token
-    balances     = { }
+        futures = [ pool.submit(fetch_trustline_balance_batch, session, token, batch) for batch in batches ]
+
+        try:
+            for future in as_completed(futures):
+                for address, balance in future.result():
 
-    with ThreadPoolExecutor(max_workers=3) as pool:
+                    fetched[address] = balance
+
+                    if not isinstance(callback, type(None)):
+                        callback(address, balance)
+
+        # One failed balance fails the whole fetch, so batches that haven't started yet aren't sent at all.
+        except:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
 
-        results = pool.map(fetch_trustline_balance, trustlines)
+    for address in trustlines:
 
-        for address, balance in results:
+        balance = fetched.get(address)
 
-            # We do light filtering for trustlines that don't have anything
-            if address in balances or isinstance(balance, type(None)) or balance.is_zero():
-                    continue
+        # We do light filtering for trustlines that don't have anything
+        if address in balances or isinstance(balance, type(None)) or balance.is_zero():
+            continue
 
-            balances[address] = balance
+        balances[address] = balance
 
     return balances
@@ -1,12 +1,115 @@
 """Small utility functions.                            """
 """Author: spunk-developer <xspunk.developer@gmail.com>"""
 
-from rich.layout import Layout
-from rich.align  import Align
-from rich.panel  import Panel
-from rich.text   import Text
+from rich.console import ConsoleRenderable, RenderHook
+from typer        import Exit
+from contextlib   import contextmanager
+from rich.layout  import Layout
+from rich.align   import Align
+from rich.panel   import Panel
+from rich.text    import Text
+from typing       import Iterator
+from json         import dumps
+from time         import time
+from sys          import stdout
+
+from airdrop import console, i18n
+
+HEADLESS: bool = False
+
+FAILED:   bool = False
+
+
+class HeadlessRenderHook(RenderHook):
+    """Swallows everything printed to the console while running headless, emitting printed text as JSON lines instead."""
+
+    def process_renderables(self, renderables: list[ConsoleRenderable]) -> list[ConsoleRenderable]:
+
+        global FAILED
+
+        for renderable in renderables:
+
+            # Banners, tables and other decorations have no place in machine readable output.
+            if not isinstance(renderable, Text) or len(renderable.plain.strip()) <= 0:
+                continue
+
+            # Failures are always printed in the theme's "error" style.
+            if any([ str(span.style) == "error" for span in renderable.spans ]):
+                FAILED = True
+
+                emit("error", message=renderable.plain.strip())
+                continue
+
+            emit("message", message=renderable.plain.strip())
+
+        return [ ]
+
+
+def set_headless(headless: bool) -> None:
+    """Turns headless mode on or off. While headless, nothing is rendered to the console and progress is emitted as JSON lines.
+
+    Args:
+        headless (bool): The headless flag.
+    """
+
+    global HEADLESS
+
+    if headless is not True or HEADLESS:
+        return
+
+    HEADLESS      = True
+    console.quiet = True
+
+    console.push_render_hook(HeadlessRenderHook())
+
+
+def is_headless() -> bool:
+    """Returns whether we're running headless.
+
+    Returns:
+        bool: `True` if headless, `False` otherwise.
+    """
+
+    global HEADLESS
+    return HEADLESS
+
+
+def emit(event: str, **fields) -> None:
+    """Writes a single JSON progress line to stdout when running headless. Does nothing otherwise.
+
+    Args:
+        event (str): The event name.
+        **fields: Event specific fields. Anything that isn't JSON serializable, like `Decimal`, is written as a string.
+    """
+
+    global HEADLESS
+
+    if not HEADLESS:
+        return
+
+    stdout.write(dumps({ "event": event, "time": round(time(), 3), **fields }, default=str) + "\n")
+    stdout.flush()
+
+
+@contextmanager
+def headless_exit_code() -> Iterator[None]:
+    """Makes a run that failed while headless exit with a non-zero code, so schedulers can tell it apart from a successful one."""
+
+    global FAILED, HEADLESS
+
+    try:
+        yield
+
+    except Exit as exit:
+        if HEADLESS and FAILED and exit.exit_code == 0:
+            raise Exit(code=1)
+
+        raise
+
+    # Steps that report failures, like payments that couldn't be sent, may still return normally.
+    if HEADLESS and FAILED:
+        raise Exit(code=1)
 
-from airdrop import i18n
 
 def get_layout_with_renderable(renderable) -> Layout:
 
@@ -3,275 +3,1350 @@
 
 from xrpl.models.requests.account_lines import AccountLines
 from xrpl.models.requests.account_info  import AccountInfo
+from xrpl.models.requests.server_info   import ServerInfo
+from xrpl.asyncio.clients.utils         import request_to_websocket, websocket_to_response
+from xrpl.models.requests.request       import Request
+from xrpl.models.requests.ledger        import Ledger
+from xrpl.models.response               import Response
+from xrpl.asyncio.clients               import AsyncWebsocketClient
 from xrpl.utils                         import drops_to_xrp
-from cache_to_disk                      import cache_to_disk, NoCacheCondition
+from concurrent.futures                 import ThreadPoolExecutor, as_completed
+from requests.adapters                  import HTTPAdapter
 from xrpl.clients                       import WebsocketClient
-from requests                           import get
+from requests                           import Session
 from decimal                            import Decimal
-from typing                             import Union
-from threading import Lock
+from dataclasses                        import dataclass, field
+from collections                        import deque
+from hashlib                            import sha256
+from contextlib                         import contextmanager
+from threading                          import Condition, Lock
+from asyncio                            import TimeoutError as WaitTimeoutError, sleep as sleep_async, gather, get_running_loop, run_coroutine_threadsafe, wait_for
+from itertools                          import count
+from json                               import dumps, loads
+from typing                             import Iterator, Union
+from random                             import uniform
+from time                               import sleep, time
 
-from airdrop import console
+from airdrop.session import AirdropSession
+from airdrop.cache   import read_token_index_count, read_token_index_marker, write_token_index
+from airdrop         import console
 
-CLIENT_LOCK:        Lock                                      = Lock()
+RATE_LIMITERS:     dict[str, "RateLimiter"]         = { }
 
-SELECTED_TRUSTLINE: Union[None, tuple[str, str]]              = None
+ENDPOINT_STATS:    dict[str, "EndpointStats"]       = { }
 
-YIELDING_TOKEN:     Union[None, tuple[str, Union[None, str]]] = None
+ENDPOINT_LOCK:     Lock                             = Lock()
 
-XRPL_CLIENTS:       list[WebsocketClient]                     = [ ]
+DEGRADED_LATENCY:  float                            = 4.0
 
-XRPL_CLIENT:        Union[None, WebsocketClient]              = None
+XRPL_META_URL:     str                              = "https://s1.xrplmeta.org/tokens"
 
-def get_issuer() -> Union[None, tuple[str, Union[None, str]]]:
+XRPL_META_STEP:    int                              = 100
+
+XRPL_META_WORKERS: int                              = 8
+
+XRPL_META_RETRIES: int                              = 3
+
+XRPL_META_TTL:     float                            = 86400.0
+
+REQUEST_ATTEMPTS:  int                              = 10
+
+REJECTED_ERRORS:   set[str]                         = { "lgrNotFound", "actNotFound", "actMalformed", "invalidParams", "unknownCmd" }
+
+def get_issuer(session: AirdropSession) -> Union[None, tuple[str, Union[None, str]]]:
     """Returns the current state for the issuer token.
 
+    Args:
+        session (AirdropSession): The session in question.
+
+    Returns:
+        Union[None, tuple[str, Union[None, str]]]: Current issuer token state.
+    """
+
+    return session.issuer
+
+
+def get_yielding(session: AirdropSession) -> Union[None, tuple[str, tuple[str, Union[None, str]]]]:
+    """Returns the current state for the yielding token.
+
+    Args:
+        session (AirdropSession): The session in question.
+
+    Returns:
+        Union[None, tuple[str, str]]: Current yielding token state.
+    """
+
+    return session.yielding
+
+
+def get_ledger_index(session: AirdropSession) -> Union[int, str]:
+    """Returns the ledger index every request is pinned to.
+
+    Args:
+        session (AirdropSession): The session in question.
+
+    Returns:
+        Union[int, str]: The pinned ledger index, or "validated" if no ledger has been pinned yet.
+    """
+
+    ledger_index = session.ledger_index
+
+    if isinstance(ledger_index, type(None)):
+        return "validated"
+
+    return ledger_index
+
+
+def set_ledger_index(session: AirdropSession, index: int) -> bool:
+    """Pins all further requests to a given ledger index, if one hasn't been pinned already.
+
+    Args:
+        session (AirdropSession): The session to pin the ledger of.
+        index (int): The ledger index. Must be larger than 0.
+
+    Returns:
+        bool: `True` if the index is valid and no ledger has been pinned yet, otherwise returns `False`.
+    """
+
+    if not isinstance(session.ledger_index, type(None)) or type(index) is not int or index <= 0:
+        return False
+
+    session.ledger_index = index
+
+    return True
+
+
+def pin_ledger_index(session: AirdropSession, client: WebsocketClient) -> bool:
+    """Pins all further requests to the latest validated ledger, unless a ledger has already been pinned.
+
+    Args:
+        session (AirdropSession): The session to pin the ledger of.
+        client (WebsocketClient): WebSocket XRPL client.
+
+    Returns:
+        bool: `True` if a ledger is pinned after the call, `False` if the latest validated ledger couldn't be fetched.
+    """
+
+    if not isinstance(session.ledger_index, type(None)):
+        return True
+
+    try:
+        response = client.request(Ledger(ledger_index="validated"))
+
+        if not response.is_successful() or not response.is_valid():
+            return False
+
+        return set_ledger_index(session, int(response.result["ledger_index"]))
+
+    except:
+        return False
+
+
+def get_balance_key(yielding: Union[None, tuple[str, tuple[str, Union[None, str]]]]) -> Union[None, str]:
+    """Returns the key yielding token balances are cached under, which tells XRP and identically named tokens of different issuers apart.
+
+    Args:
+        yielding (Union[None, tuple[str, tuple[str, Union[None, str]]]]): The yielding token, as its issuer and currency.
+
+    Returns:
+        Union[None, str]: "XRP", "<currency>:<issuer>" for issued tokens, or `None` if no yielding token has been set.
+    """
+
+    if isinstance(yielding, type(None)):
+        return None
+
+    issuer, currency = yielding
+
+    if issuer.lower() == "xrp":
+        return "XRP"
+
+    return f'{ currency[0] }:{ issuer }'
+
+
+def get_yielding_peer(session: AirdropSession) -> Union[None, str]:
+    """Returns the issuer of the yielding token, which trustline lookups are filtered by.
+
+    Args:
+        session (AirdropSession): The session in question.
+
+    Returns:
+        Union[None, str]: The issuing address, or `None` if the yielding token is XRP or hasn't been set.
+    """
+
+    yielding = session.yielding
+
+    if isinstance(yielding, type(None)) or yielding[0].lower() == "xrp":
+        return None
+
+    return yielding[0]
+
+
+def is_trustline_absent(session: AirdropSession, address: str, token: str) -> bool:
+    """Tells whether an account is already known not to hold a trustline for `token` at the pinned ledger.
+
+    Args:
+        session (AirdropSession): The session holding the pinned ledger and the accounts known to lack a trustline.
+        address (str): The account in question.
+        token (str): The token identifier.
+
+    Returns:
+        bool: `True` if an earlier lookup found no trustline, `False` otherwise.
+    """
+
+    ledger_index = session.ledger_index
+
+    if isinstance(ledger_index, type(None)):
+        return False
+
+    return (ledger_index, address, token, get_yielding_peer(session)) in session.absent
+
+
+def mark_trustline_absent(session: AirdropSession, address: str, token: str) -> None:
+    """Remembers that an account doesn't hold a trustline for `token`, so it isn't asked again. Only done once a ledger is pinned, since the answer can change between ledgers.
+
+    Args:
+        session (AirdropSession): The session holding the pinned ledger and the accounts known to lack a trustline.
+        address (str): The account in question.
+        token (str): The token identifier.
+    """
+
+    ledger_index = session.ledger_index
+
+    if isinstance(ledger_index, type(None)):
+        return
+
+    session.absent.add((ledger_index, address, token, get_yielding_peer(session)))
+
+
+def update_issuing_metadata(session: AirdropSession, address: str, currency: str) -> bool:
+    """Updates source issuing address if it hasn't been set already.
+
+    Args:
+        session (AirdropSession): The session to set the issuing token of.
+        address (str): Source issuing address.
+        currency (str): Target token identifier.
+
+    Returns:
+        bool: `True` if issuing data hasn't been set, otherwise returns `False`.
+    """
+
+    if not isinstance(session.issuer, type(None)):
+        return False
+
+    session.issuer = (address, currency)
+
+    return True
+
+
+def update_yielding_token(session: AirdropSession, token: tuple[str, tuple[str, Union[None, str]]]) -> bool:
+    """Updates the currency identifier which we use to calculate the total yield per token for the entire airdrop.
+
+    Args:
+        session (AirdropSession): The session to set the yielding token of.
+        currency (str): Currency ID to update with.
+
+    Returns:
+        bool: `True` if currency identifier hasn't been set, otherwise returns `False`.
+    """
+
+    if not isinstance(session.yielding, type(None)):
+        return False
+
+    session.yielding = token
+
+    return True
+
+
+class RateLimitedError(AssertionError):
+    """Raised when an XRPL server answers with `slowDown`, as opposed to failing outright."""
+
+
+class RequestRejectedError(AssertionError):
+    """Raised when an XRPL server rejects a request in a way retrying won't fix, like asking for a ledger it doesn't have."""
+
+    def __init__(self, error: str) -> None:
+        super().__init__(error)
+
+        self.error: str = error
+
+
+class BalanceFetchError(Exception):
+    """Raised by the balance engines once a trustline's balance can't be fetched, either because the XRPL rejected the request or because it kept failing for `REQUEST_ATTEMPTS` attempts."""
+
+    def __init__(self, address: str, error: Union[None, str] = None) -> None:
+        super().__init__(address, error)
+
+        self.address: str              = address
+        self.error:   Union[None, str] = error
+
+
+class RateLimiter():
+    """Token bucket for a single XRPL endpoint. The refill rate is steered with AIMD: every success nudges it up, every `slowDown` halves it, and the server's `load_factor` caps it."""
+
+    def __init__(self, rate: float = 50.0, minimum: float = 1.0, maximum: float = 500.0, increase: float = 0.1) -> None:
+        """Creates a rate limiter with a full bucket.
+
+        Args:
+            rate (float): Initial requests per second.
+            minimum (float): Requests per second the rate is never decreased below.
+            maximum (float): Requests per second the rate is never increased above, before scaling by the server load.
+            increase (float): Requests per second added to the rate for every successful request.
+        """
+
+        self.lock:     Lock  = Lock()
+        self.rate:     float = rate
+        self.minimum:  float = minimum
+        self.maximum:  float = maximum
+        self.increase: float = increase
+        self.ceiling:  float = maximum
+        self.tokens:   float = rate
+        self.updated:  float = time()
+        self.requests: int   = 0
+
+    def reserve(self) -> float:
+        """Takes a token from the bucket, going into debt if it's empty.
+
+        Returns:
+            float: Seconds the caller has to wait before sending its request.
+        """
+
+        with self.lock:
+            now = time()
+
+            self.tokens   = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated  = now
+            self.tokens  -= 1
+            self.requests += 1
+
+            if self.tokens >= 0:
+                return 0.0
+
+            return -self.tokens / self.rate
+
+    def acquire(self) -> None:
+        """Blocks the calling thread until a request may be sent."""
+
+        sleep(self.reserve())
+
+    async def acquire_async(self) -> None:
+        """Suspends the calling task until a request may be sent."""
+
+        await sleep_async(self.reserve())
+
+    def on_success(self) -> None:
+        """Additively increases the rate after a successful request."""
+
+        with self.lock:
+            self.rate = min(self.ceiling, self.rate + self.increase)
+
+    def on_throttle(self) -> None:
+        """Multiplicatively decreases the rate and drains the bucket after the server asked us to slow down."""
+
+        with self.lock:
+            self.rate   = max(self.minimum, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def on_load(self, load_factor: float) -> None:
+        """Caps the rate according to the server's reported load, where a load factor of 1 means an idle server.
+
+        Args:
+            load_factor (float): The `load_factor` reported by `server_info`.
+        """
+
+        with self.lock:
+            self.ceiling = max(self.minimum, self.maximum / max(1.0, load_factor))
+            self.rate    = min(self.rate, self.ceiling)
+
+    def wants_load_sample(self) -> bool:
+        """Tells whether it's time to sample the server's load again, which is every 256 requests.
+
+        Returns:
+            bool: `True` if the load should be sampled, `False` otherwise.
+        """
+
+        return self.requests % 256 == 0
+
+
+def get_rate_limiter(address: str) -> RateLimiter:
+    """Returns the rate limiter of a given endpoint, creating it if it doesn't exist. Limiters are shared by every client and engine talking to that endpoint.
+
+    Args:
+        address (str): The WebSocket address of the endpoint.
+
+    Returns:
+        RateLimiter: The endpoint's rate limiter.
+    """
+
+    global RATE_LIMITERS, ENDPOINT_LOCK
+
+    with ENDPOINT_LOCK:
+        if address not in RATE_LIMITERS:
+            RATE_LIMITERS[address] = RateLimiter()
+
+        return RATE_LIMITERS[address]
+
+
+def get_backoff(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Calculates a jittered exponential backoff delay, so retrying workers don't all hit the server at the same moment.
+
+    Args:
+        attempt (int): How many times the request has failed in a row, starting from 1.
+        base (float): Delay ceiling of the first attempt in seconds.
+        cap (float): Maximum delay ceiling in seconds.
+
+    Returns:
+        float: Seconds to wait before retrying.
+    """
+
+    return uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def get_request_attempts() -> int:
+    """Returns how many times a single balance request is tried before the balance engines give up on it.
+
+    Returns:
+        int: Request attempts.
+    """
+
+    global REQUEST_ATTEMPTS
+    return REQUEST_ATTEMPTS
+
+
+def validate_response(response: Response) -> None:
+    """Makes sure the XRPL considers a given response successful and valid.
+
+    Args:
+        response (Response): The response in question.
+
+    Raises:
+        RateLimitedError: If the server asked us to slow down.
+        RequestRejectedError: If the server rejected the request with one of the `REJECTED_ERRORS`.
+        AssertionError: Upon any other non-successful or invalid response.
+    """
+
+    global REJECTED_ERRORS
+
+    if response.is_successful() and response.is_valid():
+        return
+
+    if isinstance(response.result, dict) and response.result.get("error") == "slowDown":
+        raise RateLimitedError
+
+    if isinstance(response.result, dict) and response.result.get("error") in REJECTED_ERRORS:
+        raise RequestRejectedError(response.result["error"])
+
+    raise AssertionError
+
+
+def fetch_load_factor(client: WebsocketClient) -> float:
+    """Fetches the current load factor of the server behind `client`.
+
+    Args:
+        client (WebsocketClient): WebSocket XRPL client.
+
+    Raises:
+        AssertionError: If the request fails.
+
+    Returns:
+        float: The load factor, where 1 means an idle server.
+    """
+
+    response = client.request(ServerInfo())
+
+    validate_response(response)
+
+    return float(response.result["info"].get("load_factor", 1))
+
+
+async def fetch_load_factor_async(client: AsyncWebsocketClient) -> float:
+    """Asyncio counterpart of `fetch_load_factor`.
+
+    Args:
+        client (AsyncWebsocketClient): WebSocket XRPL client.
+
+    Raises:
+        AssertionError: If the request fails.
+
+    Returns:
+        float: The load factor, where 1 means an idle server.
+    """
+
+    response = await client.request(ServerInfo())
+
+    validate_response(response)
+
+    return float(response.result["info"].get("load_factor", 1))
+
+
+@dataclass(frozen=True)
+class Endpoint():
+    """A configured XRPL WebSocket endpoint."""
+
+    url:         str
+    weight:      float = 1.0
+    concurrency: int   = 1
+
+
+@dataclass
+class EndpointStats():
+    """Per-endpoint counters, shared by the client pool and the asyncio engine."""
+
+    acquired:   int          = 0
+    in_use:     int          = 0
+    failures:   int          = 0
+    reconnects: int          = 0
+    hedged:     int          = 0
+    waited:     float        = 0.0
+    samples:    int          = 0
+    recent:     deque[float] = field(default_factory=lambda: deque(maxlen=256))
+    healthy:    bool         = True
+
+
+def get_endpoint_stats(address: str) -> EndpointStats:
+    """Returns the stats of a given endpoint, creating them if they don't exist.
+
+    Args:
+        address (str): The WebSocket address of the endpoint.
+
+    Returns:
+        EndpointStats: The endpoint's stats.
+    """
+
+    global ENDPOINT_STATS, ENDPOINT_LOCK
+
+    with ENDPOINT_LOCK:
+        if address not in ENDPOINT_STATS:
+            ENDPOINT_STATS[address] = EndpointStats()
+
+        return ENDPOINT_STATS[address]
+
+
+def record_latency(address: str, seconds: float) -> None:
+    """Records the round trip time of a single request. Only the most recent 256 samples per endpoint are kept.
+
+    Args:
+        address (str): The WebSocket address of the endpoint.
+        seconds (float): Round trip time of the request.
+    """
+
+    stats = get_endpoint_stats(address)
+
+    with ENDPOINT_LOCK:
+        stats.samples += 1
+        stats.recent.append(seconds)
+
+
+def get_latency(address: str, percentile: float = 50) -> Union[None, float]:
+    """Returns a latency percentile of an endpoint over its recent requests.
+
+    Args:
+        address (str): The WebSocket address of the endpoint.
+        percentile (float): The percentile, such as 50 for the median or 99 for the tail latency.
+
+    Returns:
+        Union[None, float]: The latency in seconds, or `None` if the endpoint has no samples yet.
+    """
+
+    global ENDPOINT_STATS, ENDPOINT_LOCK
+
+    with ENDPOINT_LOCK:
+        stats = ENDPOINT_STATS.get(address)
+
+        if isinstance(stats, type(None)) or len(stats.recent) <= 0:
+            return None
+
+        recent = sorted(stats.recent)
+
+    return recent[min(len(recent) - 1, int(len(recent) * percentile / 100))]
+
+
+def is_endpoint_degraded(address: str) -> bool:
+    """Tells whether an endpoint's p99 latency has gotten `DEGRADED_LATENCY` times worse than the fastest healthy endpoint's.
+
+    Args:
+        address (str): The WebSocket address of the endpoint.
+
+    Returns:
+        bool: `True` if the endpoint should be avoided, `False` otherwise.
+    """
+
+    global ENDPOINT_STATS, DEGRADED_LATENCY
+
+    stats = ENDPOINT_STATS.get(address)
+
+    # We need a handful of samples before judging an endpoint.
+    if isinstance(stats, type(None)) or stats.samples < 16:
+        return False
+
+    latency   = get_latency(address, 99)
+    latencies = [ get_latency(other, 99) for other, other_stats in list(ENDPOINT_STATS.items()) if other_stats.healthy ]
+    fastest   = min([ other for other in latencies if not isinstance(other, type(None)) ], default=latency)
+
+    return latency > fastest * DEGRADED_LATENCY
+
+
+def get_fastest_address(addresses: list[str]) -> Union[None, str]:
+    """Picks the healthy endpoint with the lowest median latency. Endpoints without samples are considered as fast as the fastest one, so they get tried.
+
+    Args:
+        addresses (list[str]): The WebSocket addresses to choose from.
+
+    Returns:
+        Union[None, str]: The fastest address, or `None` if `addresses` is empty.
+    """
+
+    if len(addresses) <= 0:
+        return None
+
+    latencies = { address: get_latency(address) for address in addresses }
+    known     = [ latency for latency in latencies.values() if not isinstance(latency, type(None)) ]
+    fastest   = min(known, default=0.0)
+
+    return min(addresses, key=lambda address: (not get_endpoint_stats(address).healthy, is_endpoint_degraded(address), fastest if isinstance(latencies[address], type(None)) else latencies[address]))
+
+
+def get_endpoints(session: AirdropSession) -> list[Endpoint]:
+    """Returns the configured XRPL WebSocket endpoints, falling back to the public ones.
+
+    Args:
+        session (AirdropSession): The session in question.
+
+    Returns:
+        list[Endpoint]: The configured endpoints.
+    """
+
+    if len(session.endpoints) <= 0:
+        return [
+            Endpoint("wss://xrplcluster.com/"),
+            Endpoint("wss://s1.ripple.com/"),
+            Endpoint("wss://s2.ripple.com/")
+        ]
+
+    return session.endpoints
+
+
+def set_endpoints(session: AirdropSession, endpoints: list[dict]) -> bool:
+    """Sets the XRPL WebSocket endpoints from their configuration, if they haven't been set already. Setting the same endpoints again is allowed, so a session can keep the endpoints handed over by the one before it.
+
+    Args:
+        session (AirdropSession): The session to set the endpoints of.
+        endpoints (list[dict]): Endpoint configurations, each with an `url` and optionally a `weight` and `concurrency`.
+
+    Returns:
+        bool: `True` if every endpoint is valid and no other endpoints were set before, `False` otherwise.
+    """
+
+    if not isinstance(endpoints, list) or len(endpoints) <= 0:
+        return False
+
+    parsed = [ ]
+
+    try:
+        for endpoint in endpoints:
+
+            url         = endpoint["url"]
+            weight      = float(endpoint.get("weight", 1))
+            concurrency = int(endpoint.get("concurrency", 1))
+
+            if not isinstance(url, str) or not url.startswith(("ws://", "wss://")) or weight <= 0 or concurrency < 1:
+                return False
+
+            parsed.append(Endpoint(url, weight, concurrency))
+
+    except:
+        return False
+
+    if len(session.endpoints) >= 1:
+        return parsed == session.endpoints
+
+    session.endpoints = parsed
+
+    return True
+
+
+class Multiplexed():
+    """Mixin over xrpl-py's WebSocket clients that lets many requests share one socket. Requests get monotonic IDs instead of random ones, so concurrent requests can't collide, and batches are written back to back before any reply is awaited.
+
+    Replies are matched to their request by ID. Unlike xrpl-py, answered replies aren't also pushed onto the message queue, which would otherwise grow for as long as the client is open.
+    """
+
+    def __init__(self, url: str) -> None:
+        """Creates a multiplexed client. The client isn't connected until `open` is called.
+
+        Args:
+            url (str): The WebSocket address of the XRPL endpoint.
+        """
+
+        super().__init__(url)
+
+        self._request_ids = count(1)
+
+    async def _handler(self) -> None:
+
+        try:
+            async for message in self._websocket:
+
+                response = loads(message)
+                future   = self._open_requests.pop(str(response.get("id")), None)
+
+                # Only unsolicited messages, like subscription streams, are queued for iteration.
+                if isinstance(future, type(None)):
+                    self._messages.put_nowait(response)
+                    continue
+
+                # A request may have given up on its reply, in which case its future is already done.
+                if not future.done():
+                    future.set_result(response)
+
+        finally:
+            # Once the socket is gone no reply can arrive anymore, so waiting requests fail instead of hanging.
+            for future in self._open_requests.values():
+
+                if not future.done():
+                    future.set_exception(ConnectionError())
+
+    async def _do_request_impl(self, request: Request) -> Response:
+
+        responses = await self._do_request_batch([ request ])
+
+        return responses[0]
+
+    async def _do_request_batch(self, requests: list[Request]) -> list[Response]:
+        """Writes every request to the socket back to back, then waits for all of their replies.
+
+        Args:
+            requests (list[Request]): The requests to send. Any `id` they carry is replaced.
+
+        Raises:
+            ConnectionError: If the client isn't open.
+
+        Returns:
+            list[Response]: The replies, in the same order as `requests`.
+        """
+
+        if not self.is_open():
+            raise ConnectionError
+
+        loop    = get_running_loop()
+        ids     = [ f"{request.method}_{next(self._request_ids)}" for request in requests ]
+        futures = [ ]
+
+        try:
+            for request_id in ids:
+
+                future = loop.create_future()
+
+                self._open_requests[request_id] = future
+
+                futures.append(future)
+
+            for request_id, request in zip(ids, requests):
+
+                payload       = request_to_websocket(request)
+                payload["id"] = request_id
+
+                await self._websocket.send(dumps(payload))
+
+            replies = await gather(*futures)
+
+        finally:
+            for request_id in ids:
+                self._open_requests.pop(request_id, None)
+
+        return [ websocket_to_response(reply) for reply in replies ]
+
+
+class MultiplexedClient(Multiplexed, WebsocketClient):
+    """Blocking XRPL WebSocket client which can send a batch of requests over its socket at once."""
+
+    def request_batch(self, requests: list[Request]) -> list[Response]:
+        """Sends every request without waiting in between, blocking until all replies have arrived.
+
+        Args:
+            requests (list[Request]): The requests to send.
+
+        Raises:
+            ConnectionError: If the client isn't open.
+
+        Returns:
+            list[Response]: The replies, in the same order as `requests`.
+        """
+
+        if not self.is_open():
+            raise ConnectionError
+
+        return run_coroutine_threadsafe(self._do_request_batch(requests), self._loop).result()
+
+
+class AsyncMultiplexedClient(Multiplexed, AsyncWebsocketClient):
+    """Asyncio XRPL WebSocket client which can send a batch of requests over its socket at once."""
+
+    async def request_batch(self, requests: list[Request]) -> list[Response]:
+        """Sends every request without waiting in between, suspending until all replies have arrived.
+
+        Args:
+            requests (list[Request]): The requests to send.
+
+        Raises:
+            ConnectionError: If the client isn't open.
+
+        Returns:
+            list[Response]: The replies, in the same order as `requests`.
+        """
+
+        return await self._do_request_batch(requests)
+
+    async def receive(self, timeout: float) -> Union[None, dict]:
+        """Waits for the next unsolicited message, like a subscription stream update. Unlike iterating over the client, giving up on a message doesn't end the iteration.
+
+        Args:
+            timeout (float): How many seconds to wait for at most.
+
+        Raises:
+            ConnectionError: If the client isn't open.
+
+        Returns:
+            Union[None, dict]: The message, or `None` if none arrived in time.
+        """
+
+        if not self.is_open():
+            raise ConnectionError
+
+        try:
+            return await wait_for(self._messages.get(), timeout)
+
+        except WaitTimeoutError:
+            return None
+
+    def clear_messages(self) -> int:
+        """Drops every unsolicited message that hasn't been received yet, like stream updates that arrived while nobody was listening.
+
+        Returns:
+            int: How many messages got dropped.
+        """
+
+        dropped = 0
+
+        while not self._messages.empty():
+            self._messages.get_nowait()
+
+            dropped += 1
+
+        return dropped
+
+
+class ClientPool():
+    """Bounded pool of XRPL WebSocket clients. Checking a client out blocks until one is free instead of spinning."""
+
+    def __init__(self, endpoints: list[Endpoint]) -> None:
+        """Creates a pool holding `concurrency` clients per endpoint. Clients aren't connected until `open` is called.
+
+        Args:
+            endpoints (list[Endpoint]): The XRPL endpoints.
+        """
+
+        self.condition: Condition                = Condition()
+        self.clients:   list[MultiplexedClient]  = [ MultiplexedClient(endpoint.url) for endpoint in endpoints for _ in range(endpoint.concurrency) ]
+        self.idle:      list[MultiplexedClient]  = [ ]
+        self.weights:   dict[str, float]         = { endpoint.url: endpoint.weight for endpoint in endpoints }
+        self.stats:     dict[str, EndpointStats] = { endpoint.url: get_endpoint_stats(endpoint.url) for endpoint in endpoints }
+
+    def open(self) -> bool:
+        """Connects every client, only keeping the ones that could be connected.
+
+        Returns:
+            bool: `True` if at least one client could be connected, `False` otherwise.
+        """
+
+        with self.condition:
+            for client in self.clients:
+
+                try:
+                    client.open()
+
+                    self.idle.append(client)
+
+                except:
+                    self.stats[client.url].healthy = False
+
+            self.clients = list(self.idle)
+
+            self.condition.notify_all()
+
+            return len(self.clients) >= 1
+
+    def acquire(self, timeout: Union[None, float] = None) -> MultiplexedClient:
+        """Checks out a free client, blocking until one is returned to the pool. Dropped sockets are reconnected before handing them out.
+
+        Args:
+            timeout (Union[None, float]): Seconds to wait for a free client, or `None` to wait indefinitely.
+
+        Raises:
+            TimeoutError: If no client became free within `timeout`.
+            ConnectionError: If the checked out client's socket was dropped and couldn't be reconnected.
+
+        Returns:
+            MultiplexedClient: A connected client, which must be given back with `release`.
+        """
+
+        start_time = time()
+
+        with self.condition:
+            if not self.condition.wait_for(lambda: len(self.idle) >= 1, timeout):
+                raise TimeoutError
+
+            client = self.select()
+            stats  = self.stats[client.url]
+
+            self.idle.remove(client)
+
+            stats.acquired += 1
+            stats.in_use   += 1
+            stats.waited   += time() - start_time
+
+        # Health check happens outside of the lock, so a slow reconnect doesn't block other workers.
+        if not client.is_open():
+            try:
+                client.open()
+
+                stats.reconnects += 1
+                stats.healthy     = True
+
+            except:
+                stats.healthy = False
+
+                self.release(client, True)
+
+                raise ConnectionError
+
+        return client
+
+    def select(self) -> MultiplexedClient:
+        """Picks the idle client to hand out next, routing to the endpoints with the lowest median latency, spread by weight, while skipping endpoints with degraded latency. Must be called while holding the pool's lock.
+
+        Returns:
+            MultiplexedClient: The chosen idle client.
+        """
+
+        candidates = [ client for client in self.idle if not is_endpoint_degraded(client.url) ]
+
+        # If everything is degraded, a slow endpoint is still better than no endpoint.
+        if len(candidates) <= 0:
+            candidates = self.idle
+
+        latencies = { client.url: get_latency(client.url) for client in candidates }
+        fastest   = min([ latency for latency in latencies.values() if not isinstance(latency, type(None)) ], default=1.0)
+
+        # Endpoints without samples yet are scored as if they were the fastest, so they get tried.
+        def score(client: MultiplexedClient) -> float:
+
+            latency = latencies[client.url]
+
+            if isinstance(latency, type(None)) or latency <= 0:
+                latency = fastest
+
+            return self.weights[client.url] / ((self.stats[client.url].in_use + 1) * max(latency, 0.001))
+
+        return max(candidates, key=score)
+
+    def release(self, client: MultiplexedClient, failed: bool = False) -> None:
+        """Gives a checked out client back to the pool, waking up one waiting worker.
+
+        Args:
+            client (MultiplexedClient): The client previously returned by `acquire`.
+            failed (bool): Whether a request on the client failed. Failed clients are disconnected, so they're reconnected on their next checkout.
+        """
+
+        if failed:
+            self.stats[client.url].failures += 1
+
+            try:
+                client.close()
+
+            except:
+                pass
+
+        with self.condition:
+            if client not in self.idle:
+                self.idle.append(client)
+
+                self.stats[client.url].in_use -= 1
+
+            self.condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: Union[None, float] = None) -> Iterator[MultiplexedClient]:
+        """Checks out a client for the duration of a `with` block, releasing it as failed if the block raises.
+
+        Args:
+            timeout (Union[None, float]): Seconds to wait for a free client, or `None` to wait indefinitely.
+
+        Yields:
+            MultiplexedClient: A connected client.
+        """
+
+        client = self.acquire(timeout)
+
+        try:
+            yield client
+
+        # Being asked to slow down doesn't mean the socket is broken, so we don't drop it.
+        except RateLimitedError:
+            self.release(client)
+            raise
+
+        except:
+            self.release(client, True)
+            raise
+
+        self.release(client)
+
+    def close(self) -> bool:
+        """Disconnects every client in the pool.
+
+        Returns:
+            bool: `True` if every client was disconnected, `False` otherwise.
+        """
+
+        success = True
+
+        with self.condition:
+            for client in self.clients:
+
+                try:
+                    if client.is_open():
+                        client.close()
+
+                except:
+                    success = False
+
+            self.clients = [ ]
+            self.idle    = [ ]
+
+        return success
+
+
+def populate_clients(session: AirdropSession) -> bool:
+    """Populates available clients. A pool handed over by an earlier session is kept, as it reconnects dropped sockets by itself.
+
+    Args:
+        session (AirdropSession): The session to populate the clients of.
+
     Returns:
-        Union[None, tuple[str, Union[None, str]]]: Current issuer token state.
+        bool: If creating WebSocket clients was successful.
     """
 
-    global SELECTED_TRUSTLINE
-    return SELECTED_TRUSTLINE
+    if not isinstance(session.pool, type(None)) and len(session.pool.clients) >= 1:
+        return True
+
+    session.pool = ClientPool(get_endpoints(session))
 
+    return session.pool.open()
 
-def get_yielding() -> Union[None, tuple[str, tuple[str, Union[None, str]]]]:
-    """Returns the current state for the yielding token.
+
+def get_client_pool(session: AirdropSession) -> Union[None, ClientPool]:
+    """Returns the client pool set up by `populate_clients`.
+
+    Args:
+        session (AirdropSession): The session in question.
 
     Returns:
-        Union[None, tuple[str, str]]: Current yielding token state.
+        Union[None, ClientPool]: The client pool, or `None` if clients haven't been populated.
     """
 
-    global YIELDING_TOKEN
-    return YIELDING_TOKEN
+    return session.pool
 
 
-def update_issuing_metadata(address: str, currency: str) -> bool:
-    """Updates source issuing address if it hasn't been set already.
+def dispose_clients(session: AirdropSession) -> bool:
+    """Disposes and deletes previously defined clients.
 
     Args:
-        address (str): Source issuing address.
-        currency (str): Target token identifier.
+        session (AirdropSession): The session to dispose the clients of.
 
     Returns:
-        bool: `True` if issuing data hasn't been set, otherwise returns `False`.
+        bool: `True` if disposing was a success, `False` otherwise.
     """
 
-    global SELECTED_TRUSTLINE
+    if isinstance(session.pool, type(None)):
+        return True
 
-    if not isinstance(SELECTED_TRUSTLINE, type(None)):
-        return False
+    try:
+        return session.pool.close()
 
-    SELECTED_TRUSTLINE = (address, currency)
+    except:
+        return False
 
-    return True
+    finally:
+        session.pool = None
 
 
-def update_yielding_token(token: tuple[str, tuple[str, Union[None, str]]]) -> bool:
-    """Updates the currency identifier which we use to calculate the total yield per token for the entire airdrop.
+def get_client(session: AirdropSession) -> WebsocketClient:
+    """Returns an active XRPL WebSocket client, or creates a new one if no active client exists.
 
     Args:
-        currency (str): Currency ID to update with.
+        session (AirdropSession): The session to get the client of.
 
     Returns:
-        bool: `True` if currency identifier hasn't been set, otherwise returns `False`.
+        WebsocketClient: XRPL API WebSocket client.
     """
+    try:
+        if isinstance(session.client, type(None)):
+            session.client = MultiplexedClient(max(get_endpoints(session), key=lambda endpoint: endpoint.weight).url)
 
-    global YIELDING_TOKEN
+        if not session.client.is_open():
+            session.client.open()
 
-    if not isinstance(YIELDING_TOKEN, type(None)):
-        return False
+        return session.client
+
+    except:
+        session.client.close()
 
-    YIELDING_TOKEN = token
+        return session.client
 
-    return True
 
+def fetch_xrpl_metadata_page(session: Session, offset: int) -> dict:
+    """Fetches a single page of token metadata from XRPLMeta.
+
+    Args:
+        session (Session): HTTP session, shared between pages so connections are reused.
+        offset (int): Amount of tokens to skip.
 
-def populate_clients() -> bool:
-    """Populates available clients.
+    Raises:
+        HTTPError: If the request fails.
 
     Returns:
-        bool: If creating WebSocket clients was successful.
+        dict: The decoded page.
     """
 
-    global XRPL_CLIENTS
+    global XRPL_META_URL, XRPL_META_STEP
 
-    addresses = [
-        "wss://xrplcluster.com/",
-        "wss://s1.ripple.com/",
-        "wss://s2.ripple.com/"
-    ]
+    response = session.get(XRPL_META_URL, params={ "limit": XRPL_META_STEP, "trust_level": [ 1, 2, 3 ], "offset": offset }, timeout=30)
 
-    for address in addresses:
+    response.raise_for_status()
 
-        try:
-            client = WebsocketClient(address)
+    return response.json()
 
-            if not client.is_open():
-                client.open()
 
-            XRPL_CLIENTS.append(client)
+def read_xrpl_metadata_page(page: dict, offset: int, count: int, results: dict[str, list[tuple[str, Union[None, str]]]]) -> None:
+    """Merges every token of a single XRPLMeta page into `results`, after checking the page is the one we asked for.
 
-        except:
+    Args:
+        page (dict): The decoded page.
+        offset (int): The offset the page was requested at.
+        count (int): The total token count reported by the first page.
+        results (dict[str, list[tuple[str, Union[None, str]]]]): Issued tokens per issuer, updated in place.
+
+    Raises:
+        ValueError: If the page reports a different total, or holds a different amount of tokens than a page at `offset` should.
+    """
+
+    global XRPL_META_STEP
+
+    if int(page["count"]) != count or len(page["tokens"]) != min(XRPL_META_STEP, count - offset):
+        raise ValueError
+
+    for token in page["tokens"]:
+
+        metadata = token["meta"]["token"]
+        issuer   = token["issuer"]
+        id       = token["currency"]
+        name     = None
+
+        if "name" in metadata:
+            name = metadata["name"]
+
+        if issuer not in results:
+            results[issuer] = [ ]
+
+        # Tokens shifting between pages mid-sync can show up twice, which the count check below catches.
+        if id in [ issued for issued, _ in results[issuer] ]:
             continue
 
-    return len(XRPL_CLIENTS) >= 1
+        results[issuer].append((id, name))
 
 
-def get_available_client() -> Union[WebsocketClient, None]:
-    """Thread-safe client getter.
+def fetch_xrpl_metadata_pages(session: Session, first: dict) -> dict[str, list[tuple[str, Union[None, str]]]]:
+    """Fetches every page following `first` concurrently, and checks that together they hold exactly the amount of tokens XRPLMeta reported.
+
+    Args:
+        session (Session): HTTP session, shared between pages so connections are reused.
+        first (dict): The decoded first page.
+
+    Raises:
+        ValueError: If any page doesn't match the reported total, or tokens went missing.
+        HTTPError: If any request fails.
 
     Returns:
-        Union[WebsocketClient, None]: A free client or None if all clients are in use.
+        dict[str, list[tuple[str, Union[None, str]]]]: Issued tokens per issuer.
     """
 
-    global XRPL_CLIENTS, CLIENT_LOCK
+    global XRPL_META_STEP, XRPL_META_WORKERS
 
-    CLIENT_LOCK.acquire()
+    count   = int(first["count"])
+    results = { }
 
-    try:
-        if len(XRPL_CLIENTS) <= 0:
-            raise Exception
+    read_xrpl_metadata_page(first, 0, count, results)
 
-        client = XRPL_CLIENTS.pop()
+    # Pages are merged as soon as they arrive, in whatever order they complete.
+    with ThreadPoolExecutor(max_workers=XRPL_META_WORKERS) as pool:
 
-        if not client.is_open():
-            client.open()
+        futures = { pool.submit(fetch_xrpl_metadata_page, session, offset): offset for offset in range(XRPL_META_STEP, count, XRPL_META_STEP) }
 
-        return client
+        for future in as_completed(futures):
+            read_xrpl_metadata_page(future.result(), futures[future], count, results)
 
-    except:
-        return None
+    if sum([ len(tokens) for tokens in results.values() ]) != count:
+        raise ValueError
 
-    finally:
-        CLIENT_LOCK.release()
+    return results
 
 
-def return_client(client: WebsocketClient) -> None:
-    """Returns a given `client` to the available client pool.
+def get_xrpl_metadata_marker(page: dict) -> str:
+    """Returns a content marker for a decoded XRPLMeta page, covering the reported token count and everything the index keeps of each token on the page.
 
     Args:
-        client (WebsocketClient): Client which to return.
-    """
+        page (dict): The decoded page.
 
-    global XRPL_CLIENTS, CLIENT_LOCK
-
-    CLIENT_LOCK.acquire()
+    Returns:
+        str: The marker.
+    """
 
-    try:
-        if client not in XRPL_CLIENTS:
-            XRPL_CLIENTS.append(client)
+    tokens = [ (token["issuer"], token["currency"], token["meta"]["token"].get("name")) for token in page["tokens"] ]
 
-    except:
-        pass
+    return sha256(dumps([ int(page["count"]), tokens ]).encode("UTF8")).hexdigest()
 
-    finally:
-        CLIENT_LOCK.release()
 
+def fetch_xrpl_metadata() -> int:
+    """Fetches all token metadata from XRPMetadata into the local token index. XRPLMeta can't tell us which tokens changed since the last sync, so the index is only kept while XRPLMeta reports the same token count and first page as when it was written, and for no longer than `XRPL_META_TTL` seconds, as tokens further down may have been renamed, removed or added in between.
 
-def dispose_clients() -> bool:
-    """Disposes and deletes previously defined clients.
+    A sync that comes back incomplete, for instance because tokens were added while paging, or that fails on a later page, is retried from the first page. An incomplete sync is never written to the index.
 
     Returns:
-        bool: `False` if disposing was a success, `False` otherwise.
+        int: The amount of tokens in the index.
+
+    Raises:
+        ConnectionError: If XRPLMeta can't be reached and there's no local index to fall back on.
+        ValueError: If every attempt came back incomplete.
+        OSError: If the fetched tokens couldn't be written to the local index.
     """
 
-    global XRPL_CLIENTS
+    global XRPL_META_RETRIES, XRPL_META_WORKERS, XRPL_META_TTL
 
-    try:
-        for _ in range(len(XRPL_CLIENTS)):
+    indexed        = read_token_index_count()
+    marker, synced = read_token_index_marker()
 
-            if len(XRPL_CLIENTS) <= 0:
-                break
+    with Session() as session:
 
-            client = XRPL_CLIENTS.pop()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=XRPL_META_WORKERS))
 
-            if client.is_open():
-                client.close()
+        for attempt in range(XRPL_META_RETRIES):
 
-            del client
+            try:
+                first = fetch_xrpl_metadata_page(session, 0)
+                count = int(first["count"])
 
-        return True
+            # Being offline shouldn't stop us from using a slightly stale index.
+            except:
+                if isinstance(indexed, type(None)):
+                    raise ConnectionError
 
-    except:
-        return False
+                return indexed
 
+            if indexed == count and marker == get_xrpl_metadata_marker(first) and time() - synced < XRPL_META_TTL:
+                return indexed
 
-def get_client() -> WebsocketClient:
-    """Returns an active XRPL WebSocket client, or creates a new one if no active client exists.
+            try:
+                results = fetch_xrpl_metadata_pages(session, first)
+                break
 
-    Returns:
-        WebsocketClient: XRPL API WebSocket client.
-    """
-    global XRPL_CLIENT
+            except ValueError:
+                if attempt + 1 >= XRPL_META_RETRIES:
+                    raise
 
-    try:
-        if isinstance(XRPL_CLIENT, type(None)):
-            XRPL_CLIENT = WebsocketClient("wss://xrplcluster.com/")
+            # Losing XRPLMeta halfway through a sync is retried, and then treated like losing it on the first page.
+            except:
+                if attempt + 1 < XRPL_META_RETRIES:
+                    continue
 
-        if not XRPL_CLIENT.is_open():
-            XRPL_CLIENT.open()
+                if isinstance(indexed, type(None)):
+                    raise ConnectionError
 
-        return XRPL_CLIENT
+                return indexed
 
-    except:
-        XRPL_CLIENT.close()
+    if not write_token_index(count, results, get_xrpl_metadata_marker(first)):
+        raise OSError
 
-        return XRPL_CLIENT
+    return count
 
 
-@cache_to_disk()
-def fetch_xrpl_metadata() -> dict[str, list[tuple[str, Union[None, str]]]]:
-    """Fetches all token metadata from XRPMetadata.
+def iter_account_lines(session: AirdropSession, address: str, client: WebsocketClient) -> Iterator[list[dict]]:
+    """Pages through every `account_lines` entry of a given XRPL account, pinning later pages to the first page's ledger.
 
-    Returns:
-        dict[str, list[tuple[str, Union[None, str]]]]: Dictionary containing issuing addresses and all the tokens they've issued as a tuple list.
+    Args:
+        session (AirdropSession): The session holding the pinned ledger.
+        address (str):            Public address of the queried account.
+        client (WebsocketClient): WebSocket XRPL client.
 
     Raises:
-        NoCacheCondition: If the HTTP request(s) fail we disable caching for the output.
+        AssertionError: Upon non-successful or invalid response.
+
+    Yields:
+        list[dict]: The raw `lines` of a single page.
     """
 
-    results: dict[str, list[tuple[str, Union[None, str]]]] = { }
+    request  = AccountLines(account=address, ledger_index=get_ledger_index(session))
+    response = client.request(request)
 
-    iter_step  = 100
-    iterations = 0
+    while True:
+        # We throw if the XRPL considers this request to be unsuccessful, or the data to be invalid.
+        validate_response(response)
 
-    response = get("https://s1.xrplmeta.org/tokens", params={ "limit": iter_step, "trust_level": [ 1, 2, 3 ] }).json()
+        yield response.result["lines"]
 
-    try:
-        while True:
+        if "marker" not in response.result:
+            break
 
-            for token in response["tokens"]:
+        request  = AccountLines(account=address, ledger_index=response.result["ledger_index"], marker=response.result["marker"])
+        response = client.request(request)
 
-                metadata = token["meta"]["token"]
-                issuer   = token["issuer"]
 
-                if token["issuer"] not in results:
-                    results[issuer] = [ ]
+def iter_trustlines(session: AirdropSession, address: str, token_id: str, client: WebsocketClient) -> Iterator[list[str]]:
+    """Streaming variant of `fetch_trustlines`, yielding newly seen trustline addresses page by page.
 
-                    id   = token["currency"]
-                    name = None
+    Args:
+        session (AirdropSession): The session holding the pinned ledger.
+        address (str):            Public address of the issuing account.
+        token_id (str):           The issued token identifier.
+        client (WebsocketClient): WebSocket XRPL client.
 
-                    if "name" in metadata:
-                        name = metadata["name"]
+    Raises:
+        AssertionError: Upon non-successful or invalid response.
 
-                    results[issuer].append((id, name))
+    Yields:
+        list[str]: Unique trustline addresses found on a single page, in the order the XRPL returned them.
+    """
 
-            if response["count"] <= iterations:
-                break
+    seen: set[str] = set()
 
-            response = get("https://s1.xrplmeta.org/tokens", params={ "limit": iter_step, "trust_level": [ 1, 2, 3 ], "offset": iterations }).json()
-            iterations += iter_step
+    for lines in iter_account_lines(session, address, client):
 
-        return results
+        page: list[str] = [ ]
 
-    except:
-        raise NoCacheCondition()
+        for trustline in lines:
+            if trustline["currency"] != token_id or trustline["account"] in seen:
+                continue
 
+            seen.add(trustline["account"])
+            page.append(trustline["account"])
 
-def fetch_trustlines(address: str, token_id: str, client: WebsocketClient) -> list[(str, str)]:
+        yield page
+
+
+def fetch_trustlines(session: AirdropSession, address: str, token_id: str, client: WebsocketClient) -> list[str]:
     """Fetches all registered trustlines for XNET token for a given XRPL account.
 
     Args:
+        session (AirdropSession): The session holding the pinned ledger.
         address (str):            Public address of the queried account.
         client (WebsocketClient): WebSocket XRPL client.
 
@@ -279,38 +1354,58 @@ def fetch_trustlines(address: str, token_id: str, client: WebsocketClient) -> li
         AssertionError: Upon non-successful or invalid response.
 
     Returns:
-        list[(str, str)]: List of all unique trustlines.
+        list[str]: List of all unique trustlines.
     """
 
-    request  = AccountLines(account=address, ledger_index="validated")
-    response = client.request(request)
+    results: list[str] = [ ]
 
-    # We throw if the XRPL considers this request to be unsuccessful, or the data to be invalid.
-    if not response.is_successful() or not response.is_valid():
-        raise AssertionError
+    for page in iter_trustlines(session, address, token_id, client):
+        results.extend(page)
 
-    results: list[str] = [ ]
+    return results
 
-    while True:
-        for trustline in response.result["lines"]:
+
+def fetch_trustlines_with_balances(session: AirdropSession, address: str, token_id: str, client: WebsocketClient) -> dict[str, Decimal]:
+    """Fetches all registered trustlines for a token along with each holder's balance, in a single pass over the issuer's lines.
+
+    Only usable when the yielding token is the issued token itself, since the issuer's `account_lines` only carry balances of that token.
+
+    Args:
+        session (AirdropSession): The session holding the pinned ledger.
+        address (str):            Public address of the issuing account.
+        token_id (str):           The issued token identifier.
+        client (WebsocketClient): WebSocket XRPL client.
+
+    Raises:
+        AssertionError: Upon non-successful or invalid response.
+
+    Returns:
+        dict[str, Decimal]: Every unique trustline address and the balance it holds, including zero balances.
+    """
+
+    # Insertion-ordered, so the result keeps the order the XRPL returned the lines in.
+    results: dict[str, Decimal] = { }
+
+    for lines in iter_account_lines(session, address, client):
+        for trustline in lines:
             if trustline["currency"] != token_id or trustline["account"] in results:
                 continue
 
-            results.append(trustline["account"])
-
-        if "marker" not in response.result:
-            break
+            # Balances are reported from the issuer's point of view, so the holder's balance is the negation.
+            try:
+                results[trustline["account"]] = -Decimal(trustline["balance"])
 
-        request  = AccountLines(account=address, ledger_index=response.result["ledger_index"], marker=response.result["marker"])
-        response = client.request(request)
+            except:
+                results[trustline["account"]] = Decimal()
 
     return results
 
 
-def fetch_account_balance(address: str, token: str, client: WebsocketClient) -> Decimal:
+def fetch_account_balance(session: AirdropSession, address: str, token: str, client: WebsocketClient) -> Decimal:
     """Fetches XRP balance & ALL trustline token balances for a given account.
 
     Args:
+        session (AirdropSession): The session holding the pinned ledger and the yielding token.
         address (str): The actual account which we want to fetch balance information for.
         client (WebsocketClient): Request WebSocket client.
 
@@ -322,11 +1417,10 @@ def fetch_account_balance(address: str, token: str, client: WebsocketClient) ->
     """
 
     if token.lower() == "xrp":
-        request  = AccountInfo(account=address, ledger_index="validated")
+        request  = AccountInfo(account=address, ledger_index=get_ledger_index(session))
         response = client.request(request)
 
-        if not response.is_successful() or not response.is_valid():
-            raise AssertionError
+        validate_response(response)
 
         balance = response.result["account_data"]["Balance"]
 
@@ -335,31 +1429,167 @@ def fetch_account_balance(address: str, token: str, client: WebsocketClient) ->
 
         return drops_to_xrp(balance)
 
-    request  = AccountLines(account=address, ledger_index="validated")
+    if is_trustline_absent(session, address, token):
+        return None
+
+    # Filtering by the issuer makes the server return just the one relevant line, instead of every line the account holds.
+    request  = AccountLines(account=address, ledger_index=get_ledger_index(session), peer=get_yielding_peer(session))
     response = client.request(request)
 
-    if not response.is_successful() or not response.is_valid():
-        raise AssertionError
+    validate_response(response)
 
     while True:
-        for trustline in response.result["lines"]:
+        balance = find_trustline_balance(response.result["lines"], token)
+
+        if not isinstance(balance, type(None)):
+            return balance
+
+        if "marker" not in response.result:
+            mark_trustline_absent(session, address, token)
+            break
+
+        request  = AccountLines(account=address, ledger_index=response.result["ledger_index"], peer=get_yielding_peer(session), marker=response.result["marker"])
+        response = client.request(request)
+
+        validate_response(response)
+
+
+def fetch_account_balances(session: AirdropSession, addresses: list[str], token: str, client: MultiplexedClient) -> list[Union[Exception, None, Decimal]]:
+    """Fetches the balances of many accounts with a single batch of requests over one socket.
+
+    Args:
+        session (AirdropSession): The session holding the pinned ledger and the yielding token.
+        addresses (list[str]): The accounts which we want to fetch balance information for.
+        token (str): The token identifier, or "XRP".
+        client (MultiplexedClient): Request WebSocket client.
+
+    Raises:
+        ConnectionError: If the batch couldn't be sent at all.
+
+    Returns:
+        list[Union[Exception, None, Decimal]]: For every address in order, its balance, `None` if it doesn't hold a trustline for `token`, or the exception its request failed with.
+    """
 
-            if trustline["currency"] != token:
+    results: list[Union[Exception, None, Decimal]] = [ None for _ in addresses ]
+    pending: list[int]                              = [ index for index, address in enumerate(addresses) if not is_trustline_absent(session, address, token) ]
+
+    if len(pending) <= 0:
+        return results
+
+    if token.lower() == "xrp":
+        requests = [ AccountInfo(account=addresses[index], ledger_index=get_ledger_index(session)) for index in pending ]
+
+    else:
+        requests = [ AccountLines(account=addresses[index], ledger_index=get_ledger_index(session), peer=get_yielding_peer(session)) for index in pending ]
+
+    for index, response in zip(pending, client.request_batch(requests)):
+        try:
+            validate_response(response)
+
+            if token.lower() == "xrp":
+                balance = response.result["account_data"]["Balance"]
+
+                if isinstance(balance, type(None)):
+                    raise AssertionError
+
+                results[index] = drops_to_xrp(balance)
                 continue
 
-            balance = trustline["balance"]
+            balance = find_trustline_balance(response.result["lines"], token)
 
-            try:
-                if not isinstance(balance, type(Decimal)):
-                    balance = Decimal(balance)
+            # With the issuer filter a second page is very unlikely, so the odd one is paged through on its own.
+            if isinstance(balance, type(None)) and "marker" in response.result:
+                balance = fetch_account_balance(session, addresses[index], token, client)
 
-            except:
-                balance = Decimal()
+            elif isinstance(balance, type(None)):
+                mark_trustline_absent(session, addresses[index], token)
+
+            results[index] = balance
+
+        except Exception as error:
+            results[index] = error
+
+    return results
+
+
+async def fetch_account_balance_async(session: AirdropSession, address: str, token: str, client: AsyncWebsocketClient) -> Union[None, Decimal]:
+    """Asyncio counterpart of `fetch_account_balance`, meant to be awaited many times concurrently over one socket.
+
+    Args:
+        session (AirdropSession): The session holding the pinned ledger and the yielding token.
+        address (str): The actual account which we want to fetch balance information for.
+        token (str): The token identifier, or "XRP".
+        client (AsyncWebsocketClient): Request WebSocket client. Responses are matched back to requests by their `id`.
+
+    Raises:
+        AssertionError: If any of the requests fail.
+
+    Returns:
+        Union[None, Decimal]: The token balance, or `None` if the account doesn't hold a trustline for `token`.
+    """
+
+    if token.lower() == "xrp":
+        request  = AccountInfo(account=address, ledger_index=get_ledger_index(session))
+        response = await client.request(request)
+
+        validate_response(response)
+
+        balance = response.result["account_data"]["Balance"]
 
+        if isinstance(balance, type(None)):
+            raise AssertionError
+
+        return drops_to_xrp(balance)
+
+    if is_trustline_absent(session, address, token):
+        return None
+
+    request  = AccountLines(account=address, ledger_index=get_ledger_index(session), peer=get_yielding_peer(session))
+    response = await client.request(request)
+
+    validate_response(response)
+
+    while True:
+        balance = find_trustline_balance(response.result["lines"], token)
+
+        if not isinstance(balance, type(None)):
             return balance
 
         if "marker" not in response.result:
-            break
+            mark_trustline_absent(session, address, token)
+            return None
 
-        request  = AccountLines(account=address, ledger_index=response.result["ledger_index"], marker=response.result["marker"])
-        response = client.request(request)
+        request  = AccountLines(account=address, ledger_index=response.result["ledger_index"], peer=get_yielding_peer(session), marker=response.result["marker"])
+        response = await client.request(request)
+
+        validate_response(response)
+
+
+def find_trustline_balance(lines: list[dict], token: str) -> Union[None, Decimal]:
+    """Picks the balance of `token` out of a single page of `account_lines` results.
+
+    Args:
+        lines (list[dict]): The `lines` field of an `account_lines` response.
+        token (str): The token identifier which to look for.
+
+    Returns:
+        Union[None, Decimal]: The balance, or `None` if the page doesn't contain a line for `token`.
+    """
+
+    for trustline in lines:
+
+        if trustline["currency"] != token:
+            continue
+
+        balance = trustline["balance"]
+
+        try:
+            if not isinstance(balance, type(Decimal)):
+                balance = Decimal(balance)
+
+        except:
+            balance = Decimal()
+
+        return balance
+
+    return None
@@ -0,0 +1,63 @@
+"""Stub XRPL client for the payment engine."""
+
+from xrpl.models.transactions import Transaction
+from xrpl.models.response     import Response, ResponseStatus
+from collections              import Counter
+
+
+class StubClient():
+    """Answers the few commands the payment engine sends, counting them by command. Every submitted payment gets validated in the next ledger, except for those listed in `rejected`, which are turned down once, and those listed in `results`, which always get that engine result without ever being applied."""
+
+    def __init__(self, base_fee: int = 10, open_ledger_fee: int = 12, rejected: set[int] = None, results: dict[int, str] = None) -> None:
+        self.requests: Counter        = Counter()
+        self.messages: list[dict]     = [ ]
+        self.rejected: set[int]       = set(rejected or [ ])
+        self.results:  dict[int, str] = dict(results or { })
+        self.sequence: int            = 1
+        self.ledger:   int            = 100
+        self.drops:    dict           = { "base_fee": str(base_fee), "open_ledger_fee": str(open_ledger_fee), "minimum_fee": str(base_fee), "median_fee": "5000" }
+
+    async def request(self, request) -> Response:
+
+        command = request.method.value
+
+        self.requests[command] += 1
+
+        if command == "account_info":
+            return Response(status=ResponseStatus.SUCCESS, result={ "account_data": { "Sequence": self.sequence }, "ledger_index": self.ledger })
+
+        if command == "fee":
+            return Response(status=ResponseStatus.SUCCESS, result={ "drops": self.drops })
+
+        if command == "submit":
+            transaction = Transaction.from_blob(request.tx_blob)
+
+            if transaction.sequence in self.results:
+                return Response(status=ResponseStatus.SUCCESS, result={ "engine_result": self.results[transaction.sequence] })
+
+            if transaction.sequence in self.rejected:
+                self.rejected.discard(transaction.sequence)
+                return Response(status=ResponseStatus.SUCCESS, result={ "engine_result": "telCAN_NOT_QUEUE" })
+
+            self.sequence = transaction.sequence + 1
+
+            self.messages.append({ "type": "transaction", "validated": True, "transaction": { "hash": transaction.get_hash() }, "meta": { "TransactionResult": "tesSUCCESS" } })
+
+            return Response(status=ResponseStatus.SUCCESS, result={ "engine_result": "tesSUCCESS" })
+
+        if command == "tx":
+            return Response(status=ResponseStatus.ERROR, result={ "error": "txnNotFound", "searched_all": False })
+
+        return Response(status=ResponseStatus.SUCCESS, result={ })
+
+    async def receive(self, timeout: float) -> dict:
+
+        if len(self.messages) >= 1:
+            return self.messages.pop(0)
+
+        self.ledger += 1
+
+        return { "type": "ledgerClosed", "ledger_index": self.ledger }
+
+    def clear_messages(self) -> int:
+        return 0
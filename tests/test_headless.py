@@ -0,0 +1,50 @@
+"""Exit codes of headless runs."""
+
+from typer import Exit
+
+import pytest
+
+import airdrop.util as util
+
+
+@pytest.fixture
+def headless(monkeypatch):
+
+    monkeypatch.setattr(util, "HEADLESS", True)
+    monkeypatch.setattr(util, "FAILED", False)
+
+
+def test_clean_run_exits_normally(headless):
+
+    with util.headless_exit_code():
+        pass
+
+
+def test_reported_failure_exits_non_zero(headless, monkeypatch):
+
+    # A step printed an error, like a payment that couldn't be sent, but returned normally.
+    with pytest.raises(Exit) as exit:
+        with util.headless_exit_code():
+            monkeypatch.setattr(util, "FAILED", True)
+
+    assert exit.value.exit_code == 1
+
+
+def test_clean_exit_after_failure_exits_non_zero(headless, monkeypatch):
+
+    with pytest.raises(Exit) as exit:
+        with util.headless_exit_code():
+            monkeypatch.setattr(util, "FAILED", True)
+
+            raise Exit()
+
+    assert exit.value.exit_code == 1
+
+
+def test_failures_are_ignored_while_interactive(monkeypatch):
+
+    monkeypatch.setattr(util, "HEADLESS", False)
+    monkeypatch.setattr(util, "FAILED", True)
+
+    with util.headless_exit_code():
+        pass
@@ -0,0 +1,110 @@
+"""Resuming the balance and distribution journals."""
+
+from decimal import Decimal
+from os      import utime
+
+import pytest
+
+import airdrop.cache as cache
+
+from airdrop.session import AirdropSession, new_session
+
+HEADER = "rWallet 1 3 6"
+
+RECORD = "sent,rFirst,1,5,100,120,AAAA\n"
+
+
+def resume(journal_path: str, destination: str, sequence: int) -> None:
+
+    session = new_session()
+
+    assert cache.open_distribution_journal(session, str(journal_path), HEADER, True)
+    assert cache.journal_payment(session, "submitted", destination, Decimal(2), sequence, 100, 120, "BBBB")
+
+    cache.close_distribution_journal(session)
+
+
+@pytest.mark.parametrize("torn", [ "submitted,rTorn,3,7,1", "x" * 5000 ], ids=[ "record", "longer-than-a-chunk" ])
+def test_torn_tail_is_cut_before_resuming(tmp_path, torn):
+
+    journal_path = tmp_path / "airdrop_distribution.journal"
+
+    journal_path.write_text(f'{ HEADER }\n{ RECORD }{ torn }')
+
+    # The process died mid-write, and the distribution gets resumed twice.
+    resume(journal_path, "rSecond", 6)
+    resume(journal_path, "rThird", 7)
+
+    header, records = cache.read_distribution_journal(str(journal_path))
+
+    assert header == HEADER
+    assert [ (record["status"], record["destination"], record["sequence"]) for record in records ] == [ ("sent", "rFirst", 5), ("submitted", "rSecond", 6), ("submitted", "rThird", 7) ]
+
+
+def test_intact_journal_is_kept(tmp_path):
+
+    journal_path = tmp_path / "airdrop_distribution.journal"
+
+    journal_path.write_text(f'{ HEADER }\n{ RECORD }')
+
+    resume(journal_path, "rSecond", 6)
+
+    assert journal_path.read_text() == f'{ HEADER }\n{ RECORD }submitted,rSecond,2,6,100,120,BBBB\n'
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(cache, "JOURNAL_DIR_PATH", str(tmp_path / "balances"))
+
+    session = new_session()
+
+    cache.set_resume(session, True)
+
+    yield session
+
+    cache.close_balance_journal(session)
+
+
+def write(session: AirdropSession, ledger_index: int, currency: str, mtime: int) -> None:
+
+    cache.open_balance_journal(session, ledger_index, currency)
+    cache.journal_balance(session, "rHolder", Decimal(1))
+    cache.close_balance_journal(session)
+
+    utime(cache.get_balance_journal_path(currency), (mtime, mtime))
+
+
+def test_resume_pins_its_own_journal_ledger(session):
+
+    # Another token was fetched more recently, at a later ledger.
+    write(session, 100, "USD:rIssuerB", 1000)
+    write(session, 200, "USD:rIssuerA", 2000)
+
+    assert cache.read_journal_ledger_index(session, [ "USD:rIssuerB" ]) == 100
+    assert cache.read_journal_ledger_index(session, [ "USD:rIssuerA", "USD:rIssuerB" ]) == 200
+    assert cache.read_journal_ledger_index(session, [ "XRP" ]) is None
+
+    assert cache.open_balance_journal(session, 100, "USD:rIssuerB") == { "rHolder": Decimal(1) }
+
+
+def test_sessions_keep_their_own_journals(session):
+
+    other = new_session()
+
+    cache.set_resume(other, True)
+
+    # Two runs side by side, each journaling another token.
+    cache.open_balance_journal(session, 100, "USD:rIssuerA")
+    cache.open_balance_journal(other, 100, "USD:rIssuerB")
+
+    cache.journal_balance(session, "rFirst", Decimal(1))
+    cache.journal_balance(other, "rSecond", Decimal(2))
+
+    cache.close_balance_journal(session)
+    cache.close_balance_journal(other)
+
+    assert cache.open_balance_journal(session, 100, "USD:rIssuerA") == { "rFirst": Decimal(1) }
+    assert cache.open_balance_journal(other, 100, "USD:rIssuerB") == { "rSecond": Decimal(2) }
+
+    cache.close_balance_journal(other)
@@ -0,0 +1,114 @@
+"""RPC calls made per payment by the pipelined payment engine, against a stub XRPL client."""
+
+from xrpl.wallet import Wallet
+from asyncio     import run
+from decimal     import Decimal
+
+import pytest
+
+import airdrop.dist as dist
+
+from airdrop.session import AirdropSession, new_session
+from tests.stub      import StubClient
+
+PAYMENTS = 50
+
+
+@pytest.fixture
+def session():
+
+    session                = new_session()
+    session.wallet         = Wallet.create()
+    session.payment_window = 8
+
+    return session
+
+
+@pytest.fixture
+def client(monkeypatch):
+
+    def connect(stub: StubClient) -> StubClient:
+
+        async def get_payment_client(session: AirdropSession) -> StubClient:
+            return stub
+
+        monkeypatch.setattr(dist, "get_payment_client", get_payment_client)
+
+        return stub
+
+    return connect
+
+
+def pay(session: AirdropSession, count: int = PAYMENTS) -> list[bool]:
+    return run(dist.submit_payments_pipelined(session, [ (Wallet.create().classic_address, ("XRP", "XRP", Decimal("0.000001"))) for _ in range(count) ]))
+
+
+def test_state_is_read_once_per_batch(session, client):
+
+    stub = client(StubClient())
+
+    assert all(pay(session))
+
+    # Sequence and fee are read once for the whole batch, and every payment is submitted exactly once.
+    assert stub.requests["account_info"] == 1
+    assert stub.requests["fee"]          == 1
+    assert stub.requests["submit"]       == PAYMENTS
+    assert sum(stub.requests.values()) / PAYMENTS <= 1.1
+
+
+def test_state_is_read_again_per_retry(session, client):
+
+    stub = client(StubClient(rejected={ 10 }))
+
+    assert all(pay(session))
+
+    assert stub.requests["account_info"] == 2
+    assert stub.requests["fee"]          == 2
+    assert stub.requests["submit"]       == PAYMENTS + 1
+
+
+def test_fixed_fee_is_never_fetched(session, client):
+
+    stub = client(StubClient())
+
+    assert dist.set_payment_fee(session, 15, 1000)
+    assert all(pay(session))
+
+    assert stub.requests["fee"]          == 0
+    assert stub.requests["account_info"] == 1
+
+
+def test_max_fee_below_fetched_base_fee(session, client):
+
+    stub = client(StubClient(base_fee=20))
+
+    assert dist.set_payment_fee(session, None, 15)
+
+    with pytest.raises(dist.PaymentFeeError):
+        pay(session)
+
+    assert stub.requests["submit"] == 0
+
+
+@pytest.mark.parametrize("fee, max_fee", [ (None, 9), (9, 1000), (None, 0), (11, 10) ])
+def test_fees_below_base_fee_are_rejected(session, fee, max_fee):
+
+    assert not dist.set_payment_fee(session, fee, max_fee)
+
+
+def test_base_fee_is_accepted(session):
+
+    assert dist.set_payment_fee(session, 10, 10)
+    assert dist.set_payment_fee(session, None, 10)
+    assert dist.set_payment_fee(session, None, 1000)
+
+
+def test_sessions_keep_their_own_fees():
+
+    first  = new_session()
+    second = new_session()
+
+    assert dist.set_payment_fee(first, 15, 20)
+
+    assert dist.get_payment_fee(first)  == (15, 20)
+    assert dist.get_payment_fee(second) == (None, 1000)
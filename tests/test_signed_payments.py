@@ -0,0 +1,92 @@
+"""Outcomes of presigned payments, against a stub XRPL client."""
+
+from xrpl.wallet import Wallet
+from asyncio     import run
+from decimal     import Decimal
+
+import pytest
+
+import airdrop.dist as dist
+
+from airdrop.session import AirdropSession, new_session
+from tests.stub      import StubClient
+
+PAYMENTS = 5
+
+
+@pytest.fixture
+def session():
+
+    session               = new_session()
+    session.wallet        = Wallet.create()
+    session.ledger_window = 2
+
+    return session
+
+
+@pytest.fixture
+def client(monkeypatch):
+
+    def connect(stub: StubClient) -> StubClient:
+
+        async def get_payment_client(session: AirdropSession) -> StubClient:
+            return stub
+
+        monkeypatch.setattr(dist, "get_payment_client", get_payment_client)
+        monkeypatch.setattr(dist, "SIGNING_WORKERS", 1)
+
+        return stub
+
+    return connect
+
+
+def send(session: AirdropSession) -> tuple[list[tuple[int, str, str]], list[tuple[int, str, bool]]]:
+
+    signed  = dist.sign_payments(session, [ (Wallet.create().classic_address, ("XRP", "XRP", Decimal("0.000001"))) for _ in range(PAYMENTS) ], 1, "12")
+    settled = [ ]
+
+    run(dist.submit_signed_pipelined(session, signed, lambda index, hash, success: settled.append((index, hash, success))))
+
+    return signed, sorted(settled)
+
+
+def test_validated_blobs_succeed(session, client):
+
+    client(StubClient())
+
+    signed, settled = send(session)
+
+    assert settled == [ (index, hash, True) for index, (_, hash, _) in enumerate(signed) ]
+
+
+def test_queued_blob_out_of_attempts_is_unknown(session, client):
+
+    # The server keeps the last blob queued without ever applying it, so it may still be applied after we gave up.
+    stub = client(StubClient(results={ PAYMENTS: "terQUEUED" }))
+
+    signed, settled = send(session)
+
+    assert stub.requests["submit"] == PAYMENTS - 1 + dist.PAYMENT_ATTEMPTS
+    assert settled[-1] == (PAYMENTS - 1, signed[-1][1], None)
+    assert all([ success for _, _, success in settled[:-1] ])
+
+
+def test_blob_held_for_retry_out_of_attempts_is_unknown(session, client):
+
+    stub = client(StubClient(results={ PAYMENTS: "terINSUF_FEE_B" }))
+
+    _, settled = send(session)
+
+    assert stub.requests["submit"] == PAYMENTS - 1 + dist.PAYMENT_ATTEMPTS
+    assert settled[-1][2] is None
+
+
+@pytest.mark.parametrize("result", [ "temBAD_AMOUNT", "tefBAD_AUTH" ])
+def test_blob_that_can_never_apply_fails(session, client, result):
+
+    stub = client(StubClient(results={ PAYMENTS: result }))
+
+    _, settled = send(session)
+
+    assert stub.requests["submit"] == PAYMENTS
+    assert settled[-1][2] is False
@@ -0,0 +1,39 @@
+"""CLI startup cost."""
+
+from subprocess import run
+from pathlib    import Path
+from sys        import executable
+
+
+# Importing the CLI takes about 80ms, against well over 300ms with xrpl-py loaded eagerly. The budget leaves room for slow machines.
+IMPORT_BUDGET = 0.25
+
+
+def import_cli() -> dict[str, float]:
+    """Imports the CLI in a fresh interpreter, returning the cumulative import time of every module in seconds."""
+
+    result = run([ executable, "-X", "importtime", "-c", "import airdrop.cli" ], cwd=Path(__file__).parent.parent, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+
+    lines = [ line.split(":", 1)[1].split("|") for line in result.stderr.splitlines() if line.startswith("import time:") ]
+
+    return { module.strip(): int(cumulative) / 1e6 for _, cumulative, module in lines if cumulative.strip().isdigit() }
+
+
+def test_cli_import_skips_xrpl():
+
+    # Subsystems are only imported once a command runs, so `--help` and `--version` never load xrpl-py.
+    modules = import_cli()
+
+    assert "airdrop.cli" in modules
+    assert not any(module == "xrpl" or module.startswith("xrpl.") for module in modules)
+    assert "airdrop.xrpl" not in modules
+
+
+def test_cli_import_stays_within_budget():
+
+    # The fastest of a few runs, so a cold bytecode cache or a busy machine doesn't count against it.
+    elapsed = min([ import_cli()["airdrop.cli"] for _ in range(3) ])
+
+    assert elapsed < IMPORT_BUDGET, f'Importing the CLI took { elapsed * 1000:.0f}ms, more than the { IMPORT_BUDGET * 1000:.0f}ms budget'
@@ -0,0 +1,217 @@
+"""Token index syncing against a local stand-in for XRPLMeta."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from threading    import Thread
+from pathlib      import Path
+from json         import dumps, loads
+
+import pytest
+
+import airdrop.cache as cache
+import airdrop.xrpl  as xrpl
+
+TOKENS = loads((Path(__file__).parent / "data" / "xrplmeta_tokens.json").read_text())
+
+STEP   = 2
+
+
+class XRPLMeta():
+    """Serves the recorded tokens in pages of `STEP`, like XRPLMeta's `/tokens` endpoint. `pages` maps an offset to a list of answers, each either a status code or a page, used up in order before falling back to the recorded page."""
+
+    def __init__(self) -> None:
+        self.pages:    dict[int, list] = { }
+        self.requests: list[int]       = [ ]
+
+    def page(self, offset: int, count: int = len(TOKENS), tokens: list = None) -> dict:
+        return { "count": count, "tokens": TOKENS[offset:offset + STEP] if tokens is None else tokens }
+
+    def answer(self, offset: int):
+        self.requests.append(offset)
+
+        if len(self.pages.get(offset, [ ])) >= 1:
+            return self.pages[offset].pop(0)
+
+        return self.page(offset)
+
+
+@pytest.fixture
+def meta(tmp_path, monkeypatch):
+
+    stand_in = XRPLMeta()
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+
+            answer = stand_in.answer(int(parse_qs(urlparse(self.path).query)["offset"][0]))
+
+            if type(answer) is int:
+                self.send_response(answer)
+                self.end_headers()
+                return
+
+            body = dumps(answer).encode()
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(cache, "TOKEN_INDEX_PATH", str(tmp_path / "tokens.sqlite"))
+    monkeypatch.setattr(xrpl, "XRPL_META_URL", f"http://127.0.0.1:{server.server_address[1]}/tokens")
+    monkeypatch.setattr(xrpl, "XRPL_META_STEP", STEP)
+
+    yield stand_in
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_writes_every_token(meta):
+
+    assert xrpl.fetch_xrpl_metadata() == len(TOKENS)
+    assert cache.read_token_index_count() == len(TOKENS)
+    assert cache.read_issued_tokens("rhub8VRN55s94qWKDv6jmDy1pUykJzF3wq") == [ ("USD", None), ("EUR", None) ]
+    assert cache.read_issued_tokens("rU4HFsmSMmMaPq3Qx8eHzMcUwE7G8AEQ1J") == [ ("58454E4400000000000000000000000000000000", "XENE") ]
+
+
+def test_unchanged_first_page_keeps_index(meta):
+
+    cache.write_token_index(len(TOKENS), { "rIndexed": [ ("ABC", None) ] * len(TOKENS) }, xrpl.get_xrpl_metadata_marker(meta.page(0)))
+
+    assert xrpl.fetch_xrpl_metadata() == len(TOKENS)
+    assert meta.requests == [ 0 ]
+
+
+def test_renamed_token_is_synced_again(meta):
+
+    # Same count, but a token on the first page got renamed since the index was written.
+    renamed = loads(dumps(TOKENS[0:STEP]))
+
+    renamed[0]["meta"]["token"]["name"] = "Renamed"
+
+    cache.write_token_index(len(TOKENS), { "rIndexed": [ ("ABC", None) ] * len(TOKENS) }, xrpl.get_xrpl_metadata_marker(meta.page(0, tokens=renamed)))
+
+    assert xrpl.fetch_xrpl_metadata() == len(TOKENS)
+    assert cache.read_issued_tokens("rIndexed") == [ ]
+    assert cache.read_issued_tokens("rU4HFsmSMmMaPq3Qx8eHzMcUwE7G8AEQ1J") == [ ("58454E4400000000000000000000000000000000", "XENE") ]
+
+
+def test_expired_index_is_synced_again(meta, monkeypatch):
+
+    # Changes further down than the first page can't be seen, so an old enough index is synced again regardless.
+    cache.write_token_index(len(TOKENS), { "rIndexed": [ ("ABC", None) ] * len(TOKENS) }, xrpl.get_xrpl_metadata_marker(meta.page(0)))
+
+    monkeypatch.setattr(xrpl, "XRPL_META_TTL", 0.0)
+
+    assert xrpl.fetch_xrpl_metadata() == len(TOKENS)
+    assert cache.read_issued_tokens("rIndexed") == [ ]
+
+
+def test_index_without_marker_is_synced_again(meta):
+
+    cache.write_token_index(len(TOKENS), { "rIndexed": [ ("ABC", None) ] * len(TOKENS) })
+
+    assert xrpl.fetch_xrpl_metadata() == len(TOKENS)
+    assert cache.read_issued_tokens("rIndexed") == [ ]
+
+
+def test_short_page_is_retried(meta):
+
+    meta.pages[2] = [ meta.page(2, tokens=TOKENS[2:3]) ]
+
+    assert xrpl.fetch_xrpl_metadata() == len(TOKENS)
+    assert meta.requests.count(0) == 2
+
+
+def test_short_pages_are_never_written(meta):
+
+    meta.pages[2] = [ meta.page(2, tokens=TOKENS[2:3]) ] * xrpl.XRPL_META_RETRIES
+
+    with pytest.raises(ValueError):
+        xrpl.fetch_xrpl_metadata()
+
+    assert cache.read_token_index_count() is None
+
+
+def test_count_mismatch_is_retried(meta):
+
+    # A token got added while paging, so later pages report a larger total than the first one.
+    meta.pages[4] = [ meta.page(4, count=len(TOKENS) + 1) ]
+
+    assert xrpl.fetch_xrpl_metadata() == len(TOKENS)
+    assert meta.requests.count(0) == 2
+
+
+def test_count_mismatch_is_never_written(meta):
+
+    meta.pages[4] = [ meta.page(4, count=len(TOKENS) + 1) ] * xrpl.XRPL_META_RETRIES
+
+    with pytest.raises(ValueError):
+        xrpl.fetch_xrpl_metadata()
+
+    assert cache.read_token_index_count() is None
+
+
+def test_truncated_sync_is_never_written(meta):
+
+    # A token shifted pages mid-sync, so it shows up twice while another one is never seen.
+    meta.pages[2] = [ meta.page(2, tokens=[ TOKENS[1], TOKENS[2] ]) ] * xrpl.XRPL_META_RETRIES
+
+    with pytest.raises(ValueError):
+        xrpl.fetch_xrpl_metadata()
+
+    assert cache.read_token_index_count() is None
+
+
+def test_truncated_index_is_synced_again(meta):
+
+    cache.write_token_index(len(TOKENS), { "rIndexed": [ ("ABC", None) ] * (len(TOKENS) - 1) })
+
+    assert cache.read_token_index_count() is None
+    assert xrpl.fetch_xrpl_metadata() == len(TOKENS)
+    assert cache.read_token_index_count() == len(TOKENS)
+
+
+def test_later_page_failure_falls_back_to_index(meta):
+
+    cache.write_token_index(3, { "rIndexed": [ ("ABC", None), ("DEF", None), ("GHI", None) ] })
+
+    meta.pages[4] = [ 500 ] * xrpl.XRPL_META_RETRIES
+
+    assert xrpl.fetch_xrpl_metadata() == 3
+    assert meta.requests.count(0) == xrpl.XRPL_META_RETRIES
+    assert cache.read_issued_tokens("rIndexed") == [ ("ABC", None), ("DEF", None), ("GHI", None) ]
+
+
+def test_later_page_failure_is_retried(meta):
+
+    meta.pages[4] = [ 503 ]
+
+    assert xrpl.fetch_xrpl_metadata() == len(TOKENS)
+    assert cache.read_token_index_count() == len(TOKENS)
+
+
+def test_later_page_failure_without_index(meta):
+
+    meta.pages[2] = [ 500 ] * xrpl.XRPL_META_RETRIES
+
+    with pytest.raises(ConnectionError):
+        xrpl.fetch_xrpl_metadata()
+
+
+def test_first_page_failure_without_index(meta):
+
+    meta.pages[0] = [ 500 ]
+
+    with pytest.raises(ConnectionError):
+        xrpl.fetch_xrpl_metadata()